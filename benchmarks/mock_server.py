@@ -0,0 +1,440 @@
+"""
+Local stand-in for the Anthropic Messages API, for benchmarks and offline testing.
+
+Serves POST /v1/messages and the Message Batches endpoints with canned
+responses that look like what the real prompts expect, after a configurable
+latency, and injects throttling, server errors and malformed responses at
+configurable rates.
+
+Run standalone and point the CLI at it:
+
+    python -m benchmarks.mock_server --port 8080 --latency lognormal:0.8:0.4 --error-rate 0.05
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8080 ANTHROPIC_API_KEY=mock python main.py generate -n 50
+"""
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+_COUNT_PATTERN = re.compile(r"Generate exactly (\d+) question")
+
+# Characters of response text per streamed delta event
+STREAM_CHUNK_CHARS = 40
+
+
+def parse_latency(spec: str):
+    """
+    Build a latency sampler from a spec string.
+
+    Accepts 'fixed:SECONDS', 'uniform:LOW:HIGH' or 'lognormal:MEDIAN:SIGMA'
+    (a bare number means fixed).
+    """
+    kind, _, rest = spec.partition(":")
+    if not rest:
+        value = float(kind)
+        return lambda rng: value
+    args = [float(x) for x in rest.split(":")]
+    if kind == "fixed":
+        return lambda rng: args[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "lognormal":
+        import math
+        mu = math.log(args[0])
+        return lambda rng: rng.lognormvariate(mu, args[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockConfig:
+    """Behaviour of the mock server"""
+
+    def __init__(self,
+                 latency: str = "0",
+                 error_rate: float = 0.0,
+                 throttle_rate: float = 0.0,
+                 malformed_rate: float = 0.0,
+                 max_concurrency: Optional[int] = None,
+                 retry_after: float = 1.0,
+                 questions_path: str = "data/generated_questions.json",
+                 recorded_path: Optional[str] = None,
+                 batch_delay: float = 1.0,
+                 seed: int = 0):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.malformed_rate = malformed_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.batch_delay = batch_delay
+        self.rng = random.Random(seed)
+
+        with open(questions_path, "r", encoding="utf-8") as f:
+            self.questions = json.load(f)
+
+        # Recorded responses: JSONL of {"match": "<substring of the prompt>", "text": "<response text>"}
+        self.recorded: List[Tuple[str, str]] = []
+        if recorded_path:
+            with open(recorded_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recorded.append((entry["match"], entry["text"]))
+
+
+class MockStats:
+    """Per-request measurements taken by the server"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.malformed = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def start(self) -> int:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return self.in_flight
+
+    def finish(self, status: int, elapsed: float):
+        with self._lock:
+            self.in_flight -= 1
+            # Rejected requests return immediately and would drag the percentiles down
+            if status == 200:
+                self.latencies.append(elapsed)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": sum(self.statuses.values()),
+                "latencies": list(self.latencies),
+                "statuses": dict(self.statuses),
+                "malformed": self.malformed,
+                "peak_in_flight": self.peak_in_flight
+            }
+
+
+def _prompt_text(body: Dict) -> Tuple[str, bool]:
+    """All text of the request's messages, and whether it carries a document"""
+    texts = []
+    has_document = False
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            texts.append(content)
+            continue
+        for block in content or []:
+            if block.get("type") == "text":
+                texts.append(block["text"])
+            elif block.get("type") == "document":
+                has_document = True
+    return "".join(texts), has_document
+
+
+def _message(model: str, text: str, input_tokens: int, output_tokens: int, tool: Optional[str] = None) -> Dict:
+    """A response message; with `tool`, `text` is the JSON input of a call to that tool"""
+    if tool:
+        content = [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}", "name": tool, "input": json.loads(text)}]
+    else:
+        content = [{"type": "text", "text": text}]
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": content,
+        "stop_reason": "tool_use" if tool else "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+    }
+
+
+def _truncated_questions(model: str, tool: str, items: List[Dict], input_tokens: int, max_tokens: int) -> Dict:
+    """A submit_questions call cut off at `max_tokens`: the questions that fit, then the start of the next one"""
+    kept = []
+    for item in items:
+        if len(json.dumps({"questions": kept + [item]}, indent=2)) // 4 + 1 > max_tokens:
+            break
+        kept.append(item)
+    partial = {"question": items[len(kept)]["question"][:20]}
+    message = _message(model, json.dumps({"questions": kept + [partial]}), input_tokens, max_tokens, tool=tool)
+    message["stop_reason"] = "max_tokens"
+    return message
+
+
+class MockAnthropicServer:
+    """Threaded mock server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, config: MockConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.stats = MockStats()
+        self.batches: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockAnthropicServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, body: Dict) -> Dict:
+        """Canned response message for a Messages API request body"""
+        config = self.config
+        text, has_document = _prompt_text(body)
+        model = body.get("model", "mock-model")
+        input_tokens = len(text) // 4 + 1
+
+        with self._lock:
+            malformed = config.rng.random() < config.malformed_rate
+            if malformed:
+                self.stats.malformed += 1
+            recorded = next((t for match, t in config.recorded if match in text), None)
+            sample = config.rng.sample(config.questions, min(len(config.questions), 10))
+            verdict = config.rng.random() < 0.5
+
+        tool_choice = body.get("tool_choice") or {}
+        tool = tool_choice.get("name") if tool_choice.get("type") == "tool" else None
+
+        count_match = _COUNT_PATTERN.search(text)
+
+        if malformed and not tool:
+            reply = "I'm sorry, I can't produce that in the requested format."
+        elif recorded is not None:
+            reply = recorded
+        elif has_document:
+            reply = json.dumps([{k: q[k] for k in ("id", "question", "choices")} for q in sample[:3]])
+        elif count_match:
+            count = int(count_match.group(1))
+            items = [{k: q[k] for k in ("question", "choices", "answer")}
+                     for q in (sample * (count // len(sample) + 1))[:count]]
+            if malformed:
+                # A forced tool call is always valid JSON, but its items can still fail validation
+                items[0] = {**items[0], "answer": "E"}
+            reply = json.dumps({"questions": items} if tool else items, indent=2)
+            max_tokens = body.get("max_tokens")
+            if tool and max_tokens and len(reply) // 4 + 1 > max_tokens:
+                return _truncated_questions(model, tool, items, input_tokens, max_tokens)
+        elif "is_real" in text:
+            reply = json.dumps({"is_real": verdict, "confidence": "medium", "reasoning": "Mock judgement"})
+        else:
+            reply = json.dumps({"correct": True, "explanation": "Mock verification"})
+
+        return _message(model, reply, input_tokens, len(reply) // 4 + 1, tool=tool)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Streamed events are small writes; without this, Nagle's algorithm delays them
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload, content_type: str = "application/json", headers: Dict = None):
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _error(self, status: int, error_type: str, message: str, headers: Dict = None):
+                self._send(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers=headers)
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = self.path.split("?")[0]
+
+                if path == "/v1/messages/batches":
+                    return self._send(200, server._create_batch(body))
+                if path == "/v1/messages":
+                    return self._messages(body)
+                self._error(404, "not_found_error", f"No route for {path}")
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                match = re.match(r"^/v1/messages/batches/([^/]+)(/results)?$", path)
+                if not match or match.group(1) not in server.batches:
+                    return self._error(404, "not_found_error", f"No route for {path}")
+                batch = server.batches[match.group(1)]
+                if match.group(2):
+                    lines = "\n".join(json.dumps(r) for r in batch["results"])
+                    return self._send(200, lines.encode("utf-8"), content_type="application/x-jsonl")
+                self._send(200, server._batch_status(batch))
+
+            def _messages(self, body: Dict):
+                config = server.config
+                started = time.monotonic()
+                in_flight = server.stats.start()
+                status = 200
+                try:
+                    with server._lock:
+                        roll = config.rng.random()
+                        delay = config.latency(config.rng)
+
+                    over_limit = config.max_concurrency is not None and in_flight > config.max_concurrency
+                    if over_limit or roll < config.throttle_rate:
+                        status = 429
+                        return self._error(429, "rate_limit_error", "Mock rate limit",
+                                           headers={"retry-after": str(config.retry_after)})
+                    if roll < config.throttle_rate + config.error_rate:
+                        status = config.rng.choice([500, 529])
+                        return self._error(status, "overloaded_error" if status == 529 else "api_error", "Mock failure")
+
+                    message = server.respond(body)
+                    if body.get("stream"):
+                        self._stream(message, delay)
+                    else:
+                        time.sleep(delay)
+                        self._send(200, message)
+                finally:
+                    server.stats.finish(status, time.monotonic() - started)
+
+            def _stream(self, message: Dict, delay: float):
+                """Send a message as server-sent events, spreading `delay` over the stream"""
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("transfer-encoding", "chunked")
+                self.end_headers()
+
+                def event(name: str, data: Dict):
+                    payload = f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n".encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+
+                block = message["content"][0]
+                if block["type"] == "tool_use":
+                    text = json.dumps(block["input"])
+                    if message["stop_reason"] == "max_tokens":
+                        # A cut-off call stops mid-value, inside the partial last question
+                        text = text[:-len('"}]}')]
+                    start_block = {**block, "input": {}}
+                    delta_type, delta_field = "input_json_delta", "partial_json"
+                else:
+                    text = block["text"]
+                    start_block = {"type": "text", "text": ""}
+                    delta_type, delta_field = "text_delta", "text"
+                pieces = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+                # A fifth of the latency passes before the first token, the rest while generating
+                time.sleep(delay * 0.2)
+                event("message_start", {"message": {**message, "content": [], "stop_reason": None,
+                                                    "usage": {**message["usage"], "output_tokens": 1}}})
+                event("content_block_start", {"index": 0, "content_block": start_block})
+                for piece in pieces:
+                    event("content_block_delta", {"index": 0, "delta": {"type": delta_type, delta_field: piece}})
+                    time.sleep(delay * 0.8 / len(pieces))
+                event("content_block_stop", {"index": 0})
+                event("message_delta", {"delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                                        "usage": {"output_tokens": message["usage"]["output_tokens"]}})
+                event("message_stop", {})
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def _create_batch(self, body: Dict) -> Dict:
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        results = [
+            {
+                "custom_id": request["custom_id"],
+                "result": {"type": "succeeded", "message": self.respond(request["params"])}
+            }
+            for request in body.get("requests", [])
+        ]
+        batch = {"id": batch_id, "results": results, "ready_at": time.time() + self.config.batch_delay}
+        with self._lock:
+            self.batches[batch_id] = batch
+        return self._batch_status(batch)
+
+    def _batch_status(self, batch: Dict) -> Dict:
+        ended = time.time() >= batch["ready_at"]
+        count = len(batch["results"])
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0
+            },
+            "created_at": "2025-01-01T00:00:00Z",
+            "expires_at": "2025-01-02T00:00:00Z",
+            "ended_at": "2025-01-01T00:00:01Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch['id']}/results" if ended else None
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Anthropic Messages API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="0", help="fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500/529")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests rejected with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of responses that are not JSON")
+    parser.add_argument("--max-concurrency", type=int, help="Reject requests beyond this many in flight with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds sent with 429s")
+    parser.add_argument("--questions", default="data/generated_questions.json", help="Pool of canned questions")
+    parser.add_argument("--recorded", help="JSONL of recorded responses: {\"match\": ..., \"text\": ...}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        malformed_rate=args.malformed_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        questions_path=args.questions,
+        recorded_path=args.recorded,
+        seed=args.seed
+    )
+    server = MockAnthropicServer(config, host=args.host, port=args.port).start()
+    print(f"Mock Anthropic API listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
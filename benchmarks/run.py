@@ -0,0 +1,311 @@
+"""
+Offline throughput benchmarks.
+
+Runs the real CLI commands as subprocesses against the mock Messages API in
+benchmarks/mock_server.py, so nothing is billed, and reports throughput,
+request latency percentiles, peak memory and parse-failure rates per
+scenario. Request latency is taken from the CLI's own --metrics-jsonl
+telemetry, so it includes retries and backoff. Results are written as JSON and can be compared with a baseline
+run to flag regressions:
+
+    python -m benchmarks.run --size 200 --output benchmarks/results.json
+    python -m benchmarks.run --size 200 --baseline benchmarks/results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.mock_server import MockAnthropicServer, MockConfig
+from utils.telemetry import percentile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics compared with the baseline, and whether higher values are better
+COMPARED_METRICS = {
+    "questions_per_sec": True,
+    "latency_p95": False,
+    "peak_rss_mb": False,
+    "parse_failure_rate": False,
+}
+
+
+def write_questions(path: str, count: int, pool: List[Dict]):
+    """Write `count` questions cycled from `pool`"""
+    questions = [{**pool[i % len(pool)], "id": f"bench-{i}"} for i in range(count)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(questions, f)
+
+
+def write_pdfs(directory: str, count: int):
+    """Write `count` small placeholder PDFs (the mock server never parses them)"""
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(directory, f"bench-{i:04d}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n" + os.urandom(16 * 1024) + b"\n%%EOF\n")
+
+
+def run_cli(args: List[str], env: Dict[str, str], workdir: str) -> Tuple[float, float, str, str, int]:
+    """
+    Run main.py with `args`.
+
+    Returns:
+        Wall seconds, peak RSS in MB, stdout, stderr and the exit code
+    """
+    stdout_path = os.path.join(workdir, "stdout.txt")
+    stderr_path = os.path.join(workdir, "stderr.txt")
+    with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+        started = time.monotonic()
+        process = subprocess.Popen([sys.executable, "main.py", *args], cwd=REPO_ROOT, env=env,
+                                   stdout=stdout, stderr=stderr)
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.monotonic() - started
+
+    # Linux reports ru_maxrss in kilobytes, macOS in bytes
+    peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    with open(stdout_path, "r") as f:
+        out = f.read()
+    with open(stderr_path, "r") as f:
+        err = f.read()
+    return elapsed, round(peak_rss_mb, 1), out, err, os.waitstatus_to_exitcode(status)
+
+
+class Scenario:
+    """A CLI invocation to benchmark, and how to count its questions and parse failures"""
+
+    def __init__(self, name: str, build: Callable[[str, int], List[str]],
+                 count_failures: Callable[[str, int, Dict, str], Tuple[int, int]]):
+        self.name = name
+        self.build = build
+        self.count_failures = count_failures
+
+
+def _load(path: str) -> Optional[object]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_jsonl(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _generate_args(workdir: str, size: int) -> List[str]:
+    return ["generate", "-n", str(size), "--quiet", "-o", os.path.join(workdir, "generated.json")]
+
+
+def _generate_stream_args(workdir: str, size: int) -> List[str]:
+    return [*_generate_args(workdir, size), "--stream"]
+
+
+def _generate_failures(workdir: str, size: int, server_stats: Dict, stdout: str) -> Tuple[int, int]:
+    # Questions missing from the output were lost to responses that could not be parsed
+    produced = len(_load(os.path.join(workdir, "generated.json")) or [])
+    return produced, size - produced
+
+
+def _accuracy_args(workdir: str, size: int) -> List[str]:
+    return ["evaluate", "accuracy", "-i", os.path.join(workdir, "questions.json"), "--quiet",
+            "--no-local-check", "-o", os.path.join(workdir, "accuracy.json")]
+
+
+def _accuracy_failures(workdir: str, size: int, server_stats: Dict, stdout: str) -> Tuple[int, int]:
+    # Results that fell back to scraping the text for "correct" had unparseable JSON
+    results = (_load(os.path.join(workdir, "accuracy.json")) or {}).get("results", [])
+    fallbacks = sum(1 for r in results if r["evaluation"]["explanation"] == "Extracted from response")
+    return len(results), fallbacks + size - len(results)
+
+
+def _authenticity_args(workdir: str, size: int) -> List[str]:
+    return ["evaluate", "authenticity", "-i", os.path.join(workdir, "questions.json"),
+            "-r", os.path.join(workdir, "real.json"), "--seed", "0",
+            "-o", os.path.join(workdir, "authenticity.json")]
+
+
+def _authenticity_failures(workdir: str, size: int, server_stats: Dict, stdout: str) -> Tuple[int, int]:
+    # Unparseable predictions silently fall back to a keyword guess, so count them on the server side
+    results = _load(os.path.join(workdir, "authenticity.json")) or {}
+    total = results.get("summary", {}).get("total_questions", 0)
+    return total, min(total, server_stats["malformed"])
+
+
+def _pipeline_args(workdir: str, size: int) -> List[str]:
+    return ["pipeline", "-n", str(size), "--quiet", "--stream", "--no-local-check",
+            "-r", os.path.join(workdir, "real.json"), "--seed", "0", "-o", os.path.join(workdir, "pipeline.json")]
+
+
+def _pipeline_failures(workdir: str, size: int, server_stats: Dict, stdout: str) -> Tuple[int, int]:
+    # Generated questions that never made it out of the pipeline, plus accuracy results scraped from text
+    questions = (_load(os.path.join(workdir, "pipeline.json")) or {}).get("questions", [])
+    fallbacks = sum(1 for q in questions
+                    if q["evaluation"] and q["evaluation"]["explanation"] == "Extracted from response")
+    return len(questions), fallbacks + size - len(questions)
+
+
+def _extract_args(workdir: str, size: int) -> List[str]:
+    return ["extract", "-i", os.path.join(workdir, "pdfs"), "-o", os.path.join(workdir, "extracted.json")]
+
+
+def _extract_failures(workdir: str, size: int, server_stats: Dict, stdout: str) -> Tuple[int, int]:
+    # Each PDF yields a list of questions; a file whose response could not be parsed yields a failure
+    produced = len(_load(os.path.join(workdir, "extracted.json")) or [])
+    return produced, stdout.count(": failed (")
+
+
+SCENARIOS = {
+    "generate": Scenario("generate", _generate_args, _generate_failures),
+    "generate-stream": Scenario("generate-stream", _generate_stream_args, _generate_failures),
+    "accuracy": Scenario("accuracy", _accuracy_args, _accuracy_failures),
+    "authenticity": Scenario("authenticity", _authenticity_args, _authenticity_failures),
+    "pipeline": Scenario("pipeline", _pipeline_args, _pipeline_failures),
+    "extract": Scenario("extract", _extract_args, _extract_failures),
+}
+
+
+def run_scenario(scenario: Scenario, config: MockConfig, size: int, global_args: List[str]) -> Dict:
+    """Run one scenario against a fresh mock server and collect its metrics"""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario.name}-") as workdir:
+        write_questions(os.path.join(workdir, "questions.json"), size, config.questions)
+        write_questions(os.path.join(workdir, "real.json"), size, config.questions)
+        write_pdfs(os.path.join(workdir, "pdfs"), size)
+
+        with MockAnthropicServer(config) as server:
+            env = {
+                **os.environ,
+                "ANTHROPIC_BASE_URL": server.url,
+                "ANTHROPIC_API_KEY": "mock",
+                "PYTHONUNBUFFERED": "1",
+            }
+            metrics_path = os.path.join(workdir, "metrics.jsonl")
+            args = ["--no-cache", "--cache-dir", os.path.join(workdir, ".cache"), "--metrics-jsonl", metrics_path,
+                    *global_args, *scenario.build(workdir, size)]
+            elapsed, peak_rss_mb, stdout, stderr, returncode = run_cli(args, env, workdir)
+            stats = server.stats.snapshot()
+
+        questions, failures = scenario.count_failures(workdir, size, stats, stdout)
+        calls = _load_jsonl(metrics_path)
+
+    # Latency as the CLI saw it (including retries and backoff), from its own telemetry
+    latencies = [c["wall_time"] for c in calls if not c["cache_hit"] and not c["batch"]]
+    ttfts = [c["ttft"] for c in calls if c.get("ttft") is not None]
+    return {
+        "returncode": returncode,
+        "error": stderr.strip().splitlines()[-1] if returncode and stderr.strip() else None,
+        "wall_seconds": round(elapsed, 3),
+        "questions": questions,
+        "questions_per_sec": round(questions / elapsed, 3) if elapsed else 0.0,
+        "requests": stats["requests"],
+        "statuses": stats["statuses"],
+        "peak_in_flight": stats["peak_in_flight"],
+        "latency_p50": round(percentile(latencies, 50) or 0.0, 4),
+        "latency_p95": round(percentile(latencies, 95) or 0.0, 4),
+        "latency_p99": round(percentile(latencies, 99) or 0.0, 4),
+        "ttft_p50": round(percentile(ttfts, 50), 4) if ttfts else None,
+        "server_latency_p50": round(percentile(stats["latencies"], 50) or 0.0, 4),
+        "server_latency_p95": round(percentile(stats["latencies"], 95) or 0.0, 4),
+        "retries": sum(c["retries"] for c in calls),
+        "input_tokens": sum(c["input_tokens"] for c in calls),
+        "output_tokens": sum(c["output_tokens"] for c in calls),
+        "peak_rss_mb": peak_rss_mb,
+        "parse_failures": failures,
+        "parse_failure_rate": round(failures / size, 4) if size else 0.0,
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Describe every compared metric that got worse than the baseline by more than `tolerance`"""
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            if metric == "parse_failure_rate":
+                # Rates near zero make relative changes meaningless; compare absolute points
+                worse = new - old > tolerance / 10
+            elif higher_is_better:
+                worse = new < old * (1 - tolerance)
+            else:
+                worse = new > old * (1 + tolerance)
+            if worse:
+                regressions.append(f"{name}: {metric} {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CLI against a mock Anthropic API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--size", type=int, default=100, help="Questions (or PDFs) per scenario")
+    parser.add_argument("--latency", default="lognormal:0.2:0.5",
+                        help="Mock latency: fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500/529")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests rejected with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of responses that are not JSON")
+    parser.add_argument("--server-concurrency", type=int, help="Mock server's concurrent request limit (429 beyond it)")
+    parser.add_argument("--recorded", help="JSONL of recorded responses: {\"match\": ..., \"text\": ...}")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mock server's randomness")
+    parser.add_argument("--cli-args", default="", help="Extra global CLI options, e.g. \"--max-concurrency 8\"")
+    parser.add_argument("--output", "-o", default="benchmarks/results.json", help="Where to write the results")
+    parser.add_argument("--baseline", "-b", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression (default 0.1)")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "scenarios": {},
+    }
+
+    for name in args.scenarios.split(","):
+        scenario = SCENARIOS[name.strip()]
+        config = MockConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            malformed_rate=args.malformed_rate,
+            max_concurrency=args.server_concurrency,
+            recorded_path=args.recorded,
+            seed=args.seed,
+            questions_path=os.path.join(REPO_ROOT, "data", "generated_questions.json")
+        )
+        print(f"Running {scenario.name} ({args.size})...", flush=True)
+        metrics = run_scenario(scenario, config, args.size, args.cli_args.split())
+        results["scenarios"][scenario.name] = metrics
+        status = "ok" if metrics["returncode"] == 0 else f"exit {metrics['returncode']}: {metrics['error']}"
+        print(f"  {metrics['questions_per_sec']:.1f} questions/s, "
+              f"p50/p95/p99 {metrics['latency_p50']:.3f}/{metrics['latency_p95']:.3f}/{metrics['latency_p99']:.3f}s, "
+              f"peak RSS {metrics['peak_rss_mb']} MB, "
+              f"parse failures {metrics['parse_failure_rate']:.1%} ({status})")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
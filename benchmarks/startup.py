@@ -0,0 +1,90 @@
+"""
+CLI startup benchmark.
+
+Times `python main.py` invocations that never reach the API (help output,
+argument errors) and fails if any exceeds its budget or imports a heavy
+module such as the Anthropic SDK, which is only needed once a command runs:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 20 --scale 1.5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Set, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (arguments, budget in milliseconds). Subcommands also import their command
+# modules, hence the larger budgets; nothing is set up until a command runs.
+INVOCATIONS = [
+    (["--help"], 100),
+    (["evaluate", "--help"], 150),
+    (["generate", "--help"], 150),
+    (["evaluate", "accuracy", "--help"], 150),
+    (["generate", "--count", "not-a-number"], 150),
+]
+
+# Modules that must not be imported before a command actually runs: the SDK and
+# pydantic, and .env loading and the project's utilities, which `start_run` brings in
+HEAVY_MODULES = ("anthropic", "pydantic", "httpx", "httpx2", "dotenv", "utils")
+
+
+def time_command(command: List[str], runs: int) -> float:
+    """Median wall time of running `command` from the repository root, in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def imported_modules(args: List[str]) -> Set[str]:
+    """Top-level packages imported by `python main.py <args>`, from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args], cwd=REPO_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CLI startup time against its budget")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per invocation (the median is used)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, for slower machines")
+    args = parser.parse_args()
+
+    interpreter = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"Bare interpreter startup: {interpreter:.0f} ms")
+
+    failures: List[Tuple[str, str]] = []
+    for invocation, budget in INVOCATIONS:
+        name = " ".join(invocation)
+        budget *= args.scale
+        elapsed = time_command([sys.executable, "main.py", *invocation], args.runs)
+        heavy = sorted(imported_modules(invocation) & set(HEAVY_MODULES))
+        status = "ok"
+        if elapsed > budget:
+            status = "over budget"
+            failures.append((name, f"{elapsed:.0f} ms > {budget:.0f} ms"))
+        if heavy:
+            status = "imports " + ", ".join(heavy)
+            failures.append((name, f"imports {', '.join(heavy)}"))
+        print(f"  main.py {name:<40} {elapsed:6.0f} ms (budget {budget:.0f} ms) {status}")
+
+    if failures:
+        print("Startup budget exceeded:")
+        for name, reason in failures:
+            print(f"  main.py {name}: {reason}")
+        sys.exit(1)
+    print("All invocations within budget")
+
+
+if __name__ == "__main__":
+    main()
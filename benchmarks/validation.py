@@ -0,0 +1,80 @@
+"""
+Question validation benchmark.
+
+Builds Question objects from synthetic records one at a time (the old
+path), in bulk with `validate_questions`, and with the trusted
+`construct_questions` path, and reports objects per second for each:
+
+    python -m benchmarks.validation
+    python -m benchmarks.validation --count 100000 --with-ids
+"""
+import argparse
+import gc
+import time
+from typing import Callable, Dict, List
+
+from models.question import Question, construct_questions, validate_questions
+
+
+def make_records(count: int, with_ids: bool, invalid_every: int) -> List[Dict]:
+    """Synthetic question records; every `invalid_every`-th one has an answer that is not a choice"""
+    records = []
+    for i in range(count):
+        record = {
+            "question": f"If 3x + {i % 97} = {i % 89}, what is the value of x?",
+            "choices": {"A": str(i % 7), "B": str(i % 11), "C": str(i % 13), "D": str(i % 17)},
+            "answer": "E" if invalid_every and i % invalid_every == 0 else "B",
+            "topic": "linear equations in one variable",
+        }
+        if with_ids:
+            record["id"] = f"q{i}"
+        records.append(record)
+    return records
+
+
+def one_at_a_time(records: List[Dict]) -> int:
+    # Kept in a list, as the commands keep the questions they load
+    questions = []
+    for record in records:
+        try:
+            questions.append(Question(**record))
+        except ValueError:
+            pass
+    return len(questions)
+
+
+def bulk(records: List[Dict]) -> int:
+    questions, _ = validate_questions(records)
+    return len(questions)
+
+
+def trusted(records: List[Dict]) -> int:
+    return len(construct_questions(records))
+
+
+def measure(name: str, func: Callable[[List[Dict]], int], records: List[Dict]):
+    gc.collect()
+    started = time.perf_counter()
+    built = func(records)
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<16} {built:>9} questions in {elapsed:6.2f}s  {len(records) / elapsed:>10,.0f} objects/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Question validation throughput")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of question records")
+    parser.add_argument("--with-ids", action="store_true", help="Give every record an ID, as stored questions have")
+    parser.add_argument("--invalid-every", type=int, default=100,
+                        help="Make every Nth record invalid (0 for none) [default: 100]")
+    args = parser.parse_args()
+
+    records = make_records(args.count, args.with_ids, args.invalid_every)
+    print(f"{args.count:,} records, {'with' if args.with_ids else 'without'} IDs")
+    measure("one at a time", one_at_a_time, records)
+    measure("bulk", bulk, records)
+    # The trusted path skips validation, so it only gets valid records
+    measure("trusted", trusted, [record for record in records if record["answer"] != "E"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import click
+import json
+import os
+
+from config import get_default_model, DEFAULT_CONCURRENCY
+
+
+@click.command()
+@click.option('--input', '-i', type=click.Path(exists=True),
+              help='Input JSON or JSONL file with questions [default: generated questions in --store]')
+@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
+@click.option('--quiet', is_flag=True, help='Show summary only')
+@click.option('--model', '-m', type=str, help='Claude model to use')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent evaluations')
+@click.option('--batch-api', is_flag=True, help='Submit all evaluations as one Message Batches API request')
+@click.option('--no-local-check', is_flag=True, help='Send every question to the LLM, skipping the local verifier')
+@click.option('--only-unevaluated', is_flag=True, help='Skip questions the --store already has an accuracy result for')
+def accuracy(input, output, quiet, model, concurrency, batch_api, no_local_check, only_unevaluated):
+    """Evaluate mathematical accuracy of questions"""
+    from commands.runtime import start_run
+    from models.question import iter_valid_questions
+    from evaluators.accuracy import AccuracyEvaluator
+    from utils.display import display_section_header, display_question, display_evaluation
+    from utils.store import get_store, select_questions, StoreWriter, ACCURACY
+    from utils.telemetry import telemetry
+    
+    start_run()
+    
+    question_store = get_store()
+    if question_store is None and (input is None or only_unevaluated):
+        raise click.UsageError("Pass --store before the command name to read questions from it or skip evaluated ones")
+    
+    try:
+        # Determine model to use
+        model_name = model or get_default_model()
+        if not quiet:
+            click.echo(f"Using model: {model_name}")
+        
+        # Stream questions from the file, or from the store, skipping invalid records
+        click.echo(f"Loading questions from {input or question_store.path}...")
+        
+        def skip_invalid(index, error):
+            click.echo(f"Warning: skipping invalid question {index + 1}: {error}", err=True)
+        
+        loaded = iter_valid_questions(select_questions(input, question_store, ACCURACY, only_unevaluated),
+                                      on_invalid=skip_invalid)
+        
+        # Evaluate questions concurrently (or as one message batch), displaying each result as it finishes
+        click.echo("Evaluating accuracy...")
+        evaluator = AccuracyEvaluator(model=model_name, local_verification=not no_local_check)
+        # (index, record, question) of the questions being evaluated, by submission order; only those in flight are held
+        in_flight = {}
+        if batch_api:
+            # One batch submission needs every question up front
+            click.echo("Submitting message batch and waiting for results...")
+            in_flight = dict(enumerate(loaded))
+            completed = enumerate(evaluator.evaluate_batch([question for _, _, question in in_flight.values()]))
+        else:
+            def questions():
+                for position, loaded_question in enumerate(loaded):
+                    in_flight[position] = loaded_question
+                    yield loaded_question[2]
+            completed = evaluator.evaluate_many(questions(), concurrency=concurrency)
+        total = 0
+        correct_count = 0
+        local_count = 0
+        
+        # Completed results are appended to a partial file as they finish, so an
+        # interrupted run keeps its work, and the output is assembled from it
+        partial_path = f"{output}.partial.jsonl" if output else None
+        partial_file = open(partial_path, 'w') if partial_path else None
+        store_writer = (StoreWriter(question_store, run_id=telemetry.run_id, evaluation_model=model_name,
+                                    validated=True)
+                        if question_store else None)
+        
+        try:
+            for position, result in completed:
+                index, record, question = in_flight.pop(position)
+                total += 1
+                
+                if not quiet:
+                    display_question(question, index + 1)
+                
+                if result['correct']:
+                    correct_count += 1
+                if result.get('verified_locally'):
+                    local_count += 1
+                
+                if not quiet:
+                    display_evaluation(result)
+                
+                if partial_file:
+                    partial_file.write(json.dumps({
+                        "index": index,
+                        "question": question.question,
+                        "choices": question.choices,
+                        "answer": question.answer,
+                        "evaluation": result
+                    }) + "\n")
+                    partial_file.flush()
+                if store_writer:
+                    store_writer.add(record, {ACCURACY: result})
+        finally:
+            if partial_file:
+                partial_file.close()
+            if store_writer:
+                store_writer.close()
+        
+        if total == 0:
+            click.echo("No questions to evaluate")
+            if partial_path:
+                os.remove(partial_path)
+            return
+        if only_unevaluated:
+            click.echo(f"Evaluated {total} questions that had no accuracy result yet")
+        
+        # Display summary
+        if not quiet or total > 1:
+            display_section_header("ACCURACY EVALUATION SUMMARY")
+            click.echo(f"Total Questions: {total}")
+            click.echo(f"Mathematically Correct: {correct_count} ({correct_count/total*100:.1f}%)")
+            click.echo(f"Verified Locally: {local_count}")
+            click.echo("=" * 50)
+        
+        # Save results if requested, copying them from the partial file one line at a time
+        if output:
+            with open(output, 'w') as f, open(partial_path) as partial_file:
+                f.write('{\n  "results": [')
+                for i, line in enumerate(partial_file):
+                    f.write(("\n    " if i == 0 else ",\n    ") + line.rstrip("\n"))
+                f.write("\n  ],\n  \"summary\": ")
+                json.dump({
+                    "total": total,
+                    "correct": correct_count,
+                    "accuracy_rate": correct_count/total,
+                    "verified_locally": local_count
+                }, f)
+                f.write("\n}\n")
+            os.remove(partial_path)
+            click.echo(f"\nResults saved to: {output}")
+            
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
@@ -0,0 +1,108 @@
+import click
+import json
+
+from config import get_default_model, DEFAULT_CONCURRENCY
+
+
+@click.command()
+@click.option('--input', '-i', type=click.Path(exists=True),
+              help='Input JSON or JSONL file with generated questions [default: generated questions in --store]')
+@click.option('--real-questions', '-r', type=click.Path(exists=True), default='data/real_questions.json', help='Real questions JSON file')
+@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
+@click.option('--model', '-m', type=str, help='Claude model to use')
+@click.option('--seed', type=int, help='Random seed for shuffling, for reproducible runs')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent judgements')
+@click.option('--batch-api', is_flag=True, help='Submit all judgements as one Message Batches API request')
+@click.option('--only-unevaluated', is_flag=True, help='Skip questions the --store already has an authenticity result for')
+def authenticity(input, real_questions, output, model, seed, concurrency, batch_api, only_unevaluated):
+    """Test how well generated questions match real SAT questions"""
+    from commands.runtime import start_run
+    from models.question import iter_valid_questions
+    from evaluators.authenticity import AuthenticityEvaluator
+    from utils.display import display_section_header, display_authenticity_summary
+    from utils.io import sample_question_records
+    from utils.store import get_store, select_questions, StoreWriter, AUTHENTICITY, REAL
+    from utils.telemetry import telemetry
+    
+    start_run()
+    
+    question_store = get_store()
+    if question_store is None and (input is None or only_unevaluated):
+        raise click.UsageError("Pass --store before the command name to read questions from it or skip evaluated ones")
+    
+    try:
+        # Determine model to use
+        model_name = model or get_default_model()
+        click.echo(f"Using model: {model_name}")
+        
+        # Load generated questions from the file, or from the store, skipping invalid records
+        click.echo(f"Loading generated questions from {input or question_store.path}...")
+        
+        def skip_invalid(index, error):
+            click.echo(f"Warning: skipping invalid question {index + 1}: {error}", err=True)
+        
+        # Every generated question is judged and reported, so they are kept, each with its record
+        generated = list(iter_valid_questions(
+            select_questions(input, question_store, AUTHENTICITY, only_unevaluated), on_invalid=skip_invalid
+        ))
+        
+        # Sample as many real questions as there are generated ones, streaming the file
+        click.echo(f"Sampling real questions from {real_questions}...")
+        real_qs = sample_question_records(real_questions, len(generated), seed=seed)
+        
+        # Use the minimum count between real and generated questions
+        count = min(len(real_qs), len(generated))
+        if len(real_qs) != len(generated):
+            click.echo(f"Using {count} questions (minimum of {len(real_qs)} real and {len(generated)} generated)")
+        real_qs = real_qs[:count]
+        
+        # Record each judgement with its question, real or generated, as it finishes
+        generated_writer = real_writer = None
+        if question_store:
+            generated_writer = StoreWriter(question_store, run_id=telemetry.run_id, evaluation_model=model_name,
+                                           validated=True)
+            real_writer = StoreWriter(question_store, REAL, run_id=telemetry.run_id, evaluation_model=model_name)
+        
+        def store_prediction(prediction):
+            if not question_store:
+                return
+            kind, index = prediction["id"].split("_")
+            judgement = {"predicted_real": prediction["predicted_real"], "correct": prediction["correct"]}
+            if kind == "gen":
+                generated_writer.add(generated[int(index)][1], {AUTHENTICITY: judgement})
+            else:
+                real_writer.add(real_qs[int(index)], {AUTHENTICITY: judgement})
+        
+        # Run authenticity evaluation
+        click.echo("\nRunning authenticity evaluation...")
+        evaluator = AuthenticityEvaluator(model=model_name)
+        try:
+            results = evaluator.evaluate(real_qs, (question for _, _, question in generated), seed=seed,
+                                         concurrency=concurrency, use_batch_api=batch_api,
+                                         on_prediction=store_prediction)
+        finally:
+            if question_store:
+                generated_writer.close()
+                real_writer.close()
+        
+        # Display results
+        display_section_header("AUTHENTICITY TEST RESULTS")
+        
+        display_authenticity_summary(results['summary'])
+        
+        click.echo("=" * 50)
+        
+        # Save results if requested
+        if output:
+            with open(output, 'w') as f:
+                json.dump(results, f, indent=2)
+            click.echo(f"\nResults saved to: {output}")
+        
+    except FileNotFoundError:
+        click.echo(f"Error: Real questions file not found at {real_questions}", err=True)
+        click.echo("Please run 'python main.py extract' first to generate the real questions dataset.", err=True)
+        raise click.Abort()
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
@@ -0,0 +1,12 @@
+import click
+
+from commands.lazy_group import LazyGroup
+
+
+@click.group(cls=LazyGroup, lazy_subcommands={
+    'accuracy': 'commands.accuracy.accuracy',
+    'authenticity': 'commands.authenticity.authenticity',
+    'similarity': 'commands.similarity.similarity',
+})
+def evaluate():
+    """Evaluate generated questions using various metrics"""
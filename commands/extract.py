@@ -0,0 +1,110 @@
+import click
+
+from config import get_default_model, DEFAULT_CONCURRENCY, DEFAULT_MAX_INFLIGHT_BYTES, DEFAULT_PAGES_PER_REQUEST
+
+
+@click.command()
+@click.option('--input', '-i', type=click.Path(exists=True), default='data/Algebra',
+              help='Input directory containing PDF files')
+@click.option('--output', '-o', type=click.Path(), default='data/real_questions.json',
+              help='Output JSON file')
+@click.option('--limit', '-l', type=int, help='Limit number of PDFs to process')
+@click.option('--model', '-m', type=str, help='Claude model to use')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of PDFs, and of extraction requests, in flight at once')
+@click.option('--max-inflight-mb', type=click.IntRange(min=1), default=DEFAULT_MAX_INFLIGHT_BYTES // (1024 * 1024),
+              help='Maximum total request payload (MB) of PDFs processed at once')
+@click.option('--pages-per-request', type=click.IntRange(min=0), default=DEFAULT_PAGES_PER_REQUEST,
+              help='PDF pages sent per extraction request (0 sends each PDF whole)')
+@click.option('--manifest', type=click.Path(dir_okay=False),
+              help='Extraction manifest file [default: <output>.manifest.json]')
+@click.option('--force', is_flag=True, help='Re-extract every PDF, even if unchanged since the last run')
+def extract(input, output, limit, model, concurrency, max_inflight_mb, pages_per_request, manifest, force):
+    """Extract SAT questions from PDF files"""
+    from commands.runtime import start_run
+    from extractors.pdf_extractor import get_pdf_files, extract_questions_from_pdfs
+    from extractors.manifest import ExtractionManifest
+    from utils.client import get_client
+    from utils.io import write_json_atomic
+    from utils.store import get_store, REAL
+    from utils.telemetry import telemetry
+    
+    start_run()
+    
+    try:
+        # Determine model to use
+        model_name = model or get_default_model()
+        click.echo(f"Using model: {model_name}")
+        
+        # Shared, pooled Anthropic client
+        client = get_client()
+        
+        # Get all PDF files
+        pdf_files = get_pdf_files(input)
+        
+        click.echo(f"Found {len(pdf_files)} PDF files in {input}")
+        
+        if limit:
+            pdf_files = pdf_files[:limit]
+            click.echo(f"Processing first {limit} files")
+        
+        # Skip PDFs whose content and model match the manifest from a previous run
+        manifest = ExtractionManifest(manifest or f"{output}.manifest.json")
+        fingerprints = {pdf_file: manifest.fingerprint(pdf_file) for pdf_file in pdf_files}
+        pending_files = [
+            pdf_file for pdf_file in pdf_files
+            if force or not manifest.is_current(pdf_file, fingerprints[pdf_file], model_name)
+        ]
+        
+        if len(pending_files) < len(pdf_files):
+            click.echo(f"Skipping {len(pdf_files) - len(pending_files)} unchanged files")
+        
+        question_store = get_store()
+        
+        # Process PDFs in parallel; each finished file is journalled right away,
+        # so an interrupted run resumes from where it stopped
+        completed = 0
+        failed = 0
+        
+        def save_progress(index, pdf_file, questions, error):
+            nonlocal completed, failed
+            completed += 1
+            if error is not None:
+                failed += 1
+                click.echo(f"[{completed}/{len(pending_files)}] {pdf_file}: failed ({error})")
+                return
+            
+            manifest.record(pdf_file, fingerprints[pdf_file], model_name, questions)
+            if question_store:
+                question_store.add_questions(questions, source=REAL, model=model_name, run_id=telemetry.run_id)
+            click.echo(f"[{completed}/{len(pending_files)}] {pdf_file}: extracted {len(questions)} questions")
+        
+        try:
+            extract_questions_from_pdfs(
+                client,
+                pending_files,
+                model_name,
+                max_workers=concurrency,
+                max_inflight_bytes=max_inflight_mb * 1024 * 1024,
+                pages_per_request=pages_per_request,
+                # Ranges split into single pages on earlier runs go straight to single pages
+                split_ranges={pdf_file: manifest.splits(pdf_file, fingerprints[pdf_file]) for pdf_file in pending_files},
+                on_split=lambda pdf_file, first, last: manifest.record_split(pdf_file, fingerprints[pdf_file], first, last),
+                on_progress=save_progress
+            )
+        finally:
+            # The manifest and output are written in full once, even if the run is interrupted
+            manifest.save()
+            # Questions from every extracted PDF, in file order so the output is deterministic
+            all_questions = manifest.questions()
+            write_json_atomic(output, all_questions, indent=2, ensure_ascii=False)
+        
+        if failed:
+            click.echo(f"\n{failed} files failed and will be retried on the next run", err=True)
+        click.echo(f"\nSaved {len(all_questions)} questions to {output}")
+        if question_store:
+            click.echo(f"Added extracted questions to the store: {question_store.path}")
+        
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
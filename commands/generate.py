@@ -0,0 +1,130 @@
+import click
+import json
+
+from config import get_default_model, DEFAULT_CONCURRENCY
+
+
+@click.command()
+@click.option('--count', '-n', default=1, help='Number of questions to generate')
+@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
+@click.option('--quiet', is_flag=True, help='Only show summary, suppress individual question display')
+@click.option('--model', '-m', type=str, help='Claude model to use')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent API requests')
+@click.option('--seed', type=int, help='Seed that makes the run reproducible by reusing cached responses')
+@click.option('--stream', is_flag=True,
+              help='Stream responses and show each question as soon as it is parsed (in arrival order)')
+@click.option('--accurate', type=click.IntRange(min=1),
+              help='Keep generating until this many questions are evaluated as correct (replaces --count)')
+@click.option('--eval-concurrency', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent accuracy evaluations, with --accurate')
+@click.option('--format', 'output_format', type=click.Choice(['json', 'jsonl']),
+              help='Output file format [default: jsonl for .jsonl files, otherwise json]')
+def generate(count, output, quiet, model, concurrency, seed, stream, accurate, eval_concurrency, output_format):
+    """Generate SAT math question(s)"""
+    from commands.runtime import start_run
+    from generators.question_generator import QuestionGenerator
+    from utils.display import display_question, display_evaluation
+    from utils.io import is_jsonl_path, JsonlWriter
+    from utils.store import get_store, StoreWriter, GENERATED, ACCURACY
+    from utils.telemetry import telemetry
+    
+    start_run()
+    
+    try:
+        # Determine model to use
+        model_name = model or get_default_model()
+        if not quiet:
+            click.echo(f"Using model: {model_name}")
+        
+        # Generate question(s)
+        generator = QuestionGenerator(model=model_name, seed=seed, stream=stream)
+        
+        if accurate:
+            from evaluators.accuracy import AccuracyEvaluator
+            
+            # Generated questions are evaluated as they arrive and only correct ones are kept
+            count = accurate
+            evaluator = AccuracyEvaluator(model=model_name)
+            questions = generator.iter_accurate_questions(accurate, evaluator, concurrency=concurrency,
+                                                          eval_concurrency=eval_concurrency)
+            if not quiet:
+                click.echo(f"Generating until {count} SAT math questions are evaluated as correct...")
+        else:
+            questions = ((question, None) for question in generator.iter_questions(count, concurrency=concurrency))
+            if not quiet:
+                click.echo(f"Generating {count} SAT math questions...")
+        
+        # JSONL output is written as each batch is parsed; JSON output is written at the end
+        output_format = output_format or ('jsonl' if output and is_jsonl_path(output) else 'json')
+        writer = JsonlWriter(output) if output and output_format == 'jsonl' else None
+        question_store = get_store()
+        store_writer = (StoreWriter(question_store, GENERATED, model_name, telemetry.run_id, validated=True)
+                        if question_store else None)
+        
+        # Process and display questions as each batch arrives (batching handled internally)
+        results = []
+        generated = 0
+        
+        try:
+            for question, evaluation in questions:
+                generated += 1
+                result = {
+                    "id": question.id,
+                    "question": question.question,
+                    "choices": question.choices,
+                    "answer": question.answer
+                }
+                if question.topic:
+                    result["topic"] = question.topic
+                if evaluation is not None:
+                    result["evaluation"] = evaluation
+                if store_writer:
+                    store_writer.add(result, {ACCURACY: evaluation})
+                
+                if not quiet:
+                    display_question(question, generated, count)
+                    if evaluation is not None:
+                        display_evaluation(evaluation)
+                
+                if writer:
+                    writer.write(result)
+                else:
+                    results.append(result)
+        finally:
+            if writer:
+                writer.close()
+            if store_writer:
+                store_writer.close()
+        
+        # Report chunks that failed; the remaining questions are still usable
+        for error in generator.errors:
+            click.echo(f"Warning: {error}", err=True)
+        if generator.rejected:
+            click.echo(f"Regenerated {len(generator.rejected)} questions that failed validation", err=True)
+        if generator.truncated:
+            click.echo(f"{generator.truncated} responses hit the output token limit; "
+                       f"their complete questions were kept and the rest requested again", err=True)
+        if generated == 0 and generator.errors:
+            raise ValueError(generator.errors[0])
+        if accurate:
+            stats = generator.accuracy_stats
+            rate = stats['correct'] / stats['evaluated'] if stats['evaluated'] else 0
+            click.echo(f"Generated {stats['generated']} questions in {stats['batches']} batches to get {generated} "
+                       f"correct ({stats['correct']}/{stats['evaluated']} evaluated correct, {rate*100:.1f}%); "
+                       f"{stats['abandoned']} in flight were abandoned", err=True)
+        if generated < count:
+            click.echo(f"Warning: generated {generated} of {count} requested questions", err=True)
+        
+        # Save to file if requested
+        if output:
+            if not writer:
+                with open(output, 'w') as f:
+                    json.dump(results, f, indent=2)
+            click.echo(f"\nResults saved to: {output}")
+        if store_writer:
+            click.echo(f"Added {store_writer.count} questions to the store: {question_store.path}")
+            
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
@@ -0,0 +1,34 @@
+import importlib
+from typing import Dict, List, Optional
+
+import click
+
+
+class LazyGroup(click.Group):
+    """
+    Click group whose subcommands are imported only when they are used.
+
+    `lazy_subcommands` maps each command name to the "module.attribute" path
+    of its command object. Listing commands in `--help` still imports their
+    modules, so command modules import anthropic, pydantic and the project
+    packages inside the command function rather than at module level.
+    """
+
+    def __init__(self, *args, lazy_subcommands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_subcommands:
+            return self._load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        module_name, attribute = self.lazy_subcommands[cmd_name].rsplit(".", 1)
+        command = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"Lazy subcommand {cmd_name} is not a click command: {command!r}")
+        return command
@@ -0,0 +1,261 @@
+import click
+import json
+import os
+import time
+
+from config import get_default_model, DEFAULT_CONCURRENCY, DEFAULT_PIPELINE_QUEUE_SIZE
+
+
+@click.command()
+@click.option('--count', '-n', default=1, help='Number of questions to generate')
+@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
+@click.option('--real-questions', '-r', type=click.Path(), default='data/real_questions.json',
+              help='Real questions JSON file for the authenticity stage')
+@click.option('--quiet', is_flag=True, help='Show summary only')
+@click.option('--model', '-m', type=str, help='Claude model to use')
+@click.option('--seed', type=int, help='Seed for reproducible generation and real question sampling')
+@click.option('--stream', is_flag=True, help='Stream generation so questions enter evaluation as soon as they are parsed')
+@click.option('--generate-concurrency', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent generation requests')
+@click.option('--accuracy-concurrency', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent accuracy evaluations')
+@click.option('--authenticity-concurrency', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY,
+              help='Maximum number of concurrent authenticity judgements')
+@click.option('--queue-size', type=click.IntRange(min=1), default=DEFAULT_PIPELINE_QUEUE_SIZE,
+              help='Questions each stage may have waiting before the stage before it blocks')
+@click.option('--no-local-check', is_flag=True, help='Send every question to the LLM, skipping the local verifier')
+@click.option('--no-authenticity', is_flag=True, help='Skip the authenticity stage')
+def pipeline(count, output, real_questions, quiet, model, seed, stream, generate_concurrency, accuracy_concurrency,
+             authenticity_concurrency, queue_size, no_local_check, no_authenticity):
+    """Generate questions and evaluate them as they arrive, in one run"""
+    from commands.runtime import start_run
+    from generators.question_generator import QuestionGenerator
+    from evaluators.accuracy import AccuracyEvaluator
+    from evaluators.authenticity import AuthenticityEvaluator
+    from prompts.evaluation_prompts import get_accuracy_prompt
+    from utils.display import (
+        display_section_header, display_question, display_evaluation, display_authenticity_summary
+    )
+    from utils.io import sample_question_records
+    from utils.pipeline import Stage, run_pipeline
+    from utils.store import get_store, StoreWriter, GENERATED, REAL, ACCURACY, AUTHENTICITY
+    from utils.telemetry import telemetry
+
+    start_run()
+
+    try:
+        # Determine model to use
+        model_name = model or get_default_model()
+        if not quiet:
+            click.echo(f"Using model: {model_name}")
+
+        # Load the real questions up front, so a missing file fails before anything is generated
+        real_sample = []
+        if not no_authenticity:
+            real_sample = sample_question_records(real_questions, count, seed=seed)
+
+        generator = QuestionGenerator(model=model_name, seed=seed, stream=stream)
+        accuracy_evaluator = AccuracyEvaluator(model=model_name, local_verification=not no_local_check)
+        authenticity_evaluator = AuthenticityEvaluator(model=model_name)
+
+        def source():
+            # Each generated question is followed by one real question, so the
+            # authenticity judge sees both kinds at the same rate
+            real = iter(real_sample)
+            for question in generator.iter_questions(count, concurrency=generate_concurrency):
+                yield {"kind": "generated", "question": question}
+                real_question = next(real, None)
+                if real_question is not None:
+                    yield {"kind": "real", "question": real_question}
+
+        def check_locally(record):
+            if record["kind"] == "generated":
+                record["evaluation"] = accuracy_evaluator.verify_locally(record["question"])
+            return record
+
+        def check_accuracy(record):
+            if record["kind"] == "generated" and record.get("evaluation") is None:
+                try:
+                    content = accuracy_evaluator.call_api(get_accuracy_prompt(record["question"]))
+                    record["evaluation"] = accuracy_evaluator.parse_result(content)
+                except Exception as e:
+                    record["error"] = f"Accuracy evaluation failed: {e}"
+            return record
+
+        def check_authenticity(record):
+            question = record["question"]
+            if record["kind"] == "generated":
+                question = {"question": question.question, "choices": question.choices}
+            try:
+                record["predicted_real"] = authenticity_evaluator.predict_real(question)
+            except Exception as e:
+                record["error"] = f"Authenticity judgement failed: {e}"
+            return record
+
+        stages = []
+        if not no_local_check:
+            stages.append(Stage("local check", check_locally, queue_size=queue_size))
+        stages.append(Stage("accuracy", check_accuracy, accuracy_concurrency, queue_size))
+        if not no_authenticity:
+            stages.append(Stage("authenticity", check_authenticity, authenticity_concurrency, queue_size))
+
+        if not quiet:
+            click.echo(f"Generating and evaluating {count} SAT math questions...")
+
+        # Completed records are appended to a partial file so an interrupted run keeps its work
+        partial_path = f"{output}.partial.jsonl" if output else None
+        partial_file = open(partial_path, 'w') if partial_path else None
+
+        # Generated and real questions go to the store with their evaluations
+        question_store = get_store()
+        store_writers = {
+            "generated": StoreWriter(question_store, GENERATED, model_name, telemetry.run_id, model_name, validated=True),
+            "real": StoreWriter(question_store, REAL, run_id=telemetry.run_id, evaluation_model=model_name)
+        } if question_store else {}
+        
+        generated = []
+        real = []
+        errors = []
+        started = time.perf_counter()
+
+        try:
+            for record in run_pipeline(source(), stages):
+                if record.get("error"):
+                    errors.append(record["error"])
+
+                if record["kind"] == "real":
+                    question = record["question"]
+                    result = {
+                        "question": question.get("question", ""),
+                        "choices": question["choices"],
+                        "predicted_real": record.get("predicted_real")
+                    }
+                    real.append(result)
+                    # The original record, so the store keeps the answer too
+                    stored, evaluations = question, {}
+                else:
+                    question = record["question"]
+                    result = {
+                        "id": question.id,
+                        "question": question.question,
+                        "choices": question.choices,
+                        "answer": question.answer,
+                        "evaluation": record.get("evaluation"),
+                        "predicted_real": record.get("predicted_real")
+                    }
+                    if question.topic:
+                        result["topic"] = question.topic
+                    generated.append(result)
+                    stored, evaluations = result, {ACCURACY: result["evaluation"]}
+
+                    if not quiet:
+                        display_question(question, len(generated), count)
+                        if result["evaluation"]:
+                            display_evaluation(result["evaluation"])
+                        if result["predicted_real"] is not None:
+                            click.echo(f"Judged as: {'real' if result['predicted_real'] else 'generated'}")
+
+                if partial_file:
+                    partial_file.write(json.dumps({"kind": record["kind"], **result}) + "\n")
+                    partial_file.flush()
+                
+                if store_writers:
+                    if result["predicted_real"] is not None:
+                        evaluations[AUTHENTICITY] = {
+                            "predicted_real": result["predicted_real"],
+                            "correct": result["predicted_real"] == (record["kind"] == "real")
+                        }
+                    store_writers[record["kind"]].add(stored, evaluations)
+        finally:
+            if partial_file:
+                partial_file.close()
+            for writer in store_writers.values():
+                writer.close()
+
+        elapsed = time.perf_counter() - started
+
+        # Report chunks and evaluations that failed; everything else is still usable
+        for error in generator.errors + errors:
+            click.echo(f"Warning: {error}", err=True)
+        if generator.rejected:
+            click.echo(f"Regenerated {len(generator.rejected)} questions that failed validation", err=True)
+        if generator.truncated:
+            click.echo(f"{generator.truncated} responses hit the output token limit; "
+                       f"their complete questions were kept and the rest requested again", err=True)
+        if not generated and generator.errors:
+            raise ValueError(generator.errors[0])
+
+        # Accuracy over the questions that were evaluated
+        evaluated = [q for q in generated if q["evaluation"]]
+        correct_count = sum(1 for q in evaluated if q["evaluation"]["correct"])
+        local_count = sum(1 for q in evaluated if q["evaluation"].get("verified_locally"))
+
+        # Authenticity over the questions that were judged
+        predictions = [
+            {"is_real": is_real, "correct": q["predicted_real"] == is_real}
+            for is_real, questions in ((False, generated), (True, real))
+            for q in questions
+            if q["predicted_real"] is not None
+        ]
+        authenticity_summary = authenticity_evaluator.summarize(predictions) if not no_authenticity else None
+
+        stage_stats = {
+            stage.name: {
+                "processed": stage.processed,
+                "concurrency": stage.concurrency,
+                "busy_time": stage.busy_time,
+                "max_queue_depth": stage.max_queue_depth
+            }
+            for stage in stages
+        }
+
+        # Display the combined report
+        display_section_header("PIPELINE SUMMARY")
+        click.echo(f"Questions Generated: {len(generated)} of {count} in {elapsed:.1f}s "
+                   f"({len(generated) / elapsed if elapsed else 0:.1f} questions/s)")
+        if evaluated:
+            click.echo(f"Mathematically Correct: {correct_count} / {len(evaluated)} "
+                       f"({correct_count / len(evaluated) * 100:.1f}%)")
+            click.echo(f"Verified Locally: {local_count}")
+        if authenticity_summary:
+            click.echo("\nAuthenticity:")
+            display_authenticity_summary(authenticity_summary)
+        click.echo("\nStages:")
+        for name, stats in stage_stats.items():
+            click.echo(f"- {name}: {stats['processed']} items, {stats['concurrency']} workers, "
+                       f"{stats['busy_time']:.1f}s busy, up to {stats['max_queue_depth']} waiting")
+        click.echo("=" * 50)
+
+        # Save results if requested
+        if output:
+            with open(output, 'w') as f:
+                json.dump({
+                    "questions": generated,
+                    "real_questions": real,
+                    "summary": {
+                        "generated": len(generated),
+                        "requested": count,
+                        "elapsed": elapsed,
+                        "accuracy": {
+                            "evaluated": len(evaluated),
+                            "correct": correct_count,
+                            "accuracy_rate": correct_count / len(evaluated) if evaluated else 0,
+                            "verified_locally": local_count
+                        },
+                        "authenticity": authenticity_summary,
+                        "stages": stage_stats
+                    }
+                }, f, indent=2)
+            os.remove(partial_path)
+            click.echo(f"\nResults saved to: {output}")
+        if question_store:
+            click.echo(f"Added {store_writers['generated'].count + store_writers['real'].count} questions "
+                       f"to the store: {question_store.path}")
+
+    except FileNotFoundError:
+        click.echo(f"Error: Real questions file not found at {real_questions}", err=True)
+        click.echo("Please run 'python main.py extract' first, or pass --no-authenticity.", err=True)
+        raise click.Abort()
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
@@ -0,0 +1,74 @@
+import click
+
+
+def start_run():
+    """
+    Set up the process for the command about to run, from the top-level CLI options.
+
+    Every command calls this first. By then click has parsed all of the
+    arguments, so --help and usage errors never load .env, import the SDK or
+    open the cache and store. Runs once per process, however deeply the
+    command is nested.
+    """
+    ctx = click.get_current_context()
+    root = ctx.find_root()
+    if root.meta.get("run_started"):
+        return
+    root.meta["run_started"] = True
+
+    from dotenv import load_dotenv
+    from utils.cache import configure_cache
+    from utils.client import configure_client, close_clients
+    from utils.scheduler import configure_scheduler
+    from utils.store import configure_store
+    from utils.telemetry import telemetry
+
+    options = root.params
+    load_dotenv()
+
+    # The command's name below the CLI itself, e.g. "evaluate accuracy"
+    names = []
+    while ctx.parent is not None:
+        names.append(ctx.info_name)
+        ctx = ctx.parent
+    telemetry.command = " ".join(reversed(names))
+
+    # Runs on success and on failure alike, so aborted runs still report what they spent
+    root.call_on_close(lambda: report_run(options["metrics_jsonl"], options["metrics_prom"]))
+    root.call_on_close(close_clients)
+    configure_cache(options["cache_dir"], enabled=not options["no_cache"])
+    configure_store(options["store_path"])
+    root.call_on_close(lambda: configure_store(None))
+    configure_scheduler(
+        requests_per_minute=options["rpm"],
+        input_tokens_per_minute=options["input_tpm"],
+        output_tokens_per_minute=options["output_tpm"],
+        max_concurrency=options["max_concurrency"],
+        max_retries=options["max_retries"]
+    )
+    configure_client(
+        max_connections=options["max_connections"],
+        max_keepalive_connections=options["max_connections"],
+        timeout=options["timeout"],
+        http2=options["http2"]
+    )
+
+
+def report_run(metrics_jsonl, metrics_prom):
+    """Print response cache counters and per-call API telemetry, and export the metrics"""
+    from utils.cache import current_cache
+    from utils.telemetry import telemetry
+
+    # Only a cache this run actually used
+    cache = current_cache()
+    if cache and (cache.hits or cache.misses):
+        stats = cache.stats()
+        click.echo(f"\nResponse cache: {stats['hits']} hits, {stats['misses']} misses", err=True)
+
+    for line in telemetry.report():
+        click.echo(line, err=True)
+
+    if metrics_jsonl:
+        telemetry.write_jsonl(metrics_jsonl)
+    if metrics_prom:
+        telemetry.write_prometheus(metrics_prom)
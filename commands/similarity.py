@@ -0,0 +1,104 @@
+import click
+import json
+
+from config import DEFAULT_SIMILARITY_THRESHOLD
+
+
+@click.command()
+@click.option('--input', '-i', type=click.Path(exists=True),
+              help='Input JSON or JSONL file with generated questions [default: generated questions in --store]')
+@click.option('--real-questions', '-r', type=click.Path(exists=True), default='data/real_questions.json', help='Real questions JSON file')
+@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
+@click.option('--quiet', is_flag=True, help='Show summary only')
+@click.option('--top-k', '-k', type=click.IntRange(min=1), default=3, help='Number of nearest real questions to report')
+@click.option('--threshold', type=click.FloatRange(0, 1), default=DEFAULT_SIMILARITY_THRESHOLD,
+              help='Similarity score above which a question is too similar')
+@click.option('--index', type=click.Path(dir_okay=False), help='Similarity index file [default: <real-questions>.minhash]')
+@click.option('--rebuild-index', is_flag=True, help='Rebuild the similarity index even if it is up to date')
+@click.option('--only-unevaluated', is_flag=True, help='Skip questions the --store already has a similarity result for')
+def similarity(input, real_questions, output, quiet, top_k, threshold, index, rebuild_index, only_unevaluated):
+    """Check that generated questions are not near-copies of real SAT questions"""
+    from commands.runtime import start_run
+    from models.question import iter_valid_questions
+    from evaluators.similarity import SimilarityEvaluator, load_similarity_index
+    from utils.display import display_section_header, display_similarity
+    from utils.store import get_store, select_questions, StoreWriter, SIMILARITY
+    from utils.telemetry import telemetry
+    
+    start_run()
+    
+    question_store = get_store()
+    if question_store is None and (input is None or only_unevaluated):
+        raise click.UsageError("Pass --store before the command name to read questions from it or skip evaluated ones")
+    
+    try:
+        # Load (or build) the near-duplicate index of the real questions
+        click.echo(f"Loading similarity index for {real_questions}...")
+        similarity_index = load_similarity_index(real_questions, index_path=index, rebuild=rebuild_index)
+        click.echo(f"Indexed {len(similarity_index)} real questions")
+        
+        evaluator = SimilarityEvaluator(similarity_index, top_k=top_k, threshold=threshold)
+        results = []
+        too_similar_count = 0
+        total_score = 0.0
+        max_score = 0.0
+        
+        store_writer = StoreWriter(question_store, run_id=telemetry.run_id, validated=True) if question_store else None
+        
+        def skip_invalid(i, error):
+            click.echo(f"Warning: skipping invalid question {i + 1}: {error}", err=True)
+        
+        # Questions are validated a chunk at a time, skipping invalid records from the file or the store
+        loaded = iter_valid_questions(select_questions(input, question_store, SIMILARITY, only_unevaluated),
+                                      on_invalid=skip_invalid)
+        for i, q, question in loaded:
+            result = evaluator.evaluate(question)
+            
+            if not quiet:
+                display_section_header(f"Question {i + 1}:")
+                click.echo(question.format_for_display())
+                display_similarity(result)
+            
+            total_score += result['score']
+            max_score = max(max_score, result['score'])
+            if result['too_similar']:
+                too_similar_count += 1
+            
+            results.append({
+                "id": question.id,
+                "question": question.question,
+                "evaluation": result
+            })
+            if store_writer:
+                store_writer.add(q, {SIMILARITY: result})
+        
+        if store_writer:
+            store_writer.close()
+        
+        # Display summary
+        display_section_header("SIMILARITY EVALUATION SUMMARY")
+        click.echo(f"Total Questions: {len(results)}")
+        if results:
+            click.echo(f"Mean Similarity: {total_score/len(results):.2f}")
+            click.echo(f"Max Similarity: {max_score:.2f}")
+        click.echo(f"Too Similar (> {threshold:.2f}): {too_similar_count}")
+        click.echo("=" * 50)
+        
+        # Save results if requested
+        if output:
+            with open(output, 'w') as f:
+                json.dump({
+                    "results": results,
+                    "summary": {
+                        "total": len(results),
+                        "mean_score": total_score/len(results) if results else 0,
+                        "max_score": max_score,
+                        "threshold": threshold,
+                        "too_similar": too_similar_count
+                    }
+                }, f, indent=2)
+            click.echo(f"\nResults saved to: {output}")
+        
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
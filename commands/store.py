@@ -0,0 +1,105 @@
+import click
+
+EVALUATION_KINDS = ('accuracy', 'authenticity', 'similarity')
+
+# Records validated at a time while importing
+IMPORT_PAGE_SIZE = 1000
+
+
+def _open_store():
+    from commands.runtime import start_run
+    from utils.store import get_store
+
+    start_run()
+    store = get_store()
+    if store is None:
+        raise click.UsageError("No question store; pass --store PATH before the command name")
+    return store
+
+
+@click.group()
+def store():
+    """Import, export and summarise the question store (--store)"""
+
+
+@store.command('import')
+@click.option('--input', '-i', type=click.Path(exists=True), required=True, help='Input JSON or JSONL file with questions')
+@click.option('--source', type=click.Choice(['generated', 'real']), default='generated', help='Where the questions came from')
+@click.option('--model', '-m', type=str, help='Model that generated or extracted the questions')
+def import_questions(input, source, model):
+    """Add the questions in a JSON or JSONL file to the store"""
+    import itertools
+    from models.question import validate_questions
+    from utils.io import iter_question_records
+    from utils.store import StoreWriter
+
+    question_store = _open_store()
+    try:
+        records = iter_question_records(input)
+        skipped = 0
+        # Generated questions are validated below, so they load from the store without it
+        with StoreWriter(question_store, source=source, model=model, validated=source == 'generated') as writer:
+            while True:
+                page = list(itertools.islice(records, IMPORT_PAGE_SIZE))
+                if not page:
+                    break
+                # Invalid generated questions are skipped here, rather than warned about every time they are loaded
+                invalid = validate_questions(page)[1] if source == 'generated' else {}
+                for index, record in enumerate(page):
+                    if index in invalid:
+                        skipped += 1
+                        continue
+                    # Evaluation results exported from the store come back with their question
+                    writer.add(record, record.get('evaluations'))
+        click.echo(f"Imported {writer.count} questions from {input} into {question_store.path}")
+        if skipped:
+            click.echo(f"Skipped {skipped} invalid questions", err=True)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
+@store.command('export')
+@click.option('--output', '-o', type=click.Path(), required=True,
+              help='Output file (JSON, or JSONL for .jsonl files)')
+@click.option('--source', type=click.Choice(['generated', 'real']), help='Only questions from this source')
+@click.option('--topic', type=str, help='Only questions on this topic')
+@click.option('--model', '-m', type=str, help='Only questions generated by this model')
+@click.option('--run', 'run_id', type=str, help='Only questions from this run ID')
+@click.option('--status', 'statuses', multiple=True, metavar='KIND=STATUS',
+              help='Only questions with this evaluation status, e.g. accuracy=correct (repeatable)')
+@click.option('--unevaluated', type=click.Choice(EVALUATION_KINDS), help='Only questions without this evaluation')
+@click.option('--no-evaluations', is_flag=True, help='Leave evaluation results out of the exported records')
+def export_questions(output, source, topic, model, run_id, statuses, unevaluated, no_evaluations):
+    """Write stored questions to a JSON or JSONL file that every command can read"""
+    question_store = _open_store()
+
+    status_filters = {}
+    for status in statuses:
+        kind, _, value = status.partition('=')
+        if kind not in EVALUATION_KINDS or not value:
+            raise click.BadParameter(f"expected KIND=STATUS with KIND one of {', '.join(EVALUATION_KINDS)}",
+                                     param_hint='--status')
+        status_filters[kind] = value
+
+    try:
+        count = question_store.export(output, with_evaluations=not no_evaluations, source=source, topic=topic,
+                                      model=model, run_id=run_id, unevaluated=unevaluated, statuses=status_filters)
+        click.echo(f"Exported {count} questions to {output}")
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort()
+
+
+@store.command('stats')
+def stats():
+    """Show question counts by source and evaluation status"""
+    question_store = _open_store()
+    summary = question_store.stats()
+
+    click.echo(f"Question store: {question_store.path}")
+    for source, count in sorted(summary['questions'].items()):
+        click.echo(f"- {source} questions: {count}")
+    for kind in EVALUATION_KINDS:
+        counts = ", ".join(f"{status} {count}" for status, count in sorted(summary[kind].items()))
+        click.echo(f"- {kind}: {counts or 'no questions'}")
@@ -3,6 +3,67 @@
 # Default model to use if not specified
 DEFAULT_MODEL = "claude-3-7-sonnet-latest"
 
+# Default number of API requests allowed in flight at once
+DEFAULT_CONCURRENCY = 5
+
+# Upper bound on concurrent requests across the whole process; the request
+# scheduler lowers its working limit when the API throttles
+DEFAULT_MAX_CONCURRENCY = 16
+
+# Retries for throttled or transiently failing API requests
+DEFAULT_MAX_RETRIES = 5
+
+# Shared HTTP connection pool of the API clients. The pool is sized above the
+# scheduler's concurrency cap so requests never wait on a connection
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 32
+DEFAULT_KEEPALIVE_EXPIRY = 30.0  # seconds
+
+# API request timeouts in seconds
+DEFAULT_TIMEOUT = 600.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+# Share of generated questions assumed to be correct by `generate --accurate`
+# before any have been evaluated
+DEFAULT_EXPECTED_ACCURACY = 0.8
+
+# `generate --accurate N` gives up after generating this many times N questions
+MAX_OVERGENERATION_FACTOR = 3.0
+
+# Items each stage of the `pipeline` command may have waiting before the
+# stage in front of it blocks
+DEFAULT_PIPELINE_QUEUE_SIZE = 20
+
+# On-disk response cache location and eviction limits
+DEFAULT_CACHE_DIR = ".cache"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds
+
+# Default cap on the base64 payload of all PDFs being extracted at once
+DEFAULT_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024
+
+# Default number of PDF pages sent per extraction request (each question is on its own page)
+DEFAULT_PAGES_PER_REQUEST = 5
+
+# Generated questions scoring above this are too close to a real question
+DEFAULT_SIMILARITY_THRESHOLD = 0.9
+
+# USD per million tokens as (input, output), matched by model name prefix.
+# Cache writes cost 1.25x input, cache reads 0.1x input, and the Message
+# Batches API halves everything.
+MODEL_PRICES = {
+    "claude-opus-4": (15.00, 75.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-3-haiku": (0.25, 1.25),
+}
+CACHE_WRITE_PRICE_MULTIPLIER = 1.25
+CACHE_READ_PRICE_MULTIPLIER = 0.1
+BATCH_PRICE_MULTIPLIER = 0.5
+
 def get_default_model():
     """Get the default model"""
     return DEFAULT_MODEL
\ No newline at end of file
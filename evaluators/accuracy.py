@@ -1,18 +1,79 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from config import DEFAULT_CONCURRENCY
 from models.question import Question
 from prompts.evaluation_prompts import get_accuracy_prompt
-from .base import BaseEvaluator
+from .base import BaseEvaluator, run_concurrently
+from .local_verifier import verify_question, UNDECIDED, VERIFIED_CORRECT
 
 
 class AccuracyEvaluator(BaseEvaluator):
     
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None, local_verification: bool = True):
+        super().__init__(api_key=api_key, model=model)
+        # Questions the local verifier can decide never reach the LLM
+        self.local_verification = local_verification
+    
     def evaluate(self, question: Question) -> Dict[str, any]:
         """Evaluate the mathematical accuracy of a question"""
         
+        local_result = self.verify_locally(question)
+        if local_result is not None:
+            return local_result
+        
         prompt = get_accuracy_prompt(question)
         content = self.call_api(prompt)
         
+        return self.parse_result(content)
+    
+    def evaluate_many(self, questions: Iterable[Question],
+                      concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Tuple[int, Dict[str, any]]]:
+        """
+        Evaluate questions concurrently with a bounded worker pool.
+        
+        Args:
+            questions: Questions to pass to `evaluate` one at a time
+            concurrency: Maximum number of evaluations in flight
+            
+        Yields:
+            (index, result) tuples in completion order, where index is the
+            position of the question in `questions`
+        """
+        yield from run_concurrently(self.evaluate, questions, concurrency)
+    
+    def evaluate_batch(self, questions: List[Question]) -> List[Dict[str, any]]:
+        """Evaluate many questions with a single Message Batches API submission, returning results in order"""
+        
+        results = [self.verify_locally(question) for question in questions]
+        undecided = [i for i, result in enumerate(results) if result is None]
+        
+        if undecided:
+            contents = self.call_api_batch([get_accuracy_prompt(questions[i]) for i in undecided])
+            for i, content in zip(undecided, contents):
+                results[i] = self.parse_result(content)
+        
+        return results
+    
+    def verify_locally(self, question: Question) -> Optional[Dict[str, any]]:
+        """Accuracy result from the deterministic local verifier, or None if it can't decide"""
+        
+        if not self.local_verification:
+            return None
+        
+        verification = verify_question(question)
+        if verification["status"] == UNDECIDED:
+            return None
+        
+        return {
+            "correct": verification["status"] == VERIFIED_CORRECT,
+            "explanation": verification["reason"],
+            "solution_steps": "",
+            "verified_locally": True
+        }
+    
+    def parse_result(self, content: str) -> Dict[str, any]:
+        """Turn the model's response into an accuracy result"""
+        
         try:
             result = self.parse_json_response(content)
             
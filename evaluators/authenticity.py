@@ -1,17 +1,28 @@
 import random
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
+from config import DEFAULT_CONCURRENCY
 from models.question import Question
 from prompts.evaluation_prompts import get_authenticity_prompt
-from .base import BaseEvaluator
+from .base import BaseEvaluator, run_concurrently
 
 
 class AuthenticityEvaluator(BaseEvaluator):
     
-    def evaluate(self, real_questions: List[Dict], generated_questions: List[Question]) -> Dict:
+    def evaluate(self, real_questions: Iterable[Dict], generated_questions: Iterable[Question],
+                 seed: Optional[int] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 use_batch_api: bool = False, on_prediction: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         Evaluate authenticity by mixing real and generated questions and having AI guess which are which.
         
+        Args:
+            real_questions: Real SAT questions as dicts
+            generated_questions: Generated questions
+            seed: Seed for the shuffle, so the same mixed order can be reproduced
+            concurrency: Maximum number of judgements in flight
+            use_batch_api: Submit all judgements as one Message Batches API request
+            on_prediction: Called with each prediction as its judgement finishes
+        
         Returns:
             Dict with:
                 - accuracy: float (0-1), lower is better (harder to distinguish)
@@ -41,38 +52,44 @@ class AuthenticityEvaluator(BaseEvaluator):
             })
         
         # Shuffle to randomize order
-        random.shuffle(mixed_questions)
-        
-        # Evaluate each question
-        predictions = []
-        correct_predictions = 0
-        
-        for q in mixed_questions:
-            # Get AI's prediction
-            prompt = get_authenticity_prompt(q)
-            content = self.call_api(prompt, max_tokens=1000)
-            
-            # Extract prediction
-            try:
-                result = self.parse_json_response(content)
-                predicted_real = result.get("is_real", False)
-            except ValueError:
-                # Fallback to simple text analysis
-                content_lower = content.lower()
-                predicted_real = "real" in content_lower and "generated" not in content_lower
-            
-            predictions.append({
+        random.Random(seed).shuffle(mixed_questions)
+        
+        # Judge questions concurrently (or as one batch); predictions keep the shuffled order
+        predictions = [None] * len(mixed_questions)
+        
+        def record(index: int, predicted_real: bool):
+            q = mixed_questions[index]
+            predictions[index] = {
                 "id": q["id"],
                 "is_real": q["is_real"],
                 "predicted_real": predicted_real,
                 "correct": q["is_real"] == predicted_real
-            })
-            
-            if q["is_real"] == predicted_real:
-                correct_predictions += 1
+            }
+            if on_prediction:
+                on_prediction(predictions[index])
+        
+        if use_batch_api:
+            contents = self.call_api_batch([get_authenticity_prompt(q) for q in mixed_questions], max_tokens=1000)
+            for index, content in enumerate(contents):
+                record(index, self.parse_prediction(content))
+        else:
+            for index, predicted_real in run_concurrently(self.predict_real, mixed_questions, concurrency):
+                record(index, predicted_real)
+        
+        summary = self.summarize(predictions)
+        
+        return {
+            "accuracy": summary["accuracy_percentage"] / 100,
+            "seed": seed,
+            "predictions": predictions,
+            "summary": summary
+        }
+    
+    def summarize(self, predictions: List[Dict]) -> Dict:
+        """Counts and accuracy rates over predictions with `is_real` and `correct` fields"""
         
-        # Calculate statistics
         total = len(predictions)
+        correct_predictions = sum(1 for p in predictions if p["correct"])
         accuracy = correct_predictions / total if total > 0 else 0
         
         real_count = sum(1 for p in predictions if p["is_real"])
@@ -82,21 +99,36 @@ class AuthenticityEvaluator(BaseEvaluator):
         generated_correct = sum(1 for p in predictions if not p["is_real"] and p["correct"])
         
         return {
-            "accuracy": accuracy,
-            "predictions": predictions,
-            "summary": {
-                "total_questions": total,
-                "correct_predictions": correct_predictions,
-                "accuracy_percentage": accuracy * 100,
-                "real_questions": {
-                    "count": real_count,
-                    "correctly_identified": real_correct,
-                    "accuracy": real_correct / real_count if real_count > 0 else 0
-                },
-                "generated_questions": {
-                    "count": generated_count,
-                    "correctly_identified": generated_correct,
-                    "accuracy": generated_correct / generated_count if generated_count > 0 else 0
-                }
+            "total_questions": total,
+            "correct_predictions": correct_predictions,
+            "accuracy_percentage": accuracy * 100,
+            "real_questions": {
+                "count": real_count,
+                "correctly_identified": real_correct,
+                "accuracy": real_correct / real_count if real_count > 0 else 0
+            },
+            "generated_questions": {
+                "count": generated_count,
+                "correctly_identified": generated_correct,
+                "accuracy": generated_correct / generated_count if generated_count > 0 else 0
             }
-        }
\ No newline at end of file
+        }
+    
+    def predict_real(self, question_data: Dict) -> bool:
+        """Ask the model whether a single question is real; returns True if it guesses real"""
+        
+        prompt = get_authenticity_prompt(question_data)
+        content = self.call_api(prompt, max_tokens=1000)
+        
+        return self.parse_prediction(content)
+    
+    def parse_prediction(self, content: str) -> bool:
+        """Extract the model's real/generated guess from its response"""
+        
+        try:
+            result = self.parse_json_response(content)
+            return result.get("is_real", False)
+        except ValueError:
+            # Fallback to simple text analysis
+            content_lower = content.lower()
+            return "real" in content_lower and "generated" not in content_lower
\ No newline at end of file
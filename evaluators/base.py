@@ -1,17 +1,47 @@
+import itertools
 import json
-import os
-from typing import Optional, Dict, Any
-from anthropic import Anthropic
-from dotenv import load_dotenv
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List, Tuple, Union
 
-load_dotenv()
+from config import DEFAULT_CONCURRENCY
+from utils.api import create_message, create_message_batch
+from utils.client import get_client
+
+
+def run_concurrently(func: Callable[[Any], Any], items: Iterable[Any],
+                     concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Tuple[int, Any]]:
+    """
+    Apply `func` to each item on a thread pool, yielding (index, result) as each call finishes.
+    
+    Items are taken from `items` only as calls finish, with at most
+    `concurrency` calls in flight, so a long stream of items is never held in
+    memory at once. The first exception raised by `func` is propagated to the
+    caller and calls that have not started yet are cancelled.
+    """
+    concurrency = max(1, concurrency)
+    items = enumerate(items)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        pending = {executor.submit(func, item): i for i, item in itertools.islice(items, concurrency)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                result = future.result()
+                # Refill the window before handing the result on, so workers don't wait on the caller
+                for i, item in itertools.islice(items, 1):
+                    pending[executor.submit(func, item)] = i
+                yield index, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 class BaseEvaluator:
     """Base class for all evaluators"""
     
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
-        self.client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+        # Shared, pooled client; retries are handled by the shared request scheduler
+        self.client = get_client(api_key)
         self.model = model or "claude-3-7-sonnet-latest"
     
     def parse_json_response(self, content: str) -> Dict[str, Any]:
@@ -46,18 +76,21 @@ class BaseEvaluator:
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(f"Failed to parse JSON from response: {e}")
     
-    def call_api(self, prompt: str, max_tokens: int = 2000) -> str:
+    def call_api(self, prompt: Union[str, List[Dict[str, Any]]], max_tokens: int = 2000) -> str:
         """
         Make an API call to the LLM.
         
         Args:
-            prompt: The prompt to send
+            prompt: The prompt to send, as a string or a list of content blocks
             max_tokens: Maximum tokens in response
             
         Returns:
             Raw response content
+        
+        Identical requests are served from the response cache when it is enabled.
         """
-        response = self.client.messages.create(
+        response = create_message(
+            self.client,
             model=self.model,
             max_tokens=max_tokens,
             messages=[
@@ -65,4 +98,36 @@ class BaseEvaluator:
             ]
         )
         
-        return response.content[0].text
\ No newline at end of file
+        return response.content[0].text
+    
+    def call_api_batch(self, prompts: List[Union[str, List[Dict[str, Any]]]], max_tokens: int = 2000) -> List[str]:
+        """
+        Send many prompts through the Message Batches API.
+        
+        Higher latency than `call_api`, but cheaper and not subject to the
+        synchronous rate limits. Prompts whose batch request errored or expired
+        are retried with `call_api`.
+        
+        Args:
+            prompts: The prompts to send
+            max_tokens: Maximum tokens in each response
+            
+        Returns:
+            Raw response content for each prompt, in order
+        """
+        responses = create_message_batch(
+            self.client,
+            [
+                {
+                    "model": self.model,
+                    "max_tokens": max_tokens,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+                for prompt in prompts
+            ]
+        )
+        
+        return [
+            response.content[0].text if response is not None else self.call_api(prompt, max_tokens=max_tokens)
+            for prompt, response in zip(prompts, responses)
+        ]
\ No newline at end of file
@@ -0,0 +1,402 @@
+import re
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple, Union
+
+from models.question import Question
+
+# Verification outcomes
+VERIFIED_CORRECT = "correct"
+VERIFIED_WRONG = "incorrect"
+UNDECIDED = "undecided"
+
+_UNICODE_OPERATORS = str.maketrans({"−": "-", "–": "-", "×": "*", "·": "*", "÷": "/"})
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<num>\d+(?:,\d{3})*(?:\.\d+)?|\.\d+)
+  | (?P<word>[A-Za-z]+)
+  | (?P<op>[-+*/^()=])
+  | (?P<newline>\s*\n\s*)
+  | (?P<ws>\s+)
+  | (?P<sep>[.,;:?!])
+  | (?P<unknown>.)
+""", re.VERBOSE)
+
+# Tried in order: "value of <expression>?" first, then "value of <variable> satisfies ..."
+_TARGET_PATTERNS = [
+    re.compile(r"\bvalues? of ([^?]+?)\s*\?", re.IGNORECASE),
+    re.compile(r"\bvalues? of ([a-z])\b", re.IGNORECASE),
+]
+_PAIR_TARGET_PATTERN = re.compile(r"\bsolution\s*\(\s*([a-z])\s*,\s*([a-z])\s*\)", re.IGNORECASE)
+_PAIR_CHOICE_PATTERN = re.compile(r"^\(\s*([^,()]+)\s*,\s*([^,()]+)\s*\)$")
+_ASSIGNMENT_CHOICE_PATTERN = re.compile(r"^[a-z]\s*=\s*(.+)$", re.IGNORECASE)
+
+# Words that act on the math next to them, which the parser would otherwise never see
+_OPERATOR_WORDS = {
+    "times", "twice", "half", "double", "triple", "percent", "squared", "cubed", "root",
+    "plus", "minus", "over", "per", "reciprocal", "absolute"
+}
+
+# A linear expression: variable -> coefficient, with the constant term under None
+Linear = Dict[Optional[str], Fraction]
+
+
+class _NotLinear(ValueError):
+    """The text is not a linear expression this verifier can handle"""
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text.translate(_UNICODE_OPERATORS)):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "ws":
+            continue
+        if kind == "newline":
+            # Equations are often stacked on separate lines
+            kind = "sep"
+        if kind == "word":
+            # Single letters are variables; longer words are prose
+            kind = "var" if len(value) == 1 else "word"
+        elif kind == "num":
+            value = value.replace(",", "")
+        tokens.append((kind, value))
+    return tokens
+
+
+class _LinearParser:
+    """Recursive-descent parser of linear expressions with exact rational coefficients"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise _NotLinear("unexpected end of expression")
+        self.pos += 1
+        return token
+
+    def parse(self) -> Linear:
+        if not self.tokens or self.tokens[0] in (("op", "+"), ("op", "*"), ("op", "/"), ("op", ")")):
+            raise _NotLinear("expression starts with an operator")
+        value = self._expression()
+        if self._peek() is not None:
+            raise _NotLinear(f"unexpected token {self._peek()[1]!r}")
+        return value
+
+    def _expression(self) -> Linear:
+        value = self._term()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            sign = 1 if self._take()[1] == "+" else -1
+            value = _add(value, _scale(self._term(), sign))
+        return value
+
+    def _term(self) -> Linear:
+        value = self._unary()
+        while True:
+            token = self._peek()
+            if token == ("op", "*"):
+                self._take()
+                value = _multiply(value, self._unary())
+            elif token == ("op", "/"):
+                self._take()
+                value = _divide(value, self._unary())
+            elif token is not None and (token[0] in ("num", "var") or token == ("op", "(")):
+                # Implicit multiplication, as in 3x or 2(x + 1)
+                value = _multiply(value, self._unary())
+            else:
+                return value
+
+    def _unary(self) -> Linear:
+        if self._peek() == ("op", "-"):
+            self._take()
+            return _scale(self._unary(), -1)
+        return self._power()
+
+    def _power(self) -> Linear:
+        base = self._primary()
+        if self._peek() != ("op", "^"):
+            return base
+        self._take()
+        exponent = self._primary()
+        if not _is_constant(base) or not _is_constant(exponent) or exponent[None].denominator != 1:
+            raise _NotLinear("only constant integer powers are supported")
+        return {None: base[None] ** int(exponent[None])}
+
+    def _primary(self) -> Linear:
+        kind, value = self._take()
+        if kind == "num":
+            return {None: Fraction(value)}
+        if kind == "var":
+            return self._variable(value)
+        if (kind, value) == ("op", "("):
+            inner = self._expression()
+            if self._take() != ("op", ")"):
+                raise _NotLinear("unbalanced parentheses")
+            return inner
+        raise _NotLinear(f"unexpected token {value!r}")
+
+    def _variable(self, name: str) -> Linear:
+        if self._peek() == ("op", "("):
+            # f(x), g(2): function notation rather than a product
+            raise _NotLinear(f"function notation {name}(...)")
+        return {name: Fraction(1)}
+
+
+def _is_constant(value: Linear) -> bool:
+    return all(var is None or coef == 0 for var, coef in value.items())
+
+
+def _add(a: Linear, b: Linear) -> Linear:
+    result = dict(a)
+    for var, coef in b.items():
+        result[var] = result.get(var, Fraction(0)) + coef
+    return result
+
+
+def _scale(value: Linear, factor: Fraction) -> Linear:
+    return {var: coef * factor for var, coef in value.items()}
+
+
+def _multiply(a: Linear, b: Linear) -> Linear:
+    if _is_constant(a):
+        return _scale(b, a.get(None, Fraction(0)))
+    if _is_constant(b):
+        return _scale(a, b.get(None, Fraction(0)))
+    raise _NotLinear("product of two variable terms")
+
+
+def _divide(a: Linear, b: Linear) -> Linear:
+    if not _is_constant(b) or b.get(None, Fraction(0)) == 0:
+        raise _NotLinear("division by a variable or zero")
+    return _scale(a, 1 / b[None])
+
+
+def parse_linear(text: str) -> Linear:
+    """Parse a linear expression such as '3x + 3y' or '1/2 x - 4'"""
+    return _LinearParser(_tokenize(text)).parse()
+
+
+def parse_number(text: str) -> Optional[Fraction]:
+    """Exact value of a numeric answer choice such as '-2.5', '4/3' or '$1,200', or None"""
+    text = text.strip().lstrip("$").strip()
+    match = _ASSIGNMENT_CHOICE_PATTERN.match(text)
+    if match:
+        text = match.group(1)
+    try:
+        value = parse_linear(text)
+    except (_NotLinear, ZeroDivisionError):
+        return None
+    return value.get(None, Fraction(0)) if _is_constant(value) else None
+
+
+def _parse_choice(text: str) -> Union[Fraction, Tuple[Fraction, Fraction], None]:
+    match = _PAIR_CHOICE_PATTERN.match(text.strip())
+    if match:
+        first, second = parse_number(match.group(1)), parse_number(match.group(2))
+        return (first, second) if first is not None and second is not None else None
+    return parse_number(text)
+
+
+def _extract_equations(text: str) -> List[Linear]:
+    """
+    Linear equations (as lhs - rhs) found in runs of math tokens between words and punctuation.
+
+    Runs joined only by words form a clause, which ends at a newline or
+    sentence punctuation. A symbol the parser does not know (√, ², %, |, ...)
+    makes every equation in its clause unparseable, and so does an operator
+    word such as "times" or "squared" for the run next to it, so "√x = 4" or
+    "5% of x = 10" are skipped rather than solved as "x = 4" and "x = 10".
+    """
+    equations = []
+    # (tokens, next to an operator word) for each run of the current clause
+    clause: List[Tuple[List[Tuple[str, str]], bool]] = []
+    run: List[Tuple[str, str]] = []
+    after_operator = False
+
+    def end_run(before_operator: bool = False):
+        if run:
+            clause.append((list(run), after_operator or before_operator))
+            run.clear()
+
+    def end_clause():
+        end_run()
+        if not any(kind == "unknown" for tokens, _ in clause for kind, _ in tokens):
+            for tokens, next_to_operator in clause:
+                if next_to_operator or sum(1 for token in tokens if token == ("op", "=")) != 1:
+                    continue
+                split = tokens.index(("op", "="))
+                try:
+                    lhs = _LinearParser(tokens[:split]).parse()
+                    rhs = _LinearParser(tokens[split + 1:]).parse()
+                    equations.append(_add(lhs, _scale(rhs, -1)))
+                except (_NotLinear, ZeroDivisionError):
+                    pass
+        clause.clear()
+
+    for token in _tokenize(text):
+        kind, value = token
+        if kind == "sep":
+            end_clause()
+            after_operator = False
+        elif kind == "word":
+            operator = value.lower() in _OPERATOR_WORDS
+            if run:
+                end_run(before_operator=operator)
+                after_operator = operator
+            else:
+                # "half of the x": any operator word since the last run counts
+                after_operator = after_operator or operator
+        else:
+            run.append(token)
+    end_clause()
+
+    return equations
+
+
+def _solve(equations: List[Linear]) -> Optional[Dict[str, Fraction]]:
+    """Unique solution of a linear system by Gauss-Jordan elimination, or None"""
+    variables = sorted({var for eq in equations for var, coef in eq.items() if var is not None and coef != 0})
+    if not variables or len(equations) < len(variables):
+        return None
+
+    rows = [[eq.get(var, Fraction(0)) for var in variables] + [-eq.get(None, Fraction(0))] for eq in equations]
+    width = len(variables)
+
+    pivot_row = 0
+    for col in range(width):
+        pivot = next((r for r in range(pivot_row, len(rows)) if rows[r][col] != 0), None)
+        if pivot is None:
+            return None
+        rows[pivot_row], rows[pivot] = rows[pivot], rows[pivot_row]
+        pivot_value = rows[pivot_row][col]
+        rows[pivot_row] = [x / pivot_value for x in rows[pivot_row]]
+        for r in range(len(rows)):
+            if r != pivot_row and rows[r][col] != 0:
+                factor = rows[r][col]
+                rows[r] = [x - factor * y for x, y in zip(rows[r], rows[pivot_row])]
+        pivot_row += 1
+
+    # Leftover equations must reduce to 0 = 0, otherwise the system is inconsistent
+    if any(row[-1] != 0 for row in rows[width:]):
+        return None
+
+    return {var: rows[i][-1] for i, var in enumerate(variables)}
+
+
+def _evaluate(expression: Linear, solution: Dict[str, Fraction]) -> Optional[Fraction]:
+    total = expression.get(None, Fraction(0))
+    for var, coef in expression.items():
+        if var is None or coef == 0:
+            continue
+        if var not in solution:
+            return None
+        total += coef * solution[var]
+    return total
+
+
+def _normalize_choice(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _find_duplicates(question: Question) -> Optional[Tuple[str, str]]:
+    seen: Dict[object, str] = {}
+    for key in sorted(question.choices):
+        text = question.choices[key]
+        value = _parse_choice(text)
+        for identity in (_normalize_choice(text), value):
+            if identity is None:
+                continue
+            if identity in seen:
+                return seen[identity], key
+            seen[identity] = key
+    return None
+
+
+def _compute_target(question: Question) -> Optional[Tuple[str, Union[Fraction, Tuple[Fraction, Fraction]]]]:
+    """Solve the equations in the question and evaluate what it asks for, if both can be understood"""
+    text = question.question.translate(_UNICODE_OPERATORS)
+    solution = _solve(_extract_equations(text))
+    if solution is None:
+        return None
+
+    match = _PAIR_TARGET_PATTERN.search(text)
+    if match:
+        first, second = match.group(1), match.group(2)
+        if first in solution and second in solution:
+            return f"({first}, {second})", (solution[first], solution[second])
+        return None
+
+    for pattern in _TARGET_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        try:
+            expression = parse_linear(match.group(1))
+        except (_NotLinear, ZeroDivisionError):
+            continue
+        value = _evaluate(expression, solution)
+        if value is not None:
+            return match.group(1).strip(), value
+
+    return None
+
+
+def _format_value(value: Union[Fraction, Tuple[Fraction, Fraction]]) -> str:
+    if isinstance(value, tuple):
+        return f"({', '.join(str(v) for v in value)})"
+    return str(value)
+
+
+def verify_question(question: Question) -> Dict[str, str]:
+    """
+    Check a question locally, without an LLM.
+
+    Catches duplicate answer choices, and solves linear equations and
+    systems stated in the question to check the answer key when the question
+    asks for the value of a variable or linear expression (or a solution
+    pair) and the choices are numbers.
+
+    Returns:
+        Dict with:
+            - status: "correct", "incorrect" or "undecided"
+            - reason: Why the question was (or could not be) decided
+    """
+    duplicate = _find_duplicates(question)
+    if duplicate:
+        return {
+            "status": VERIFIED_WRONG,
+            "reason": f"Answer choices {duplicate[0]} and {duplicate[1]} are the same value"
+        }
+
+    target = _compute_target(question)
+    if target is None:
+        return {"status": UNDECIDED, "reason": "Question could not be solved locally"}
+
+    label, value = target
+    choice_values = {key: _parse_choice(question.choices[key]) for key in sorted(question.choices)}
+    matches = [key for key, choice_value in choice_values.items() if choice_value == value]
+    
+    if not matches and all(isinstance(v, type(value)) for v in choice_values.values()):
+        # Every choice is a value of the kind asked for, yet none is the solution
+        return {
+            "status": VERIFIED_WRONG,
+            "reason": f"Solving the equations gives {label} = {_format_value(value)}, which is none of the choices"
+        }
+    if len(matches) != 1:
+        return {"status": UNDECIDED, "reason": f"Computed {label} = {_format_value(value)}, which matches no single choice"}
+
+    if matches[0] == question.answer:
+        return {
+            "status": VERIFIED_CORRECT,
+            "reason": f"Solving the equations gives {label} = {_format_value(value)}, which is choice {matches[0]} only"
+        }
+    return {
+        "status": VERIFIED_WRONG,
+        "reason": f"Solving the equations gives {label} = {_format_value(value)}, which is choice {matches[0]}, "
+                  f"not the stated answer {question.answer}"
+    }
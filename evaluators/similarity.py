@@ -0,0 +1,68 @@
+import os
+from typing import Dict, Optional
+
+from config import DEFAULT_SIMILARITY_THRESHOLD
+from models.question import Question
+from utils.io import iter_question_records, file_sha256
+from utils.minhash import MinHashIndex
+
+
+def load_similarity_index(real_questions_path: str, index_path: Optional[str] = None, rebuild: bool = False) -> MinHashIndex:
+    """
+    Load the near-duplicate index of a real question corpus, building it if needed.
+
+    The index is persisted next to the corpus (or at `index_path`) and rebuilt
+    whenever the corpus file's contents change, or the file is unreadable.
+    """
+    index_path = index_path or f"{real_questions_path}.minhash"
+    fingerprint = file_sha256(real_questions_path)
+
+    if not rebuild and os.path.exists(index_path):
+        try:
+            index = MinHashIndex.load(index_path)
+            if index.fingerprint == fingerprint:
+                return index
+        except (ValueError, OSError):
+            pass
+
+    index = MinHashIndex()
+    for i, q in enumerate(iter_question_records(real_questions_path)):
+        index.add(str(q.get('id', i)), q.get('question', ''))
+    index.fingerprint = fingerprint
+    index.save(index_path)
+
+    return index
+
+
+class SimilarityEvaluator:
+    """
+    Scores how close generated questions are to the real question corpus.
+
+    Unlike the other evaluators this runs entirely locally: it looks up each
+    question in a MinHash/LSH index of the real questions rather than asking
+    an LLM to compare every generated/real pair.
+    """
+
+    def __init__(self, index: MinHashIndex, top_k: int = 3, threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        self.index = index
+        self.top_k = top_k
+        self.threshold = threshold
+
+    def evaluate(self, question: Question) -> Dict[str, any]:
+        """Find the nearest real questions and score similarity in [0, 1] (estimated Jaccard of word 3-grams)"""
+
+        nearest = [
+            {
+                "id": self.index.ids[i],
+                "question": self.index.texts[i],
+                "similarity": similarity
+            }
+            for i, similarity in self.index.query(question.question, top_k=self.top_k)
+        ]
+        score = nearest[0]["similarity"] if nearest else 0.0
+
+        return {
+            "score": score,
+            "too_similar": score > self.threshold,
+            "nearest": nearest
+        }
@@ -0,0 +1,31 @@
+import pytest
+
+from evaluators.base import run_concurrently
+
+
+def test_every_item_is_processed_once():
+    results = dict(run_concurrently(lambda x: x * 2, range(50), concurrency=4))
+    assert results == {i: i * 2 for i in range(50)}
+
+
+def test_items_are_taken_only_as_calls_finish():
+    taken = []
+
+    def items():
+        for i in range(20):
+            taken.append(i)
+            yield i
+
+    for finished, (index, result) in enumerate(run_concurrently(lambda x: x, items(), concurrency=3), 1):
+        assert result == index
+        assert len(taken) <= finished + 3
+
+
+def test_first_error_is_raised():
+    def fail_on_five(x):
+        if x == 5:
+            raise ValueError("five")
+        return x
+
+    with pytest.raises(ValueError, match="five"):
+        list(run_concurrently(fail_on_five, range(10), concurrency=2))
@@ -0,0 +1,62 @@
+from fractions import Fraction
+
+import pytest
+
+from evaluators.local_verifier import (
+    UNDECIDED, VERIFIED_CORRECT, VERIFIED_WRONG, parse_linear, parse_number, verify_question
+)
+from models.question import Question
+
+
+def make_question(text, choices, answer):
+    return Question(question=text, choices=dict(zip("ABCD", choices)), answer=answer)
+
+
+def test_parse_linear_collects_coefficients():
+    assert parse_linear("3x + 2(y - 1) - x/2") == {"x": Fraction(5, 2), "y": Fraction(2), None: Fraction(-2)}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("-2.5", Fraction(-5, 2)),
+    ("4/3", Fraction(4, 3)),
+    ("$1,200", Fraction(1200)),
+    ("x = 7", Fraction(7)),
+    ("2x", None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+def test_linear_equation_confirms_answer():
+    question = make_question("If 3x + 5 = 20, what is the value of 6x?", ["5", "15", "30", "45"], "C")
+    assert verify_question(question)["status"] == VERIFIED_CORRECT
+
+
+def test_linear_equation_rejects_wrong_answer():
+    question = make_question("If 3x + 5 = 20, what is the value of 6x?", ["5", "15", "30", "45"], "B")
+    assert verify_question(question)["status"] == VERIFIED_WRONG
+
+
+def test_system_on_separate_lines():
+    question = make_question("x + y = 10\nx - y = 2\nWhat is the solution (x, y) to the system?",
+                             ["(6, 4)", "(4, 6)", "(5, 5)", "(2, 8)"], "A")
+    assert verify_question(question)["status"] == VERIFIED_CORRECT
+
+
+def test_duplicate_choices_are_wrong():
+    question = make_question("What is the value of x?", ["1/2", "0.5", "2", "3"], "C")
+    assert verify_question(question)["status"] == VERIFIED_WRONG
+
+
+@pytest.mark.parametrize("text, choices, answer", [
+    ("If √x = 4, what is the value of x?", ["2", "4", "8", "16"], "D"),
+    ("If 12 = 3x², what is the value of x?", ["1", "2", "3", "4"], "B"),
+    ("If 5% of x is 10, what is the value of x?", ["2", "10", "50", "200"], "D"),
+    ("If 5% of x = 10, what is the value of x?", ["2", "10", "50", "200"], "D"),
+    ("If |x| = 3, what is the value of x?", ["1", "2", "3", "4"], "C"),
+    ("If 3 times x = 12, what is the value of x?", ["3", "4", "12", "36"], "B"),
+    ("If x = 4 squared, what is the value of x?", ["2", "4", "8", "16"], "D"),
+    ("For the linear function j, j(12) = 18. What is the value of j(10)?", ["15", "18", "39", "40"], "C"),
+])
+def test_unknown_notation_is_left_undecided(text, choices, answer):
+    assert verify_question(make_question(text, choices, answer))["status"] == UNDECIDED
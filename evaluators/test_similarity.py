@@ -0,0 +1,42 @@
+import json
+
+from evaluators.similarity import load_similarity_index
+
+REAL_QUESTIONS = [
+    {"id": "r1", "question": "The perimeter of an isosceles triangle is 83 inches. What is the length of the third side?"},
+    {"id": "r2", "question": "A bakery sells trays of cookies. Each tray contains at least 50 cookies."},
+]
+
+
+def write_corpus(tmp_path, questions=REAL_QUESTIONS):
+    path = tmp_path / "real_questions.json"
+    path.write_text(json.dumps(questions))
+    return str(path)
+
+
+def test_index_is_saved_and_reused(tmp_path):
+    corpus = write_corpus(tmp_path)
+    built = load_similarity_index(corpus)
+    saved = (tmp_path / "real_questions.json.minhash").read_bytes()
+
+    loaded = load_similarity_index(corpus)
+    assert loaded.ids == built.ids == ["r1", "r2"]
+    assert (tmp_path / "real_questions.json.minhash").read_bytes() == saved
+
+
+def test_index_is_rebuilt_when_the_corpus_changes(tmp_path):
+    corpus = write_corpus(tmp_path)
+    load_similarity_index(corpus)
+    write_corpus(tmp_path, REAL_QUESTIONS[:1])
+
+    assert load_similarity_index(corpus).ids == ["r1"]
+
+
+def test_damaged_index_is_rebuilt(tmp_path):
+    corpus = write_corpus(tmp_path)
+    load_similarity_index(corpus)
+    index_path = tmp_path / "real_questions.json.minhash"
+    index_path.write_bytes(index_path.read_bytes()[:40])
+
+    assert load_similarity_index(corpus).ids == ["r1", "r2"]
+    assert load_similarity_index(corpus).ids == ["r1", "r2"]
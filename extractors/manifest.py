@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from utils.io import write_json_atomic, file_sha256
+
+MANIFEST_VERSION = 1
+
+
+class ExtractionManifest:
+    """
+    Record of which PDFs have been extracted, with what model, into which questions.
+    
+    Each entry is keyed by PDF path and stores the file's content hash, size,
+    mtime, the model used and the extracted questions. A PDF only needs to be
+    re-extracted if its content or the model changed.
+    
+    Recorded extractions are appended to a journal (`<path>.partial.jsonl`)
+    as they happen, and the manifest itself is only rewritten by `save`, so
+    a run costs one write per file rather than a full rewrite per file. A
+    journal left by a run that stopped before saving is merged on load.
+    
+    It also remembers which page ranges of a PDF failed and were split into
+    single pages, so later runs request those pages one at a time straight
+    away. Safe to record into from several threads.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = f"{path}.partial.jsonl"
+        self.files: Dict[str, Dict] = {}
+        # PDF path -> {"sha256": ..., "ranges": [[first, last], ...]}
+        self.split_ranges: Dict[str, Dict] = {}
+        self._journal = None
+        self._lock = threading.Lock()
+        
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.files = data.get("files", {})
+                self.split_ranges = data.get("split_ranges", {})
+        
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        recorded = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line of a run that was killed mid-write
+                        continue
+                    if "entry" in recorded:
+                        self.files[recorded["path"]] = recorded["entry"]
+                    else:
+                        self._add_split(recorded["path"], recorded["sha256"], recorded["split"])
+            # Fold it in now, so this run's journal starts empty
+            self.save()
+    
+    def fingerprint(self, pdf_path: Path) -> Dict:
+        """Current size, mtime and content hash of a PDF, reusing the recorded hash if size and mtime are unchanged"""
+        stat = os.stat(pdf_path)
+        entry = self.files.get(str(pdf_path))
+        
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            sha256 = entry["sha256"]
+        else:
+            sha256 = file_sha256(pdf_path)
+        
+        return {"sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime}
+    
+    def is_current(self, pdf_path: Path, fingerprint: Dict, model: str) -> bool:
+        """Whether the PDF was already extracted from the same content with the same model"""
+        entry = self.files.get(str(pdf_path))
+        return bool(entry) and entry["sha256"] == fingerprint["sha256"] and entry["model"] == model
+    
+    def record(self, pdf_path: Path, fingerprint: Dict, model: str, questions: List[Dict]):
+        """Record a completed extraction, replacing any previous entry for the PDF, and journal it"""
+        entry = {
+            **fingerprint,
+            "model": model,
+            "question_ids": [q.get("id") for q in questions],
+            "questions": questions,
+            "extracted_at": time.time()
+        }
+        with self._lock:
+            self.files[str(pdf_path)] = entry
+            self._write_journal({"path": str(pdf_path), "entry": entry})
+    
+    def splits(self, pdf_path: Path, fingerprint: Dict) -> Set[Tuple[int, int]]:
+        """(first, last) page ranges of the PDF that were split into single pages, while its content is unchanged"""
+        with self._lock:
+            recorded = self.split_ranges.get(str(pdf_path))
+            if not recorded or recorded["sha256"] != fingerprint["sha256"]:
+                return set()
+            return {(first, last) for first, last in recorded["ranges"]}
+    
+    def record_split(self, pdf_path: Path, fingerprint: Dict, first: int, last: int):
+        """Record that pages `first` to `last` failed as one request and were split into single pages"""
+        with self._lock:
+            self._add_split(str(pdf_path), fingerprint["sha256"], [first, last])
+            self._write_journal({"path": str(pdf_path), "sha256": fingerprint["sha256"], "split": [first, last]})
+    
+    def _add_split(self, path: str, sha256: str, page_range: List[int]):
+        recorded = self.split_ranges.get(path)
+        if not recorded or recorded["sha256"] != sha256:
+            # The file changed, so its old page ranges no longer apply
+            recorded = self.split_ranges[path] = {"sha256": sha256, "ranges": []}
+        if list(page_range) not in recorded["ranges"]:
+            recorded["ranges"].append(list(page_range))
+    
+    def _write_journal(self, recorded: Dict):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(recorded, ensure_ascii=False) + "\n")
+        self._journal.flush()
+    
+    def questions(self) -> List[Dict]:
+        """All extracted questions, ordered by PDF path"""
+        all_questions = []
+        for pdf_path in sorted(self.files):
+            all_questions.extend(self.files[pdf_path]["questions"])
+        return all_questions
+    
+    def save(self):
+        """Write the whole manifest, replacing the journal"""
+        with self._lock:
+            write_json_atomic(self.path, {"version": MANIFEST_VERSION, "files": self.files,
+                                          "split_ranges": self.split_ranges}, indent=2, ensure_ascii=False)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
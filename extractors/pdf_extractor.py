@@ -1,11 +1,19 @@
+import io
 import os
 import json
+import math
 import base64
+import hashlib
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict
+from typing import Collection, List, Dict, Callable, Optional, Tuple
 from anthropic import Anthropic
 
+from config import DEFAULT_CONCURRENCY, DEFAULT_MAX_INFLIGHT_BYTES, DEFAULT_PAGES_PER_REQUEST
 from prompts.extraction_prompt import get_extraction_prompt
+from utils.api import create_message
+from utils.io import file_sha256
 
 
 def get_pdf_files(directory: str) -> List[Path]:
@@ -15,60 +23,310 @@ def get_pdf_files(directory: str) -> List[Path]:
         for file in files:
             if file.endswith('.pdf'):
                 pdf_files.append(Path(root) / file)
-    return pdf_files
+    # Sort so extraction order (and merged output) doesn't depend on filesystem order
+    return sorted(pdf_files)
 
 
-def extract_questions_from_pdf(client: Anthropic, pdf_path: Path, model: str) -> List[Dict]:
-    """Extract SAT questions from a PDF using Anthropic's API"""
+def _parse_questions(content: str, source: str) -> List[Dict]:
+    """The JSON array of questions in an extraction response"""
+    start_idx = content.find('[')
+    end_idx = content.rfind(']') + 1
+    
+    if start_idx == -1 or end_idx == 0:
+        raise ValueError(f"No valid JSON found in response for {source}")
+    
+    return json.loads(content[start_idx:end_idx])
+
+
+def _request_questions(client: Anthropic, model: str, pdf_content: bytes, source: str,
+                       cache_key_params: Dict) -> List[Dict]:
+    """One extraction request for a PDF, or for some of its pages"""
+    prompt = get_extraction_prompt()
+    parsed = {}
+    
+    def parse(response):
+        parsed["questions"] = _parse_questions(response.content[0].text, source)
+    
+    create_message(
+        client,
+        # Key on the PDF's hash rather than its (large) base64 payload
+        cache_key_params={"prompt": prompt, **cache_key_params},
+        # Only responses that parse are cached, so a failed file or range reaches the API again on retry
+        validate=parse,
+        model=model,
+        max_tokens=4000,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    },
+                    {
+                        "type": "document",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "application/pdf",
+                            "data": base64.b64encode(pdf_content).decode('utf-8')
+                        }
+                    }
+                ]
+            }
+        ]
+    )
+    return parsed["questions"]
+
+
+def extract_questions_from_pdf(client: Anthropic, pdf_path: Path, model: str, raise_errors: bool = False) -> List[Dict]:
+    """
+    Extract SAT questions from a whole PDF in one request using Anthropic's API.
+    
+    Errors are printed and an empty list returned, unless `raise_errors` is set.
+    """
     
     # Read PDF file
     with open(pdf_path, 'rb') as f:
         pdf_content = f.read()
     
-    # Get the extraction prompt
-    prompt = get_extraction_prompt()
-
     try:
-        # Use PDF analysis (note: this requires the file to be uploaded to Anthropic)
-        # For now, we'll simulate by asking to analyze the PDF content
-        response = client.messages.create(
-            model=model,
-            max_tokens=4000,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "document",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "application/pdf",
-                                "data": base64.b64encode(pdf_content).decode('utf-8')
-                            }
-                        }
-                    ]
-                }
-            ]
-        )
-        
-        # Extract JSON from response
-        content = response.content[0].text
-        start_idx = content.find('[')
-        end_idx = content.rfind(']') + 1
-        
-        if start_idx == -1 or end_idx == 0:
-            print(f"No valid JSON found in response for {pdf_path}")
-            return []
-            
-        json_str = content[start_idx:end_idx]
-        questions = json.loads(json_str)
-        
-        return questions
-        
+        return _request_questions(client, model, pdf_content, str(pdf_path),
+                                  {"pdf_sha256": hashlib.sha256(pdf_content).hexdigest()})
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error processing {pdf_path}: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+class PdfPages:
+    """
+    Page-level access to a PDF, for sending it to the API a few pages at a time.
+    
+    Open with `open_pdf_pages`. Pages are read from the file as they are
+    needed, so only the pages being extracted are held in memory.
+    """
+    
+    def __init__(self, reader):
+        self._reader = reader
+        self.page_count = len(reader.pages)
+        # The reader seeks in a shared file handle, so pages are copied out one range at a time
+        self._lock = threading.Lock()
+    
+    def ranges(self, pages_per_range: int) -> List[Tuple[int, int]]:
+        """(first, last) page numbers, 1-based and inclusive, of consecutive ranges covering the PDF"""
+        return [(first, min(first + pages_per_range - 1, self.page_count))
+                for first in range(1, self.page_count + 1, pages_per_range)]
+    
+    def extract(self, first: int, last: int) -> bytes:
+        """A standalone PDF of pages `first` to `last`"""
+        from pypdf import PdfWriter
+        
+        with self._lock:
+            writer = PdfWriter()
+            for index in range(first - 1, last):
+                writer.add_page(self._reader.pages[index])
+            output = io.BytesIO()
+            writer.write(output)
+        return output.getvalue()
+
+
+def open_pdf_pages(pdf_path: Path) -> Optional[PdfPages]:
+    """
+    Open a PDF for page-level extraction.
+    
+    Returns None, so the file is sent whole, if pypdf cannot read the file
+    (e.g. it is encrypted or damaged).
+    """
+    from pypdf import PdfReader
+    
+    # Files without a PDF header are sent whole without pypdf logging about them
+    with open(pdf_path, 'rb') as f:
+        if b'%PDF-' not in f.read(1024):
+            return None
+    
+    try:
+        reader = PdfReader(pdf_path)
+        if reader.is_encrypted or not reader.pages:
+            return None
+        return PdfPages(reader)
+    except Exception:
+        return None
+
+
+def extract_questions_from_pages(
+    client: Anthropic,
+    pdf_path: Path,
+    pages: PdfPages,
+    model: str,
+    executor: Executor,
+    budget: "_ByteBudget",
+    pages_per_request: int = DEFAULT_PAGES_PER_REQUEST,
+    split: Collection[Tuple[int, int]] = (),
+    on_split: Optional[Callable[[int, int], None]] = None
+) -> List[Dict]:
+    """
+    Extract SAT questions from a PDF a few pages per request, sending the requests on `executor`.
+    
+    Each range of pages is cached on its own (keyed by the file hash and page
+    numbers), and a range that fails is retried one page at a time, so a
+    failure costs only the affected pages. `on_split` is called with the
+    (first, last) pages of each range that was split like this, and ranges
+    in `split` (split on an earlier run) go straight to single pages instead
+    of being sent whole again. Questions are returned in page order.
+    
+    Raises:
+        ValueError: If some pages still fail; the rest are cached for the next run
+    """
+    sha256 = file_sha256(pdf_path)
+    bytes_per_page = payload_size(pdf_path) / pages.page_count
+    
+    def extract_range(first: int, last: int) -> List[Dict]:
+        # Estimated payload, since the range's size is only known once it is copied out
+        size = math.ceil(bytes_per_page * (last - first + 1))
+        budget.acquire(size)
+        try:
+            return _request_questions(client, model, pages.extract(first, last),
+                                      f"{pdf_path} (pages {first}-{last})",
+                                      {"pdf_sha256": sha256, "pages": [first, last]})
+        finally:
+            budget.release(size)
+    
+    def extract_pages(first: int, last: int) -> List[Tuple[int, Future]]:
+        return [(page, executor.submit(extract_range, page, page)) for page in range(first, last + 1)]
+    
+    ranges = pages.ranges(max(1, pages_per_request))
+    split = set(split)
+    futures = {index: executor.submit(extract_range, first, last)
+               for index, (first, last) in enumerate(ranges) if (first, last) not in split}
+    
+    # Ranges that failed, now or on an earlier run, are retried page by page
+    results: List[List[Dict]] = [[] for _ in ranges]
+    retries: Dict[int, List[Tuple[int, Future]]] = {
+        index: extract_pages(first, last) for index, (first, last) in enumerate(ranges) if index not in futures
+    }
+    for index, future in futures.items():
+        first, last = ranges[index]
+        try:
+            results[index] = future.result()
+        except Exception:
+            retries[index] = extract_pages(first, last)
+            if on_split and last > first:
+                on_split(first, last)
+    
+    failed_pages = []
+    first_error = None
+    for index, page_futures in retries.items():
+        for page, future in page_futures:
+            try:
+                results[index].extend(future.result())
+            except Exception as e:
+                failed_pages.append(page)
+                first_error = first_error or e
+    
+    if failed_pages:
+        label = "page" if len(failed_pages) == 1 else "pages"
+        raise ValueError(f"Failed to extract {label} {', '.join(map(str, failed_pages))} of {pdf_path}: {first_error}")
+    
+    return [question for range_questions in results for question in range_questions]
+
+
+class _ByteBudget:
+    """Blocks callers until enough of a shared byte allowance is free"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+    
+    def acquire(self, size: int):
+        with self._condition:
+            # A file larger than the whole budget is still let through on its own
+            self._condition.wait_for(lambda: self.in_use == 0 or self.in_use + size <= self.limit)
+            self.in_use += size
+    
+    def release(self, size: int):
+        with self._condition:
+            self.in_use -= size
+            self._condition.notify_all()
+
+
+def payload_size(pdf_path: Path) -> int:
+    """Size in bytes of the base64-encoded request payload for a PDF"""
+    return (os.path.getsize(pdf_path) + 2) // 3 * 4
+
+
+def extract_questions_from_pdfs(
+    client: Anthropic,
+    pdf_paths: List[Path],
+    model: str,
+    max_workers: int = DEFAULT_CONCURRENCY,
+    max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+    pages_per_request: int = DEFAULT_PAGES_PER_REQUEST,
+    split_ranges: Optional[Dict[Path, Collection[Tuple[int, int]]]] = None,
+    on_split: Optional[Callable[[Path, int, int], None]] = None,
+    on_progress: Optional[Callable[[int, Path, List[Dict], Optional[Exception]], None]] = None
+) -> List[List[Dict]]:
+    """
+    Extract questions from several PDFs in parallel.
+    
+    PDFs are split into ranges of `pages_per_request` pages that are sent
+    concurrently (see `extract_questions_from_pages`). Files pypdf can't split,
+    and every file when `pages_per_request` is 0, are sent whole.
+    
+    Args:
+        client: Anthropic client shared by all workers
+        pdf_paths: PDF files to extract
+        model: Claude model to use
+        max_workers: Maximum number of files, and of requests, in flight
+        max_inflight_bytes: Maximum total base64 payload of requests in flight
+        pages_per_request: Pages sent per request (0 sends each file whole)
+        split_ranges: Page ranges, per file, to send one page at a time
+            (see `extract_questions_from_pages`)
+        on_split: Called as (pdf_path, first, last), from worker threads, when
+            a range fails and is retried one page at a time
+        on_progress: Called as (index, pdf_path, questions, error) when each file
+            finishes; error is None on success
+        
+    Returns:
+        Extracted questions for each file, in the same order as `pdf_paths`
+        (empty for files that failed)
+    """
+    budget = _ByteBudget(max_inflight_bytes)
+    
+    def extract_whole(pdf_path: Path) -> List[Dict]:
+        size = payload_size(pdf_path)
+        budget.acquire(size)
+        try:
+            return extract_questions_from_pdf(client, pdf_path, model, raise_errors=True)
+        finally:
+            budget.release(size)
+    
+    def extract(pdf_path: Path) -> List[Dict]:
+        pages = open_pdf_pages(pdf_path) if pages_per_request > 0 else None
+        if pages is None:
+            return request_executor.submit(extract_whole, pdf_path).result()
+        return extract_questions_from_pages(
+            client, pdf_path, pages, model, request_executor, budget, pages_per_request,
+            split=(split_ranges or {}).get(pdf_path, ()),
+            on_split=(lambda first, last: on_split(pdf_path, first, last)) if on_split else None
+        )
+    
+    results: List[List[Dict]] = [[] for _ in pdf_paths]
+    
+    # Files are worked on by one pool and their requests sent by another, so a
+    # file waiting on its pages never holds up the requests themselves
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as request_executor, \
+            ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(extract, pdf_path): i for i, pdf_path in enumerate(pdf_paths)}
+        for future in as_completed(futures):
+            index = futures[future]
+            error = future.exception()
+            if error is None:
+                results[index] = future.result()
+            elif on_progress is None:
+                print(f"Error processing {pdf_paths[index]}: {error}")
+            if on_progress:
+                on_progress(index, pdf_paths[index], results[index], error)
+    
+    return results
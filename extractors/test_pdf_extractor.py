@@ -0,0 +1,183 @@
+import io
+import json
+
+import pytest
+from anthropic.types import Message
+
+import utils.api as api
+from extractors.pdf_extractor import _request_questions, open_pdf_pages
+from prompts.extraction_prompt import get_extraction_prompt
+from utils.cache import configure_cache
+
+QUESTIONS = [{"question": "What is 1 + 1?", "choices": {"A": "1", "B": "2", "C": "3", "D": "4"}, "answer": "B"}]
+
+
+def message(text):
+    return Message.model_validate({
+        "id": "msg_test", "type": "message", "role": "assistant", "model": "test-model",
+        "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 10},
+    })
+
+
+class FakeAPI:
+    """Stands in for `send_message`, answering with the given response texts in turn"""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.calls = 0
+
+    def __call__(self, client, on_text=None, **params):
+        self.calls += 1
+        return message(self.texts.pop(0))
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path):
+    configure_cache(str(tmp_path / "cache"))
+    yield
+    configure_cache()
+
+
+def fake_api(monkeypatch, *texts):
+    fake = FakeAPI(*texts)
+    monkeypatch.setattr(api, "send_message", fake)
+    return fake
+
+
+def request(pdf_sha256="abc"):
+    return _request_questions(None, "test-model", b"%PDF-", "test.pdf", {"pdf_sha256": pdf_sha256})
+
+
+def test_unparseable_response_is_not_cached(monkeypatch):
+    fake = fake_api(monkeypatch, "I could not read this document.", json.dumps(QUESTIONS))
+
+    with pytest.raises(ValueError):
+        request()
+    assert request() == QUESTIONS
+    assert fake.calls == 2
+
+
+def test_parsed_response_is_served_from_the_cache(monkeypatch):
+    fake = fake_api(monkeypatch, json.dumps(QUESTIONS))
+
+    assert request() == QUESTIONS
+    assert request() == QUESTIONS
+    assert fake.calls == 1
+
+
+def test_unparseable_cached_response_is_requested_again(monkeypatch):
+    # As cached before responses were parsed ahead of caching
+    key = api._cache_key({"model": "test-model", "max_tokens": 4000},
+                         {"prompt": get_extraction_prompt(), "pdf_sha256": "abc"})
+    api.get_cache().put(key, "test-model", message("no questions here").model_dump_json())
+    fake = fake_api(monkeypatch, json.dumps(QUESTIONS))
+
+    assert request() == QUESTIONS
+    assert fake.calls == 1
+
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=612, height=792)
+    path = tmp_path / "test.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+class FakeRequests:
+    """Stands in for `_request_questions`, answering with one question per page and failing ranges in `failing`"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.requested = []
+
+    def __call__(self, client, model, pdf_content, source, cache_params):
+        first, last = cache_params["pages"]
+        self.requested.append((first, last))
+        if (first, last) in self.failing:
+            raise ValueError(f"pages {first}-{last} failed")
+        return [{"question": f"page {page}"} for page in range(first, last + 1)]
+
+
+def extract_pages(monkeypatch, pdf_path, fake, **kwargs):
+    from concurrent.futures import ThreadPoolExecutor
+    from extractors import pdf_extractor
+
+    monkeypatch.setattr(pdf_extractor, "_request_questions", fake)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return pdf_extractor.extract_questions_from_pages(
+            None, pdf_path, open_pdf_pages(pdf_path), "test-model", executor,
+            pdf_extractor._ByteBudget(10 ** 9), pages_per_request=2, **kwargs
+        )
+
+
+def page_questions(*pages):
+    return [{"question": f"page {page}"} for page in pages]
+
+
+def test_ranges_cover_every_page(pdf_path):
+    pages = open_pdf_pages(pdf_path)
+
+    assert pages.page_count == 5
+    assert pages.ranges(2) == [(1, 2), (3, 4), (5, 5)]
+    assert pages.ranges(10) == [(1, 5)]
+
+
+def test_extracted_range_is_a_pdf_of_those_pages(pdf_path):
+    from pypdf import PdfReader
+
+    content = open_pdf_pages(pdf_path).extract(2, 4)
+
+    assert len(PdfReader(io.BytesIO(content)).pages) == 3
+
+
+def test_file_that_is_not_a_pdf_is_sent_whole(tmp_path):
+    path = tmp_path / "notes.pdf"
+    path.write_bytes(b"not a pdf")
+
+    assert open_pdf_pages(path) is None
+
+
+def test_questions_come_back_in_page_order(monkeypatch, pdf_path):
+    fake = FakeRequests()
+
+    assert extract_pages(monkeypatch, pdf_path, fake) == page_questions(1, 2, 3, 4, 5)
+    assert sorted(fake.requested) == [(1, 2), (3, 4), (5, 5)]
+
+
+def test_failed_range_is_retried_page_by_page(monkeypatch, pdf_path):
+    fake = FakeRequests(failing={(3, 4)})
+    split = []
+
+    questions = extract_pages(monkeypatch, pdf_path, fake, on_split=lambda first, last: split.append((first, last)))
+
+    assert questions == page_questions(1, 2, 3, 4, 5)
+    assert (3, 3) in fake.requested and (4, 4) in fake.requested
+    assert split == [(3, 4)]
+
+
+def test_pages_that_still_fail_are_reported(monkeypatch, pdf_path):
+    fake = FakeRequests(failing={(3, 4), (4, 4)})
+
+    with pytest.raises(ValueError, match="page 4 of"):
+        extract_pages(monkeypatch, pdf_path, fake)
+
+
+def test_ranges_split_on_an_earlier_run_go_straight_to_single_pages(monkeypatch, pdf_path):
+    fake = FakeRequests()
+    split = []
+
+    questions = extract_pages(monkeypatch, pdf_path, fake, split=[(1, 2)],
+                              on_split=lambda first, last: split.append((first, last)))
+
+    assert questions == page_questions(1, 2, 3, 4, 5)
+    assert (1, 2) not in fake.requested
+    assert sorted(fake.requested) == [(1, 1), (2, 2), (3, 4), (5, 5)]
+    assert split == []
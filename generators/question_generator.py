@@ -1,59 +1,466 @@
+import itertools
 import json
-import os
-from typing import Optional, List
-from anthropic import Anthropic
-from dotenv import load_dotenv
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, List, Iterator, Callable, Dict, Any, Tuple
 
-from models.question import Question
-from prompts.generation_prompt import get_generate_questions_prompt
+from config import DEFAULT_CONCURRENCY, DEFAULT_EXPECTED_ACCURACY, MAX_OVERGENERATION_FACTOR
+from models.question import Question, validate_questions
+from prompts.generation_prompt import get_generate_questions_prompt, get_generation_tool_params, SUBMIT_QUESTIONS_TOOL
+from utils.api import create_message, response_text
+from utils.client import get_client
+from utils.json_stream import JsonArrayStream
 
-load_dotenv()
+# Output token limit of each generation request
+MAX_OUTPUT_TOKENS = 4000
+
+# Most questions requested in a single API call, however short they turn out to be
+MAX_BATCH_SIZE = 25
+
+# Output tokens per question assumed before any response has been seen
+# (10 questions per call at the default token limit), and how many questions
+# that assumption counts as in the running estimate
+INITIAL_TOKENS_PER_QUESTION = 320
+INITIAL_TOKENS_WEIGHT = 10
+
+# Share of the token limit a batch is sized to fill, leaving room for longer-than-average questions
+BATCH_TOKEN_HEADROOM = 0.8
+
+# Requests per batch: the first, plus follow-ups for questions that failed validation
+MAX_GENERATION_ATTEMPTS = 3
+
+# How many evaluations the expected accuracy rate counts as, when estimating
+# the running rate in `iter_accurate_questions`
+EXPECTED_ACCURACY_WEIGHT = 5
+
+# The estimated accuracy rate never drops below this, so one bad start
+# can't launch a flood of batches
+MIN_ACCURACY_ESTIMATE = 0.1
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a generation request that was cancelled with `QuestionGenerator.cancel`"""
 
 
 class QuestionGenerator:
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
-        self.client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None, seed: Optional[int] = None,
+                 stream: bool = False, max_tokens: int = MAX_OUTPUT_TOKENS):
+        # Shared, pooled client; retries are handled by the shared request scheduler
+        self.client = get_client(api_key)
         self.model = model or "claude-3-7-sonnet-latest"
+        # Responses are only cached for seeded runs; an unseeded run always asks for fresh questions
+        self.seed = seed
+        # Stream responses and parse each question as soon as its JSON object closes
+        self.stream = stream
+        self.max_tokens = max_tokens
+        self.errors: List[str] = []
+        # Questions that failed validation and were regenerated
+        self.rejected: List[str] = []
+        # Responses cut off at the token limit, whose complete questions were kept
+        self.truncated = 0
+        # Observed output tokens and questions, for sizing batches (see `batch_size`)
+        self._usage_lock = threading.Lock()
+        self._output_tokens = 0
+        self._questions_seen = 0
+        # Set by `cancel`; checked between requests and while streaming
+        self.cancelled = threading.Event()
+        # Counters of the last `iter_accurate_questions` run
+        self.accuracy_stats: Dict[str, int] = {}
         
-    def generate_questions(self, count: int = 1) -> List[Question]:
-        """Generate multiple SAT math questions, handling batching internally for large counts"""
+    def cancel(self):
+        """
+        Stop generation that is in progress.
+        
+        Requests that have not started are skipped and streamed responses are
+        abandoned at their next piece of text. A non-streamed request that is
+        already waiting on the API still runs to completion.
+        """
+        self.cancelled.set()
+    
+    def batch_size(self) -> int:
+        """
+        The largest batch expected to fit in one response.
+        
+        Output tokens per question are estimated from the responses so far,
+        starting from INITIAL_TOKENS_PER_QUESTION, and batches are sized to
+        fill BATCH_TOKEN_HEADROOM of the token limit, up to MAX_BATCH_SIZE.
+        Seeded runs keep the initial estimate, so their batches (and the cache
+        entries they are replayed from) are the same every run.
+        """
+        with self._usage_lock:
+            tokens_per_question = ((self._output_tokens + INITIAL_TOKENS_PER_QUESTION * INITIAL_TOKENS_WEIGHT)
+                                   / (self._questions_seen + INITIAL_TOKENS_WEIGHT))
+        return max(1, min(MAX_BATCH_SIZE, int(self.max_tokens * BATCH_TOKEN_HEADROOM / tokens_per_question)))
+    
+    def _record_usage(self, response, questions: int):
+        """Count a response's output tokens and the complete questions in it towards `batch_size`"""
+        with self._usage_lock:
+            if response.stop_reason == "max_tokens":
+                self.truncated += 1
+            if self.seed is None:
+                self._output_tokens += response.usage.output_tokens
+                self._questions_seen += questions
+    
+    def _chunk_sizes(self, count: int) -> Iterator[int]:
+        """Sizes of the chunks `count` questions are requested in, each one sized just before it is launched"""
+        remaining = count
+        while remaining > 0:
+            size = min(self.batch_size(), remaining)
+            remaining -= size
+            yield size
+        
+    def generate_questions(self, count: int = 1, concurrency: int = DEFAULT_CONCURRENCY) -> List[Question]:
+        """
+        Generate multiple SAT math questions, handling batching internally for large counts.
+        
+        Chunks of up to `batch_size()` questions are requested concurrently, with
+        at most `concurrency` API calls in flight. Questions are returned in chunk
+        order regardless of completion order. If some chunks fail, the questions
+        from the successful chunks are returned and the failures are recorded in
+        `self.errors`; a ValueError is raised only if every chunk fails.
+        """
+        
+        self.errors = []
+        self.rejected = []
+        self.truncated = 0
+        self.cancelled.clear()
         
         # For small counts, generate all at once
-        if count <= 10:
+        if count <= self.batch_size():
             return self._generate_batch(count)
         
-        # For larger counts, generate in chunks of 10
-        questions = []
-        chunks = (count + 9) // 10  # Round up division
+        # For larger counts, generate in chunks
+        questions = list(self.iter_questions(count, concurrency))
         
-        for chunk_idx in range(chunks):
-            remaining = count - len(questions)
-            chunk_size = min(10, remaining)
-            
+        # A chunk that succeeds always has at least one question
+        if not questions and self.errors:
+            raise ValueError(self.errors[0])
+        
+        return questions
+    
+    def iter_questions(self, count: int = 1, concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Question]:
+        """
+        Generate questions concurrently, yielding each chunk's questions as soon as it is parsed.
+        
+        Chunks are yielded in order, so the output is the same as `generate_questions`.
+        When streaming, each question is instead yielded the moment it is parsed,
+        in whatever order the chunks produce them. Failed chunks are skipped and
+        recorded in `self.errors`.
+        
+        Only `concurrency` chunks are launched at a time, so each new chunk is
+        sized (see `batch_size`) from the responses of the chunks before it.
+        """
+        
+        self.errors = []
+        self.rejected = []
+        self.truncated = 0
+        self.cancelled.clear()
+        chunk_sizes = self._chunk_sizes(count)
+        
+        if self.stream:
+            yield from self._iter_streamed(chunk_sizes, concurrency)
+            return
+        
+        concurrency = max(1, concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        futures = []
+        
+        def launch():
+            running = [future for future in futures if not future.done()]
+            for size in itertools.islice(chunk_sizes, concurrency - len(running)):
+                futures.append(executor.submit(self._generate_batch, size, len(futures)))
+        
+        try:
+            launch()
+            chunk_idx = 0
+            while chunk_idx < len(futures):
+                future = futures[chunk_idx]
+                # Keep launching chunks as others finish while waiting for this one
+                while not future.done():
+                    wait([f for f in futures if not f.done()], return_when=FIRST_COMPLETED)
+                    launch()
+                launch()
+                chunk_idx += 1
+                try:
+                    chunk_questions = future.result()
+                except Exception as e:
+                    self.errors.append(f"Failed to generate chunk {chunk_idx}: {e}")
+                    continue
+                yield from chunk_questions
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _iter_streamed(self, chunk_sizes: Iterator[int], concurrency: int) -> Iterator[Question]:
+        """Stream chunks concurrently, yielding questions from all of them as they arrive"""
+        
+        arrived = queue.Queue()
+        finished = object()
+        
+        def run_chunk(chunk_idx: int, size: int):
+            try:
+                self._generate_batch(size, chunk_idx, on_question=arrived.put)
+            except Exception as e:
+                self.errors.append(f"Failed to generate chunk {chunk_idx + 1}: {e}")
+            finally:
+                arrived.put(finished)
+        
+        concurrency = max(1, concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        launched = 0
+        running = 0
+        try:
+            while True:
+                # Launch chunks as others finish, each sized from the responses so far
+                for size in itertools.islice(chunk_sizes, concurrency - running):
+                    executor.submit(run_chunk, launched, size)
+                    launched += 1
+                    running += 1
+                if not running:
+                    break
+                
+                item = arrived.get()
+                if item is finished:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def iter_accurate_questions(self, target: int, evaluator, concurrency: int = DEFAULT_CONCURRENCY,
+                                eval_concurrency: int = DEFAULT_CONCURRENCY,
+                                expected_accuracy: float = DEFAULT_EXPECTED_ACCURACY
+                                ) -> Iterator[Tuple[Question, Dict[str, Any]]]:
+        """
+        Generate until `target` questions have been evaluated as correct.
+        
+        Every generated question is handed to `evaluator` (an AccuracyEvaluator)
+        as soon as it is parsed. The running accuracy rate is estimated from
+        the results so far, starting from `expected_accuracy`, and just enough
+        batches are launched for the questions in flight to be expected to
+        reach the target. At most `concurrency` batches run at once, so later
+        batches are sized from a better estimate. Once the target is reached,
+        the remaining work is cancelled (see `cancel`).
+        
+        Generation stops early, with fewer than `target` questions, after
+        MAX_OVERGENERATION_FACTOR times the target has been generated.
+        
+        Yields:
+            (question, evaluation) for each correct question, in evaluation order
+        """
+        
+        self.errors = []
+        self.rejected = []
+        self.truncated = 0
+        self.cancelled.clear()
+        self.accuracy_stats = {"generated": 0, "evaluated": 0, "correct": 0, "batches": 0, "abandoned": 0}
+        stats = self.accuracy_stats
+        budget = math.ceil(target * MAX_OVERGENERATION_FACTOR)
+        
+        events = queue.Queue()
+        # Questions requested from running batches but not yet delivered, per batch
+        undelivered: Dict[int, int] = {}
+        pending_evaluations = 0
+        accepted = 0
+        
+        def run_batch(batch_index: int, size: int):
+            try:
+                self._generate_batch(size, batch_index, on_question=lambda q: events.put(("question", batch_index, q)))
+                events.put(("batch", batch_index, None))
+            except GenerationCancelled:
+                pass
+            except Exception as e:
+                events.put(("batch", batch_index, e))
+        
+        def run_evaluation(question: Question):
+            if self.cancelled.is_set():
+                return
             try:
-                chunk_questions = self._generate_batch(chunk_size)
-                questions.extend(chunk_questions)
+                events.put(("evaluation", question, evaluator.evaluate(question)))
             except Exception as e:
-                # Re-raise with more context
-                raise ValueError(f"Failed to generate chunk {chunk_idx + 1} of {chunks}: {e}")
+                events.put(("evaluation", question, e))
+        
+        def launch_batches():
+            rate = max(MIN_ACCURACY_ESTIMATE,
+                       (stats["correct"] + expected_accuracy * EXPECTED_ACCURACY_WEIGHT)
+                       / (stats["evaluated"] + EXPECTED_ACCURACY_WEIGHT))
+            in_flight = pending_evaluations + sum(undelivered.values())
+            shortfall = target - accepted - rate * in_flight
+            requested = stats["generated"] + sum(undelivered.values())
+            while shortfall > 0 and len(undelivered) < concurrency and requested < budget:
+                size = min(self.batch_size(), math.ceil(shortfall / rate), budget - requested)
+                batch_index = stats["batches"]
+                stats["batches"] += 1
+                undelivered[batch_index] = size
+                generation_executor.submit(run_batch, batch_index, size)
+                shortfall -= size * rate
+                requested += size
+        
+        generation_executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        evaluation_executor = ThreadPoolExecutor(max_workers=max(1, eval_concurrency))
+        try:
+            launch_batches()
+            while undelivered or pending_evaluations:
+                kind, key, value = events.get()
+                
+                if kind == "question":
+                    undelivered[key] -= 1
+                    stats["generated"] += 1
+                    pending_evaluations += 1
+                    evaluation_executor.submit(run_evaluation, value)
+                elif kind == "batch":
+                    # Questions a finished batch didn't deliver are no longer expected
+                    undelivered.pop(key)
+                    if value is not None:
+                        self.errors.append(f"Failed to generate batch {key + 1}: {value}")
+                else:
+                    pending_evaluations -= 1
+                    if isinstance(value, Exception):
+                        self.errors.append(f"Failed to evaluate a question: {value}")
+                    else:
+                        stats["evaluated"] += 1
+                        if value["correct"]:
+                            stats["correct"] += 1
+                            accepted += 1
+                            yield key, value
+                            if accepted >= target:
+                                break
+                
+                launch_batches()
+        finally:
+            # Whatever is still queued or in flight is no longer needed
+            stats["abandoned"] = pending_evaluations + sum(undelivered.values())
+            self.cancel()
+            generation_executor.shutdown(wait=False, cancel_futures=True)
+            evaluation_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _generate_batch(self, count: int, batch_index: int = 0,
+                        on_question: Optional[Callable[[Question], None]] = None) -> List[Question]:
+        """
+        Generate a batch of questions, regenerating only what is missing.
         
+        Each submitted question is validated on its own, so an invalid one
+        costs a follow-up request for the shortfall instead of the whole
+        batch. The same goes for a response cut off at the token limit: its
+        complete questions are kept and only the rest are requested again.
+        Follow-ups continue until `count` valid questions are collected or
+        MAX_GENERATION_ATTEMPTS requests have been made.
+        
+        When streaming, `on_question` (if given) is called with each question as
+        soon as it is parsed, before the rest of the response has arrived.
+        Questions passed to it count towards `count` even if their response
+        then fails, so a batch never emits more than `count` questions.
+        
+        Raises:
+            ValueError: If no valid question could be generated
+        """
+        
+        questions = []
+        last_error = None
+        for attempt in range(MAX_GENERATION_ATTEMPTS):
+            needed = count - len(questions)
+            if needed <= 0:
+                break
+            if self.cancelled.is_set():
+                raise GenerationCancelled()
+            try:
+                self._request_questions(questions, count, batch_index, attempt, on_question)
+            except (ValueError, RuntimeError) as e:
+                # Unparseable response, or a stream that broke part-way; ask again
+                last_error = e
+        
+        if not questions:
+            raise last_error or ValueError("Failed to generate any valid questions")
         return questions
     
-    def _generate_batch(self, count: int) -> List[Question]:
-        """Generate a batch of questions in a single API call (max 10)"""
+    def _request_questions(self, accepted: List[Question], count: int, batch_index: int, attempt: int,
+                           on_question: Optional[Callable[[Question], None]]):
+        """
+        One submit_questions request for the questions `accepted` is short of `count`.
+        
+        Valid questions are appended to `accepted` as they are parsed, so the
+        ones a failed stream delivered before breaking are kept.
+        """
+        
+        prompt = get_generate_questions_prompt(count - len(accepted))
+        messages = [
+            {"role": "user", "content": prompt}
+        ]
+        tool_params = get_generation_tool_params()
+        # Complete questions in the response, valid or not
+        parsed = [0]
         
-        prompt = get_generate_questions_prompt(count)
+        def accept(questions_data):
+            parsed[0] += len(questions_data)
+            questions, invalid = validate_questions(questions_data)
+            for error in invalid.values():
+                self.rejected.append(f"Invalid question discarded: {error}")
+            for question in questions:
+                if len(accepted) >= count:
+                    return
+                accepted.append(question)
+                if on_question:
+                    on_question(question)
         
-        response = self.client.messages.create(
+        # When streaming, the tool input is parsed as it arrives
+        parser = JsonArrayStream(key="questions") if self.stream else None
+        
+        def on_text(text: str):
+            if self.cancelled.is_set():
+                raise GenerationCancelled()
+            completed = parser.feed(text)
+            if completed:
+                accept(completed)
+        
+        response = create_message(
+            self.client,
+            cache=self.seed is not None,
+            cache_key_params={"messages": messages, "seed": self.seed, "batch_index": batch_index,
+                              "attempt": attempt, **tool_params},
+            on_text=on_text if parser else None,
             model=self.model,
-            max_tokens=4000,  # Increased for multiple questions
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            max_tokens=self.max_tokens,
+            messages=messages,
+            **tool_params
         )
         
+        truncated = response.stop_reason == "max_tokens"
+        try:
+            if parser is None:
+                try:
+                    questions_data = self._submitted_questions(response)
+                except ValueError:
+                    if not truncated:
+                        raise
+                    # Cut off before the questions array was readable
+                    questions_data = []
+                if truncated:
+                    # The last question of a cut-off tool call may be missing fields or
+                    # end mid-string; only the ones before it are complete
+                    questions_data = questions_data[:-1]
+                accept(questions_data)
+            elif not parser.started:
+                # The streamed parser only ever returns complete questions, so there is nothing to drop
+                raise ValueError(f"Failed to parse questions from response: no questions array found\n"
+                                 f"Response: {response_text(response)}")
+        finally:
+            # A response that failed to parse for any other reason says nothing about question length
+            if parsed[0] or truncated:
+                self._record_usage(response, parsed[0])
+    
+    def _submitted_questions(self, response) -> List[dict]:
+        """The raw question dicts of a response's submit_questions call (or, failing that, a JSON array in its text)"""
+        
+        for block in response.content:
+            if block.type == "tool_use" and block.name == SUBMIT_QUESTIONS_TOOL["name"]:
+                questions_data = block.input.get("questions")
+                if not isinstance(questions_data, list):
+                    raise ValueError(f"Failed to parse questions from response: no questions array in {block.input}")
+                return questions_data
+        
         # Extract JSON from response
-        content = response.content[0].text
+        content = response_text(response)
         
         # Try to parse JSON from the response
         try:
@@ -62,14 +469,7 @@ class QuestionGenerator:
             end_idx = content.rfind(']') + 1
             json_str = content[start_idx:end_idx]
             
-            questions_data = json.loads(json_str)
-            
-            # Create and return Question objects
-            questions = []
-            for q_data in questions_data:
-                questions.append(Question(**q_data))
-            
-            return questions
+            return json.loads(json_str)
             
         except (json.JSONDecodeError, ValueError) as e:
-            raise ValueError(f"Failed to parse questions from response: {e}\nResponse: {content}")
\ No newline at end of file
+            raise ValueError(f"Failed to parse questions from response: {e}\nResponse: {content}")
@@ -0,0 +1,67 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import generators.question_generator as question_generator
+from generators.question_generator import QuestionGenerator
+
+
+def question_json(number):
+    return json.dumps({"question": f"Question {number}?", "choices": {"A": "1", "B": "2", "C": "3", "D": "4"},
+                       "answer": "A"})
+
+
+class FakeStreamingAPI:
+    """Stands in for `create_message`: the first `failures` streams break after `delivered` questions"""
+
+    def __init__(self, delivered, failures):
+        self.delivered = delivered
+        self.failures = failures
+        self.requested = []
+
+    def prompt(self, count):
+        self.requested.append(count)
+        return f"Generate {count}"
+
+    def __call__(self, client, on_text=None, **params):
+        count = self.requested[-1]
+        failing = len(self.requested) <= self.failures
+        body = ", ".join(question_json(i) for i in range(self.delivered if failing else count))
+        on_text('{"questions": [' + body + (", " if failing else "]}"))
+        if failing:
+            raise RuntimeError("stream broke")
+        return SimpleNamespace(stop_reason="tool_use", usage=SimpleNamespace(output_tokens=100), content=[])
+
+
+def fake_api(monkeypatch, delivered, failures):
+    api = FakeStreamingAPI(delivered, failures)
+    monkeypatch.setattr(question_generator, "get_generate_questions_prompt", api.prompt)
+    monkeypatch.setattr(question_generator, "create_message", api)
+    return api
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setattr(question_generator, "get_client", lambda api_key=None: None)
+    return QuestionGenerator(model="test-model", stream=True)
+
+
+def test_questions_emitted_before_a_broken_stream_count_towards_the_batch(generator, monkeypatch):
+    api = fake_api(monkeypatch, delivered=3, failures=1)
+    emitted = []
+
+    questions = generator._generate_batch(5, on_question=emitted.append)
+
+    assert len(questions) == len(emitted) == 5
+    assert api.requested == [5, 2]
+
+
+def test_batch_keeps_emitted_questions_when_every_attempt_fails(generator, monkeypatch):
+    fake_api(monkeypatch, delivered=1, failures=question_generator.MAX_GENERATION_ATTEMPTS)
+    emitted = []
+
+    questions = generator._generate_batch(5, on_question=emitted.append)
+
+    assert questions == emitted
+    assert len(emitted) == question_generator.MAX_GENERATION_ATTEMPTS
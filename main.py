@@ -1,316 +1,50 @@
 #!/usr/bin/env python3
 import click
-import json
-import os
-from dotenv import load_dotenv
-from anthropic import Anthropic
 
-from models.question import Question
-from generators.question_generator import QuestionGenerator
-from evaluators.accuracy import AccuracyEvaluator
-from evaluators.authenticity import AuthenticityEvaluator
-from extractors.pdf_extractor import get_pdf_files, extract_questions_from_pdf
-from utils.display import (
-    display_section_header,
-    display_question,
-    display_evaluation,
-    display_summary,
-    create_file_output
+from commands.lazy_group import LazyGroup
+from config import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_TIMEOUT
 )
-from config import get_default_model
 
-load_dotenv()
 
-
-@click.group()
-def cli():
+@click.group(cls=LazyGroup, lazy_subcommands={
+    'extract': 'commands.extract.extract',
+    'generate': 'commands.generate.generate',
+    'evaluate': 'commands.evaluate.evaluate',
+    'pipeline': 'commands.pipeline.pipeline',
+    'store': 'commands.store.store',
+})
+@click.option('--no-cache', is_flag=True, help='Always call the API instead of reusing cached responses')
+@click.option('--cache-dir', type=click.Path(file_okay=False), default=DEFAULT_CACHE_DIR,
+              help='Directory for the response cache')
+@click.option('--store', 'store_path', type=click.Path(dir_okay=False),
+              help='SQLite question store to record questions and evaluations in')
+@click.option('--rpm', type=click.FloatRange(min=0, min_open=True), help='Requests-per-minute limit')
+@click.option('--input-tpm', type=click.FloatRange(min=0, min_open=True), help='Input tokens-per-minute limit')
+@click.option('--output-tpm', type=click.FloatRange(min=0, min_open=True), help='Output tokens-per-minute limit')
+@click.option('--max-concurrency', type=click.IntRange(min=1), default=DEFAULT_MAX_CONCURRENCY,
+              help='Upper bound on concurrent API requests; lowered automatically when throttled')
+@click.option('--max-retries', type=click.IntRange(min=0), default=DEFAULT_MAX_RETRIES,
+              help='Retries for throttled or failed API requests')
+@click.option('--max-connections', type=click.IntRange(min=1), default=DEFAULT_MAX_CONNECTIONS,
+              help='Size of the shared keep-alive connection pool')
+@click.option('--timeout', type=click.FloatRange(min=0, min_open=True), default=DEFAULT_TIMEOUT,
+              help='Timeout in seconds for each API request')
+@click.option('--http2', is_flag=True, help='Use HTTP/2 (requires the h2 package)')
+@click.option('--metrics-jsonl', type=click.Path(dir_okay=False),
+              help='Append a JSON record of every API call to this file')
+@click.option('--metrics-prom', type=click.Path(dir_okay=False),
+              help='Write run metrics to this Prometheus textfile')
+def cli(no_cache, cache_dir, store_path, rpm, input_tpm, output_tpm, max_concurrency, max_retries, max_connections, timeout,
+        http2, metrics_jsonl, metrics_prom):
     """SAT Math Question Generator CLI"""
-    pass
-
-
-@cli.group()
-def evaluate():
-    """Evaluate generated questions using various metrics"""
-    pass
-
-
-@cli.command()
-@click.option('--input', '-i', type=click.Path(exists=True), default='data/Algebra',
-              help='Input directory containing PDF files')
-@click.option('--output', '-o', type=click.Path(), default='data/real_questions.json',
-              help='Output JSON file')
-@click.option('--limit', '-l', type=int, help='Limit number of PDFs to process')
-@click.option('--model', '-m', type=str, help='Claude model to use')
-def extract(input, output, limit, model):
-    """Extract SAT questions from PDF files"""
-    
-    try:
-        # Determine model to use
-        model_name = model or get_default_model()
-        click.echo(f"Using model: {model_name}")
-        
-        # Initialize Anthropic client
-        client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        
-        # Get all PDF files
-        pdf_files = get_pdf_files(input)
-        
-        click.echo(f"Found {len(pdf_files)} PDF files in {input}")
-        
-        if limit:
-            pdf_files = pdf_files[:limit]
-            click.echo(f"Processing first {limit} files")
-        
-        all_questions = []
-        
-        # Process each PDF
-        for pdf_file in pdf_files:
-            click.echo(f"\nProcessing: {pdf_file}")
-            questions = extract_questions_from_pdf(client, pdf_file, model_name)
-            click.echo(f"Extracted {len(questions)} questions")
-            all_questions.extend(questions)
-        
-        # Save to JSON
-        output_dir = os.path.dirname(output)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
-        
-        with open(output, 'w', encoding='utf-8') as f:
-            json.dump(all_questions, f, indent=2, ensure_ascii=False)
-        
-        click.echo(f"\nSaved {len(all_questions)} questions to {output}")
-        
-    except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        raise click.Abort()
-
-
-@cli.command()
-@click.option('--count', '-n', default=1, help='Number of questions to generate')
-@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
-@click.option('--quiet', is_flag=True, help='Only show summary, suppress individual question display')
-@click.option('--model', '-m', type=str, help='Claude model to use')
-def generate(count, output, quiet, model):
-    """Generate SAT math question(s)"""
-    
-    try:
-        # Determine model to use
-        model_name = model or get_default_model()
-        if not quiet:
-            click.echo(f"Using model: {model_name}")
-        
-        # Generate question(s)
-        generator = QuestionGenerator(model=model_name)
-        
-        if not quiet:
-            click.echo(f"Generating {count} SAT math questions...")
-        
-        # Generate questions (batching handled internally)
-        questions = generator.generate_questions(count)
-        
-        # Process and display questions
-        results = []
-        
-        for i, question in enumerate(questions, 1):
-            result = {
-                "id": question.id,
-                "question": question.question,
-                "choices": question.choices,
-                "answer": question.answer
-            }
-            
-            if not quiet:
-                display_question(question, i, count)
-            
-            results.append(result)
-        
-        # Save to file if requested
-        if output:
-            with open(output, 'w') as f:
-                json.dump(results, f, indent=2)
-            click.echo(f"\nResults saved to: {output}")
-            
-    except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        raise click.Abort()
-
-
-@evaluate.command()
-@click.option('--input', '-i', type=click.Path(exists=True), required=True, help='Input JSON file with questions')
-@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
-@click.option('--quiet', is_flag=True, help='Show summary only')
-@click.option('--model', '-m', type=str, help='Claude model to use')
-def accuracy(input, output, quiet, model):
-    """Evaluate mathematical accuracy of questions"""
-    
-    try:
-        # Determine model to use
-        model_name = model or get_default_model()
-        if not quiet:
-            click.echo(f"Using model: {model_name}")
-        
-        # Load questions from file
-        click.echo(f"Loading questions from {input}...")
-        with open(input, 'r') as f:
-            data = json.load(f)
-        
-        # Handle different formats
-        if isinstance(data, dict) and 'questions' in data:
-            questions_data = data['questions']
-        elif isinstance(data, list):
-            questions_data = data
-        else:
-            questions_data = [data]
-        
-        # Convert to Question objects
-        questions = []
-        for q in questions_data:
-            questions.append(Question(
-                question=q.get('question', q.get('content', '')),
-                choices=q['choices'],
-                answer=q.get('answer', q.get('correct_answer', ''))
-            ))
-        
-        # Evaluate questions
-        click.echo("Evaluating accuracy...")
-        evaluator = AccuracyEvaluator(model=model_name)
-        results = []
-        correct_count = 0
-        
-        for i, question in enumerate(questions, 1):
-            if not quiet:
-                display_question(question, i, len(questions))
-            
-            result = evaluator.evaluate(question)
-            
-            if result['correct']:
-                correct_count += 1
-            
-            if not quiet:
-                display_evaluation(result)
-            
-            results.append({
-                "question": question.question,
-                "choices": question.choices,
-                "answer": question.answer,
-                "evaluation": result
-            })
-        
-        # Display summary
-        if not quiet or len(questions) > 1:
-            display_section_header("ACCURACY EVALUATION SUMMARY")
-            click.echo(f"Total Questions: {len(questions)}")
-            click.echo(f"Mathematically Correct: {correct_count} ({correct_count/len(questions)*100:.1f}%)")
-            click.echo("=" * 50)
-        
-        # Save results if requested
-        if output:
-            with open(output, 'w') as f:
-                json.dump({
-                    "results": results,
-                    "summary": {
-                        "total": len(questions),
-                        "correct": correct_count,
-                        "accuracy_rate": correct_count/len(questions) if questions else 0
-                    }
-                }, f, indent=2)
-            click.echo(f"\nResults saved to: {output}")
-            
-    except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        raise click.Abort()
-
-
-
-@evaluate.command()
-@click.option('--input', '-i', type=click.Path(exists=True), required=True, help='Input JSON file with generated questions')
-@click.option('--real-questions', '-r', type=click.Path(exists=True), default='data/real_questions.json', help='Real questions JSON file')
-@click.option('--output', '-o', type=click.Path(), help='Output JSON file')
-@click.option('--model', '-m', type=str, help='Claude model to use')
-def authenticity(input, real_questions, output, model):
-    """Test how well generated questions match real SAT questions"""
-    
-    try:
-        # Determine model to use
-        model_name = model or get_default_model()
-        click.echo(f"Using model: {model_name}")
-        
-        # Load generated questions
-        click.echo(f"Loading generated questions from {input}...")
-        with open(input, 'r') as f:
-            gen_data = json.load(f)
-        
-        # Handle both single question and list of questions format
-        if isinstance(gen_data, dict) and 'questions' in gen_data:
-            gen_data = gen_data['questions']
-        elif isinstance(gen_data, dict):
-            gen_data = [gen_data]
-        
-        # Convert to Question objects
-        generated_qs = []
-        for q in gen_data:
-            # Handle different field names (question vs content, answer vs correct_answer)
-            question_text = q.get('question')
-            answer = q.get('answer')
-            generated_qs.append(Question(
-                question=question_text,
-                choices=q['choices'],
-                answer=answer
-            ))
-        
-        # Load real questions
-        click.echo(f"Loading real questions from {real_questions}...")
-        with open(real_questions, 'r') as f:
-            real_qs = json.load(f)
-        
-        # Use the minimum count between real and generated questions
-        count = min(len(real_qs), len(generated_qs))
-        if len(real_qs) != len(generated_qs):
-            click.echo(f"Using {count} questions (minimum of {len(real_qs)} real and {len(generated_qs)} generated)")
-        
-        # Run authenticity evaluation
-        click.echo("\nRunning authenticity evaluation...")
-        evaluator = AuthenticityEvaluator(model=model_name)
-        results = evaluator.evaluate(real_qs[:count], generated_qs)
-        
-        # Display results
-        display_section_header("AUTHENTICITY TEST RESULTS")
-        
-        summary = results['summary']
-        click.echo(f"Total Questions: {summary['total_questions']}")
-        click.echo(f"Correct Predictions: {summary['correct_predictions']} / {summary['total_questions']}")
-        click.echo(f"Overall Accuracy: {summary['accuracy_percentage']:.1f}%")
-        
-        click.echo("\nBreakdown:")
-        click.echo(f"- Real Questions: {summary['real_questions']['correctly_identified']} / {summary['real_questions']['count']} correctly identified ({summary['real_questions']['accuracy']*100:.1f}%)")
-        click.echo(f"- Generated Questions: {summary['generated_questions']['correctly_identified']} / {summary['generated_questions']['count']} correctly identified ({summary['generated_questions']['accuracy']*100:.1f}%)")
-        
-        click.echo("\nInterpretation:")
-        if summary['accuracy_percentage'] < 60:
-            click.echo("✓ Excellent! The AI has difficulty distinguishing generated from real questions.")
-        elif summary['accuracy_percentage'] < 70:
-            click.echo("✓ Good! Generated questions are fairly authentic.")
-        elif summary['accuracy_percentage'] < 80:
-            click.echo("⚠ Fair. Generated questions have some distinguishable patterns.")
-        else:
-            click.echo("✗ Poor. Generated questions are easily distinguishable from real ones.")
-        
-        click.echo("=" * 50)
-        
-        # Save results if requested
-        if output:
-            with open(output, 'w') as f:
-                json.dump(results, f, indent=2)
-            click.echo(f"\nResults saved to: {output}")
-        
-    except FileNotFoundError:
-        click.echo(f"Error: Real questions file not found at {real_questions}", err=True)
-        click.echo("Please run 'python main.py extract' first to generate the real questions dataset.", err=True)
-        raise click.Abort()
-    except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        raise click.Abort()
+    # Nothing is set up here: click runs this before parsing the subcommand's arguments, so
+    # each command calls commands.runtime.start_run, which reads these options from the context
 
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
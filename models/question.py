@@ -1,6 +1,12 @@
+import gc
+import itertools
+import os
 import uuid
-from typing import Dict
-from pydantic import BaseModel, Field, field_validator
+from contextlib import contextmanager
+from typing import Annotated, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
+
+from utils.io import ValidatedRecord
 
 
 class Question(BaseModel):
@@ -8,6 +14,8 @@ class Question(BaseModel):
     question: str
     choices: Dict[str, str]
     answer: str
+    # One of the generation prompt's topics, when the generator reported it
+    topic: Optional[str] = None
 
     @field_validator('choices')
     def validate_choices(cls, v):
@@ -29,4 +37,143 @@ class Question(BaseModel):
         lines = [self.question, ""]
         for key in sorted(self.choices.keys()):
             lines.append(f"{key}) {self.choices[key]}")
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+
+# Records validated together by `iter_valid_questions`
+_VALIDATION_CHUNK_SIZE = 1000
+
+# The RFC 4122 variant digit (8, 9, a or b) for each random hex digit
+_UUID_VARIANT_DIGITS = {digit: "89ab"[int(digit, 16) & 3] for digit in "0123456789abcdef"}
+
+# Records that are not valid questions pass through unchanged, so one pass validates the whole list
+_QUESTION_LIST = TypeAdapter(List[Annotated[Union[Question, Any], Field(union_mode='left_to_right')]])
+
+
+@contextmanager
+def _gc_paused():
+    # Building a large list of new objects otherwise sets off repeated full
+    # collections, each walking every object built so far
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def new_question_ids(count: int) -> List[str]:
+    """
+    `count` random version 4 UUID strings, like Question's default IDs.
+    
+    The random bytes are read once and formatted as text directly, several
+    times faster than a uuid4() call per question.
+    """
+    digits = os.urandom(16 * count).hex()
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-4{digits[i + 13:i + 16]}-"
+        f"{_UUID_VARIANT_DIGITS[digits[i + 16]]}{digits[i + 17:i + 20]}-{digits[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+def _error_message(error: ValidationError) -> str:
+    messages = []
+    for detail in error.errors():
+        location = ".".join(str(part) for part in detail["loc"])
+        messages.append(f"{location}: {detail['msg']}" if location else detail["msg"])
+    return "; ".join(messages)
+
+
+def validate_questions(records: Iterable[Dict[str, Any]]) -> Tuple[List[Question], Dict[int, str]]:
+    """
+    Validate question records in bulk, without raising on invalid ones.
+    
+    The whole list is validated in one pass; only the invalid records are
+    validated again, one at a time, for their error messages. Records
+    without an ID get one.
+    
+    Returns:
+        The valid questions in record order, and an error message for each
+        invalid record keyed by its index
+    """
+    records = list(records)
+    with _gc_paused():
+        missing = [i for i, record in enumerate(records) if isinstance(record, dict) and "id" not in record]
+        for i, question_id in zip(missing, new_question_ids(len(missing))):
+            records[i] = {**records[i], "id": question_id}
+        validated = _QUESTION_LIST.validate_python(records)
+    
+    questions = []
+    errors = {}
+    for i, item in enumerate(validated):
+        if isinstance(item, Question):
+            questions.append(item)
+            continue
+        try:
+            Question.model_validate(item)
+        except ValidationError as e:
+            errors[i] = _error_message(e)
+    return questions, errors
+
+
+def construct_questions(records: Iterable[Dict[str, Any]]) -> List[Question]:
+    """
+    Build questions from records that were already validated, such as `ValidatedRecord`s from the store.
+    
+    Nothing is checked, so this is only for trusted data. Instances are
+    filled in directly, as Question.model_construct does but without its
+    per-field bookkeeping, which makes model_construct slower than validation.
+    """
+    records = list(records)
+    new_ids = iter(new_question_ids(sum(1 for record in records if "id" not in record)))
+    questions = []
+    with _gc_paused():
+        for record in records:
+            fields = {
+                "id": record["id"] if "id" in record else next(new_ids),
+                "question": record["question"],
+                "choices": record["choices"],
+                "answer": record["answer"],
+                "topic": record.get("topic"),
+            }
+            question = object.__new__(Question)
+            object.__setattr__(question, "__dict__", fields)
+            object.__setattr__(question, "__pydantic_fields_set__", set(fields))
+            object.__setattr__(question, "__pydantic_extra__", None)
+            object.__setattr__(question, "__pydantic_private__", None)
+            questions.append(question)
+    return questions
+
+
+def iter_valid_questions(records: Iterable[Dict[str, Any]], on_invalid: Optional[Callable[[int, str], None]] = None,
+                         chunk_size: int = _VALIDATION_CHUNK_SIZE) -> Iterator[Tuple[int, Dict[str, Any], Question]]:
+    """
+    Validate a stream of question records a chunk at a time, yielding (index, record, question) for the valid ones.
+    
+    Each chunk is validated in bulk with `validate_questions`, and only one
+    chunk is held at once, so memory stays flat however long the stream is.
+    `ValidatedRecord`s skip validation and are built with `construct_questions`.
+    Indexes are positions in the stream. Invalid records are skipped and
+    passed to `on_invalid` with their index and error message.
+    """
+    records = iter(records)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        trusted = [i for i, record in enumerate(chunk) if isinstance(record, ValidatedRecord)]
+        constructed = dict(zip(trusted, construct_questions(chunk[i] for i in trusted)))
+        untrusted = [i for i, record in enumerate(chunk) if i not in constructed]
+        questions, errors = validate_questions(chunk[i] for i in untrusted)
+        errors = {untrusted[i]: error for i, error in errors.items()}
+        valid = iter(questions)
+        for i, record in enumerate(chunk):
+            if i in errors:
+                if on_invalid:
+                    on_invalid(start + i, errors[i])
+                continue
+            yield start + i, record, constructed[i] if i in constructed else next(valid)
+        start += len(chunk)
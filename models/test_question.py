@@ -0,0 +1,97 @@
+import uuid
+
+from models.question import Question, construct_questions, iter_valid_questions, new_question_ids, validate_questions
+from utils.io import ValidatedRecord
+
+CHOICES = {"A": "1", "B": "2", "C": "3", "D": "4"}
+
+
+def record(**fields):
+    return {"question": "What is 1 + 1?", "choices": dict(CHOICES), "answer": "B", **fields}
+
+
+def test_valid_records_become_questions_in_order():
+    questions, errors = validate_questions([record(id="a"), record(id="b", topic="linear functions")])
+    assert errors == {}
+    assert [q.id for q in questions] == ["a", "b"]
+    assert questions[1].topic == "linear functions"
+    assert all(isinstance(q, Question) for q in questions)
+
+
+def test_invalid_records_are_reported_by_index():
+    records = [
+        record(id="ok"),
+        record(answer="E"),
+        record(choices={"A": "1", "B": "2", "C": "3"}),
+        {"question": "No choices"},
+        "not a record",
+    ]
+    questions, errors = validate_questions(records)
+    assert [q.id for q in questions] == ["ok"]
+    assert sorted(errors) == [1, 2, 3, 4]
+    assert "must be one of the choices" in errors[1]
+    assert "exactly 4 choices" in errors[2]
+    assert "choices" in errors[3]
+
+
+def test_records_without_ids_get_unique_ones():
+    questions, _ = validate_questions([record(), record()])
+    assert questions[0].id != questions[1].id
+
+
+def test_validation_does_not_modify_records():
+    records = [record()]
+    validate_questions(records)
+    assert "id" not in records[0]
+
+
+def test_new_question_ids_are_version_4_uuids():
+    ids = new_question_ids(50)
+    assert len(set(ids)) == 50
+    for question_id in ids:
+        parsed = uuid.UUID(question_id)
+        assert str(parsed) == question_id
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_stream_validation_pairs_records_with_questions_across_chunks():
+    records = [record(id=str(i)) if i % 3 else record(answer="E") for i in range(10)]
+    invalid = []
+
+    pairs = list(iter_valid_questions(iter(records), on_invalid=lambda index, error: invalid.append(index),
+                                      chunk_size=4))
+
+    assert invalid == [0, 3, 6, 9]
+    assert [q.id for _, _, q in pairs] == [str(i) for i in range(10) if i % 3]
+    assert all(r is records[i] and q.id == str(i) for i, r, q in pairs)
+
+
+def test_stream_validation_reads_records_a_chunk_at_a_time():
+    consumed = []
+
+    def records():
+        for i in range(10):
+            consumed.append(i)
+            yield record(id=str(i))
+
+    pairs = iter_valid_questions(records(), chunk_size=4)
+    next(pairs)
+    assert consumed == [0, 1, 2, 3]
+
+
+def test_construct_questions_matches_validation():
+    records = [record(id="a", topic="linear functions"), record(id="b")]
+    assert construct_questions(records) == validate_questions(records)[0]
+
+
+def test_only_validated_records_skip_validation():
+    # Not a valid question, so only a record marked as validated gets through
+    bad = record(id="x", answer="E")
+    invalid = []
+
+    pairs = list(iter_valid_questions([ValidatedRecord(bad), bad, ValidatedRecord(record(id="y"))],
+                                      on_invalid=lambda index, error: invalid.append(index)))
+
+    assert [(index, q.id) for index, _, q in pairs] == [(0, "x"), (2, "y")]
+    assert invalid == [1]
@@ -0,0 +1,16 @@
+from typing import List, Dict, Any
+
+
+def cached_text_block(text: str) -> Dict[str, Any]:
+    """A text content block marked as the end of a cacheable prompt prefix"""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def text_block(text: str) -> Dict[str, Any]:
+    """A plain (uncached) text content block"""
+    return {"type": "text", "text": text}
+
+
+def render_text(content: List[Dict[str, Any]]) -> str:
+    """Join the text of content blocks back into a single prompt string"""
+    return "".join(block["text"] for block in content if block.get("type") == "text")
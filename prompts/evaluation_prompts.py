@@ -1,9 +1,13 @@
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Dict, List
 from models.question import Question
+from prompts.content import text_block
 
 
-def get_accuracy_prompt(question: Question) -> str:
-    return f"""You are a mathematics expert tasked with verifying the accuracy of SAT math questions and their answers.
+@lru_cache(maxsize=None)
+def get_accuracy_instructions() -> str:
+    """Static instructions shared by every accuracy evaluation"""
+    return """You are a mathematics expert tasked with verifying the accuracy of SAT math questions and their answers.
 
 A question/answer pair is considered correct if and only if:
 - The given answer is correct
@@ -18,12 +22,20 @@ Your verification process should be:
 
 Return a JSON response describing the correctness of the question/answer pair with this EXACT format:
 <json>
-{{
+{
     "correct": true or false,
     "explanation": "Summary of your verification process"
-}}
+}
 </json>
+"""
+
 
+def get_accuracy_prompt(question: Question) -> List[Dict[str, Any]]:
+    """Generate prompt content blocks for accuracy evaluation: static instructions, then the question"""
+    return [
+        # Well short of the minimum prompt cache length, so not marked for caching
+        text_block(get_accuracy_instructions()),
+        text_block(f"""
 Here is the question and answer:
 <question>
 {question.question}
@@ -38,13 +50,34 @@ D) {question.choices['D']}
 <answer>
 Stated Correct Answer: {question.answer}
 </answer>
-"""
+""")
+    ]
 
 
-def get_authenticity_prompt(question_data: Dict) -> str:
-    """Generate prompt for authenticity evaluation"""
-    return f"""You are an expert at identifying authentic SAT questions. Your task is to determine whether the following question is from a real SAT exam or was generated by AI.
+@lru_cache(maxsize=None)
+def get_authenticity_instructions() -> str:
+    """Static instructions shared by every authenticity judgement"""
+    return """You are an expert at identifying authentic SAT questions. Your task is to determine whether the question at the end of this message is from a real SAT exam or was generated by AI.
 
+Based on your analysis, decide whether the question is REAL (from an actual SAT) or GENERATED (by AI).
+
+Respond with a JSON object:
+<json>
+{
+    "is_real": true or false,
+    "confidence": "high" or "medium" or "low",
+    "reasoning": "Brief explanation of your decision"
+}
+</json>
+"""
+
+
+def get_authenticity_prompt(question_data: Dict) -> List[Dict[str, Any]]:
+    """Generate prompt content blocks for authenticity evaluation: static instructions, then the question"""
+    return [
+        # Well short of the minimum prompt cache length, so not marked for caching
+        text_block(get_authenticity_instructions()),
+        text_block(f"""
 Here is the question to evaluate:
 <question>
 Question: {question_data['question']}
@@ -55,15 +88,5 @@ B) {question_data['choices']['B']}
 C) {question_data['choices']['C']}
 D) {question_data['choices']['D']}
 </question>
-
-Based on your analysis, is this question REAL (from an actual SAT) or GENERATED (by AI)?
-
-Respond with a JSON object:
-<json>
-{{
-    "is_real": true or false,
-    "confidence": "high" or "medium" or "low",
-    "reasoning": "Brief explanation of your decision"
-}}
-</json>
-"""
\ No newline at end of file
+""")
+    ]
\ No newline at end of file
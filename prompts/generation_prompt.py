@@ -1,6 +1,9 @@
 import json
+from functools import lru_cache
 from typing import List, Dict, Any
 
+from prompts.content import cached_text_block, text_block
+
 FEW_SHOT_EXAMPLES = [
     {
         "question": "The perimeter of an isosceles triangle is 83 inches. Each of the two congruent sides of the triangle has a length of 24 inches. What is the length, in inches, of the third side?",
@@ -55,8 +58,9 @@ FEW_SHOT_EXAMPLES = [
 ]
 
 
-def get_generate_questions_prompt(count: int = 1) -> str:
-    """Generate the prompt for creating SAT questions"""
+@lru_cache(maxsize=None)
+def get_generation_instructions() -> str:
+    """Static instructions and few-shot examples shared by every generation request, rendered once"""
     
     # Build few-shot examples
     examples_text = ""
@@ -65,9 +69,9 @@ def get_generate_questions_prompt(count: int = 1) -> str:
         examples_text += json.dumps(example, indent=2)
         examples_text += "\n</example>\n"
 
-    prompt = f"""
+    return f"""
 You are an expert SAT math question generator.
-Your goal is to generate {count} high-quality, text-only SAT math question(s) that are indistinguishable from official College Board question.
+Your goal is to generate high-quality, text-only SAT math question(s) that are indistinguishable from official College Board question.
 
 The questions should fall in one of the following topics:
 <topics>
@@ -83,19 +87,80 @@ Follow this process:
 2. Generate a question that is related to the topic. It should only contain numbers and basic arithmetic operations.
 3. Generate a correct answer choice. Explain why it is correct.
 4. Generate 3 incorrect answer choices. For each incorrect answer choice, explain why it is incorrect.
-5. Output the question and answer choices in the following JSON array format:
+5. Submit the questions and answer choices with the submit_questions tool, each tagged with its topic, in the following format:
 <format>
-[
-    {{"question": "...", "choices": {{"A": "...", "B": "...", "C": "...", "D": "..."}}, "answer": "..."}},
-    {{"question": "...", "choices": {{"A": "...", "B": "...", "C": "...", "D": "..."}}, "answer": "..."}}
-]
+{{
+    "questions": [
+        {{"question": "...", "choices": {{"A": "...", "B": "...", "C": "...", "D": "..."}}, "answer": "...", "topic": "..."}},
+        {{"question": "...", "choices": {{"A": "...", "B": "...", "C": "...", "D": "..."}}, "answer": "...", "topic": "..."}}
+    ]
+}}
 </format>
 
 Here are some examples:
 <examples>
 {examples_text}
 </examples>
+"""
 
-Generate exactly {count} question(s), and do not output anything else besides the JSON array."""
+
+def get_generate_questions_prompt(count: int = 1) -> List[Dict[str, Any]]:
+    """
+    Generate the prompt for creating SAT questions.
+    
+    Returns message content blocks: the static instructions as a cacheable
+    prefix, followed by the per-request question count.
+    """
     
-    return prompt
\ No newline at end of file
+    return [
+        cached_text_block(get_generation_instructions()),
+        text_block(f"\nGenerate exactly {count} question(s) and submit them with the submit_questions tool.")
+    ]
+
+
+# Topic names from the prompt, which questions are tagged with
+TOPICS = [
+    "linear equations in one variable",
+    "linear equations in two variables",
+    "linear functions",
+    "linear inequalities",
+    "systems of linear equations",
+]
+
+# Tool the model is forced to call, so questions arrive as schema-shaped JSON instead of free text
+SUBMIT_QUESTIONS_TOOL = {
+    "name": "submit_questions",
+    "description": "Submit the generated SAT math questions.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "question": {"type": "string"},
+                        "choices": {
+                            "type": "object",
+                            "properties": {label: {"type": "string"} for label in "ABCD"},
+                            "required": list("ABCD"),
+                            "additionalProperties": False
+                        },
+                        "answer": {"type": "string", "enum": list("ABCD")},
+                        "topic": {"type": "string", "enum": TOPICS}
+                    },
+                    "required": ["question", "choices", "answer"]
+                }
+            }
+        },
+        "required": ["questions"]
+    }
+}
+
+
+def get_generation_tool_params() -> Dict[str, Any]:
+    """`tools` and `tool_choice` request parameters that force a submit_questions call"""
+    return {
+        "tools": [SUBMIT_QUESTIONS_TOOL],
+        "tool_choice": {"type": "tool", "name": SUBMIT_QUESTIONS_TOOL["name"]}
+    }
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from models.question import Question
+from prompts.evaluation_prompts import get_accuracy_prompt, get_authenticity_prompt
+from prompts.generation_prompt import get_generate_questions_prompt, get_generation_tool_params
+from utils.api import estimate_input_tokens
+
+# Shortest prefix the API will cache for Sonnet and Opus models (Haiku needs 2048)
+MIN_CACHEABLE_TOKENS = 1024
+
+QUESTION = {"question": "What is 1 + 1?", "choices": {"A": "1", "B": "2", "C": "3", "D": "4"}, "answer": "B"}
+
+
+def cached_prefix_tokens(content, tools=()):
+    """Estimated length of the prompt up to its last cache-marked block; None if nothing is marked"""
+    marked = [i for i, block in enumerate(content) if "cache_control" in block]
+    if not marked:
+        return None
+    prefix = content[:marked[-1] + 1]
+    # Tool definitions come ahead of the messages, so they are part of the cached prefix
+    return estimate_input_tokens({"messages": [{"role": "user", "content": prefix}]}) + len(json.dumps(list(tools))) // 4
+
+
+def test_generation_prefix_is_long_enough_to_cache():
+    tokens = cached_prefix_tokens(get_generate_questions_prompt(5), get_generation_tool_params()["tools"])
+    assert tokens is not None
+    assert tokens >= MIN_CACHEABLE_TOKENS
+
+
+@pytest.mark.parametrize("content", [
+    get_accuracy_prompt(Question(**QUESTION)),
+    get_authenticity_prompt(QUESTION),
+], ids=["accuracy", "authenticity"])
+def test_evaluation_prompts_mark_no_prefix_too_short_to_cache(content):
+    tokens = cached_prefix_tokens(content)
+    assert tokens is None or tokens >= MIN_CACHEABLE_TOKENS
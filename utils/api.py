@@ -0,0 +1,228 @@
+import json
+import random
+import time
+from typing import Optional, Dict, Any, List, Callable
+from anthropic import Anthropic, APIConnectionError, APIStatusError
+from anthropic.types import Message
+
+from utils.cache import get_cache, make_cache_key
+from utils.scheduler import get_scheduler
+from utils.telemetry import telemetry
+
+# Stop reasons of complete responses; anything else (e.g. max_tokens) is not cached
+CACHEABLE_STOP_REASONS = ("end_turn", "tool_use", "stop_sequence")
+
+
+def _cache_key(params: Dict[str, Any], cache_key_params: Optional[Dict[str, Any]] = None) -> str:
+    key_params = cache_key_params if cache_key_params is not None else params
+    return make_cache_key({"model": params["model"], "max_tokens": params.get("max_tokens"), **key_params})
+
+
+def estimate_input_tokens(params: Dict[str, Any]) -> int:
+    """Rough input token count of a request (about 4 characters per token of text)"""
+    chars = 0
+    for message in params.get("messages", []):
+        content = message["content"]
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(block.get("text", "")) for block in content)
+    return chars // 4 + 1
+
+
+def _delta_text(event: Any) -> Optional[str]:
+    """Text carried by a stream event: a text delta, or a piece of a tool call's input JSON"""
+    if event.type != "content_block_delta":
+        return None
+    if event.delta.type == "text_delta":
+        return event.delta.text
+    if event.delta.type == "input_json_delta":
+        return event.delta.partial_json
+    return None
+
+
+def response_text(response: Message) -> str:
+    """A response's text blocks, with tool calls rendered as their input JSON, as one string"""
+    parts = []
+    for block in response.content:
+        if block.type == "text":
+            parts.append(block.text)
+        elif block.type == "tool_use":
+            parts.append(json.dumps(block.input))
+    return "".join(parts)
+
+
+def send_message(client: Anthropic, on_text: Optional[Callable[[str], None]] = None, **params) -> Message:
+    """
+    Send a Messages API request through the shared request scheduler, recording telemetry.
+    
+    With `on_text`, the response is streamed and every text delta (or tool
+    input JSON delta) is passed to it as it arrives. A stream that fails before producing any text is
+    retried like any other request; one that fails part-way is not, since
+    its text has already been handed on.
+    """
+    retries = {"total": 0, "throttled": 0}
+    first_token = {}
+    
+    def count_retry(error: Exception, throttled: bool):
+        retries["total"] += 1
+        retries["throttled"] += throttled
+    
+    def stream() -> Message:
+        delivered = False
+        try:
+            with client.messages.stream(**params) as events:
+                for event in events:
+                    text = _delta_text(event)
+                    if not text:
+                        continue
+                    if not delivered:
+                        first_token["at"] = time.monotonic()
+                        delivered = True
+                    on_text(text)
+                return events.get_final_message()
+        except (APIStatusError, APIConnectionError) as e:
+            if delivered:
+                raise RuntimeError(f"Response stream failed part-way: {e}") from e
+            raise
+    
+    started = time.monotonic()
+    response = get_scheduler().call(
+        stream if on_text else lambda: client.messages.create(**params),
+        input_tokens=estimate_input_tokens(params),
+        max_tokens=params.get("max_tokens", 0),
+        usage_of=lambda message: message.usage,
+        on_retry=count_retry
+    )
+    telemetry.record_call(
+        params["model"],
+        response.usage,
+        wall_time=time.monotonic() - started,
+        ttft=first_token["at"] - started if "at" in first_token else None,
+        stop_reason=response.stop_reason,
+        retries=retries["total"],
+        throttled=retries["throttled"]
+    )
+    return response
+
+
+def create_message(client: Anthropic, cache: bool = True, cache_key_params: Optional[Dict[str, Any]] = None,
+                   on_text: Optional[Callable[[str], None]] = None,
+                   validate: Optional[Callable[[Message], Any]] = None, **params) -> Message:
+    """
+    Send a Messages API request, serving it from the response cache when possible.
+    
+    Args:
+        client: Anthropic client to send the request with
+        cache: Whether this request may be served from / stored in the cache
+        cache_key_params: Parameters to key the cache entry on instead of the
+            request itself (e.g. a file hash in place of a large document)
+        on_text: Stream the response, passing each text or tool input JSON
+            delta to this callback (a cached response is passed in one piece)
+        validate: Check a response before it is cached or returned, raising if
+            the caller cannot use it. A fresh response that fails is not cached;
+            a cached one that fails is dropped and requested again.
+        **params: Keyword arguments for `client.messages.create`
+        
+    Returns:
+        The API response message
+    """
+    response_cache = get_cache() if cache else None
+    key = _cache_key(params, cache_key_params) if response_cache is not None else None
+    
+    cached = response_cache.get(key) if response_cache is not None else None
+    if cached is not None:
+        response = Message.model_validate_json(cached)
+        try:
+            if validate:
+                validate(response)
+        except Exception:
+            # Cached before it was checked; a new response may be usable
+            response_cache.delete(key)
+        else:
+            telemetry.record_call(params["model"], stop_reason=response.stop_reason, cache_hit=True)
+            if on_text:
+                on_text(response_text(response))
+            return response
+    
+    response = send_message(client, on_text=on_text, **params)
+    
+    # A response the caller cannot use would be replayed on every retry
+    if validate:
+        validate(response)
+    
+    # Truncated or otherwise incomplete responses are not worth replaying
+    if response_cache is not None and response.stop_reason in CACHEABLE_STOP_REASONS:
+        response_cache.put(key, params["model"], response.model_dump_json())
+    
+    return response
+
+
+def create_message_batch(client: Anthropic, requests: List[Dict[str, Any]], cache: bool = True,
+                         poll_interval: float = 5.0, max_poll_interval: float = 60.0,
+                         timeout: Optional[float] = None) -> List[Optional[Message]]:
+    """
+    Send many Messages API requests as one asynchronous message batch and wait for the results.
+    
+    Requests already in the response cache are not submitted. The batch is
+    polled with exponential backoff (plus jitter) until it has ended.
+    
+    Args:
+        client: Anthropic client to send the batch with
+        requests: Keyword arguments for `client.messages.create`, one dict per request
+        cache: Whether responses may be served from / stored in the cache
+        poll_interval: Initial delay between status checks, in seconds
+        max_poll_interval: Upper bound on the delay between status checks
+        timeout: Give up waiting after this many seconds (None waits until the batch ends)
+        
+    Returns:
+        Response messages in the same order as `requests`; None for requests
+        that errored, expired or were canceled
+        
+    Raises:
+        TimeoutError: If the batch has not ended within `timeout`
+    """
+    response_cache = get_cache() if cache else None
+    responses: List[Optional[Message]] = [None] * len(requests)
+    keys = [_cache_key(params) for params in requests]
+    
+    pending = []
+    for i, (params, key) in enumerate(zip(requests, keys)):
+        cached = response_cache.get(key) if response_cache else None
+        if cached is not None:
+            responses[i] = Message.model_validate_json(cached)
+            telemetry.record_call(params["model"], stop_reason=responses[i].stop_reason, cache_hit=True)
+        else:
+            pending.append(i)
+    
+    if not pending:
+        return responses
+    
+    scheduler = get_scheduler()
+    batch = scheduler.call(lambda: client.messages.batches.create(
+        requests=[{"custom_id": f"request-{i}", "params": requests[i]} for i in pending]
+    ))
+    
+    started = time.monotonic()
+    delay = poll_interval
+    while batch.processing_status != "ended":
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Message batch {batch.id} did not finish within {timeout} seconds")
+        time.sleep(delay * random.uniform(0.8, 1.2))
+        delay = min(delay * 2, max_poll_interval)
+        batch = scheduler.call(lambda: client.messages.batches.retrieve(batch.id))
+    
+    for entry in scheduler.call(lambda: client.messages.batches.results(batch.id)):
+        if entry.result.type != "succeeded":
+            continue
+        
+        i = int(entry.custom_id.rsplit("-", 1)[1])
+        message = entry.result.message
+        responses[i] = message
+        telemetry.record_call(requests[i]["model"], message.usage, wall_time=time.monotonic() - started,
+                              stop_reason=message.stop_reason, batch=True)
+        
+        if response_cache and message.stop_reason in CACHEABLE_STOP_REASONS:
+            response_cache.put(keys[i], requests[i]["model"], message.model_dump_json())
+    
+    return responses
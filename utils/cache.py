@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from config import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_MAX_AGE
+
+
+def make_cache_key(params: Dict[str, Any]) -> str:
+    """Content-address request parameters as a SHA-256 hex digest"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache of API responses keyed by request content.
+
+    Entries older than `max_age` seconds are treated as misses, and once the
+    stored responses exceed `max_bytes` the least recently used entries are
+    evicted. Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 max_age: float = DEFAULT_CACHE_MAX_AGE):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.max_age:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, value: str):
+        """Store a value and evict least recently used entries if over the size limit"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, len(value.encode('utf-8')), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Drop the entry for key, if there is one"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Walk entries from least to most recently used until enough space is freed
+        excess = total - self.max_bytes
+        stale_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size of the cache"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_dir: str = DEFAULT_CACHE_DIR
+_cache_enabled: bool = True
+_cache_lock = threading.Lock()
+
+
+def configure_cache(cache_dir: Optional[str] = None, enabled: bool = True):
+    """Set the process-wide cache location, or disable caching entirely"""
+    global _cache, _cache_dir, _cache_enabled
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+        _cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        _cache_enabled = enabled
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, opening it on first use; None if disabled"""
+    global _cache
+    if not _cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(_cache_dir)
+        return _cache
+
+
+def current_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache if it has been opened, without opening it"""
+    with _cache_lock:
+        return _cache
@@ -0,0 +1,133 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from config import (
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT
+)
+from utils.telemetry import telemetry
+
+# The SDK is imported inside the functions below, so that configuring the
+# client at CLI startup stays cheap. Pool limits and timeouts are built from
+# the classes the SDK re-exports, so they always come from the HTTP library
+# the installed SDK is built on (httpx2 in current releases, httpx before).
+
+_settings: Dict[str, Any] = {
+    "max_connections": DEFAULT_MAX_CONNECTIONS,
+    "max_keepalive_connections": DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    "keepalive_expiry": DEFAULT_KEEPALIVE_EXPIRY,
+    "timeout": DEFAULT_TIMEOUT,
+    "connect_timeout": DEFAULT_CONNECT_TIMEOUT,
+    "http2": False,
+}
+_http_client = None
+_clients: Dict[Optional[str], Any] = {}
+_client_lock = threading.Lock()
+
+
+def configure_client(**settings):
+    """
+    Set the connection pool and timeout settings of the shared API clients.
+
+    Accepts max_connections, max_keepalive_connections, keepalive_expiry,
+    timeout, connect_timeout and http2. Clients created earlier are closed.
+    """
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise TypeError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    close_clients()
+    with _client_lock:
+        _settings.update(settings)
+
+
+def _http_client_kwargs() -> Dict[str, Any]:
+    from anthropic import DEFAULT_CONNECTION_LIMITS, Timeout
+
+    if _settings["http2"]:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ImportError("HTTP/2 needs the h2 package: pip install h2")
+
+    limits_type = type(DEFAULT_CONNECTION_LIMITS)
+    return {
+        "limits": limits_type(
+            max_connections=_settings["max_connections"],
+            max_keepalive_connections=_settings["max_keepalive_connections"],
+            keepalive_expiry=_settings["keepalive_expiry"]
+        ),
+        "timeout": Timeout(_settings["timeout"], connect=_settings["connect_timeout"]),
+        "http2": _settings["http2"],
+    }
+
+
+def _build_response_models():
+    """
+    Build the schemas of the SDK's response models on the calling thread.
+
+    The SDK defers building each model until the first response that needs
+    it is parsed. When worker threads parse their first responses at the same
+    time they race on that build, and one of them fails with pydantic's
+    "BaseModel cannot be instantiated directly" error.
+    """
+    from typing import get_args
+    from pydantic import BaseModel
+    from anthropic.types import Message, RawMessageStreamEvent
+    from anthropic.types.messages import MessageBatch, MessageBatchIndividualResponse
+
+    pending = [Message, RawMessageStreamEvent, MessageBatch, MessageBatchIndividualResponse]
+    seen = set()
+    while pending:
+        annotation = pending.pop()
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if annotation in seen:
+                continue
+            seen.add(annotation)
+            # Reading the schema forces the deferred build
+            annotation.__pydantic_core_schema__["type"]
+            pending.extend(field.annotation for field in annotation.model_fields.values())
+        else:
+            pending.extend(get_args(annotation))
+
+
+def get_client(api_key: Optional[str] = None):
+    """
+    Return the process-wide Anthropic client for `api_key` (default: ANTHROPIC_API_KEY).
+
+    Every client shares one keep-alive connection pool, so generators,
+    evaluators and extraction reuse connections instead of each opening
+    their own. Retries are left to the request scheduler.
+    """
+    from anthropic import Anthropic, DefaultHttpxClient
+
+    global _http_client
+    with _client_lock:
+        if api_key not in _clients:
+            if _http_client is None:
+                _build_response_models()
+                _http_client = DefaultHttpxClient(
+                    event_hooks={"request": [telemetry.connections.trace_request]},
+                    **_http_client_kwargs()
+                )
+            _clients[api_key] = Anthropic(
+                api_key=api_key or os.getenv("ANTHROPIC_API_KEY"),
+                http_client=_http_client,
+                timeout=_settings["timeout"],
+                max_retries=0
+            )
+        return _clients[api_key]
+
+
+def close_clients():
+    """Close the shared connection pool; clients are created again on next use"""
+    global _http_client
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _clients.clear()
+
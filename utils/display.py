@@ -13,6 +13,8 @@ def display_question(question: Question, index: int = None, total: int = None):
     """Display a question with optional numbering"""
     if index and total:
         display_section_header(f"Question {index}/{total}:")
+    elif index:
+        display_section_header(f"Question {index}:")
     else:
         display_section_header("Generated Question:")
     
@@ -27,12 +29,46 @@ def display_evaluation(evaluation: dict):
     click.echo("Accuracy Evaluation:")
     click.echo("-" * 50)
     click.echo(f"Mathematically Correct: {'✓' if evaluation['correct'] else '✗'}")
+    if evaluation.get('verified_locally'):
+        click.echo("Verified by: local checker")
     click.echo(f"Explanation: {evaluation['explanation']}")
     if evaluation.get('solution_steps'):
         click.echo(f"\nSolution Steps:\n{evaluation['solution_steps']}")
     click.echo("-" * 50)
 
 
+def display_similarity(evaluation: dict):
+    """Display similarity results"""
+    click.echo("\n" + "-" * 50)
+    click.echo("Similarity Evaluation:")
+    click.echo("-" * 50)
+    click.echo(f"Similarity Score: {evaluation['score']:.2f} {'✗ Too similar' if evaluation['too_similar'] else '✓'}")
+    for match in evaluation['nearest']:
+        click.echo(f"\n[{match['similarity']:.2f}] {match['id']}: {match['question']}")
+    click.echo("-" * 50)
+
+
+def display_authenticity_summary(summary: dict):
+    """Display authenticity test counts and how to read them"""
+    click.echo(f"Total Questions: {summary['total_questions']}")
+    click.echo(f"Correct Predictions: {summary['correct_predictions']} / {summary['total_questions']}")
+    click.echo(f"Overall Accuracy: {summary['accuracy_percentage']:.1f}%")
+    
+    click.echo("\nBreakdown:")
+    click.echo(f"- Real Questions: {summary['real_questions']['correctly_identified']} / {summary['real_questions']['count']} correctly identified ({summary['real_questions']['accuracy']*100:.1f}%)")
+    click.echo(f"- Generated Questions: {summary['generated_questions']['correctly_identified']} / {summary['generated_questions']['count']} correctly identified ({summary['generated_questions']['accuracy']*100:.1f}%)")
+    
+    click.echo("\nInterpretation:")
+    if summary['accuracy_percentage'] < 60:
+        click.echo("✓ Excellent! The AI has difficulty distinguishing generated from real questions.")
+    elif summary['accuracy_percentage'] < 70:
+        click.echo("✓ Good! Generated questions are fairly authentic.")
+    elif summary['accuracy_percentage'] < 80:
+        click.echo("⚠ Fair. Generated questions have some distinguishable patterns.")
+    else:
+        click.echo("✗ Poor. Generated questions are easily distinguishable from real ones.")
+
+
 def display_summary(total: int, correct: int):
     """Display summary statistics"""
     display_section_header("SUMMARY")
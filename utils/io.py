@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+# Alternative field names found in question files, and the name each is read as
+QUESTION_FIELD_ALIASES = {"content": "question", "correct_answer": "answer"}
+
+# How much of a JSON file is read at a time while streaming it
+_READ_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: str, data: Any, **dump_kwargs):
+    """Write JSON to path via a temporary file so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def write_text_atomic(path: str, text: str):
+    """Write text to path via a temporary file so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def is_jsonl_path(path: str) -> bool:
+    """Whether a path names a JSON Lines file, judging by its extension"""
+    return path.endswith(('.jsonl', '.ndjson'))
+
+
+class JsonlWriter:
+    """Writes one JSON object per line, flushing after every record"""
+    
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8')
+    
+    def write(self, record: Any):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+    
+    def close(self):
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _sniff_jsonl(path: str) -> bool:
+    """Whether a file without a JSONL extension nevertheless holds one object per line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        # Bounded, so a large single-line JSON document is not read whole
+        first_line = f.readline(_READ_CHUNK_SIZE)
+        if not first_line.endswith('\n'):
+            return False
+        first_line = first_line.strip()
+        if not first_line.startswith('{'):
+            return False
+        try:
+            json.loads(first_line)
+        except json.JSONDecodeError:
+            return False
+        # A single-line JSON document is not JSONL unless more records follow
+        return any(line.strip() for line in f)
+
+
+class ValidatedRecord(dict):
+    """
+    A question record already known to hold a valid question.
+    
+    The question store returns its rows this way when they were validated
+    on the way in, so `iter_valid_questions` builds them without validating
+    again. Records read from files are plain dicts and are always validated.
+    """
+
+
+def normalize_question_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename alias fields (content, correct_answer) to question and answer, in place"""
+    if not isinstance(record, dict):
+        return record
+    for alias, field in QUESTION_FIELD_ALIASES.items():
+        if alias in record:
+            value = record.pop(alias)
+            record.setdefault(field, value)
+    return record
+
+
+class _JsonReader:
+    """
+    Reads JSON values one at a time from a file, holding only the unread part of the current chunk.
+
+    Each value is decoded with the C decoder from the buffer; a value cut off
+    by the end of the buffer is retried once the next chunk has been read.
+    """
+
+    def __init__(self, f: TextIO):
+        self._file = f
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at the end of the file"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {chars!r}, found {char or 'end of file'!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ValueError(f"Invalid JSON: {e.msg}")
+            self._fill()
+
+    def array(self) -> Iterator[Any]:
+        """Elements of the array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _iter_json_questions(f: TextIO) -> Iterator[Dict[str, Any]]:
+    reader = _JsonReader(f)
+    if reader.peek() == "[":
+        yield from reader.array()
+        return
+
+    # An object: either a {"questions": [...]} document or a single question.
+    # Keys are read one at a time, so the questions array is streamed wherever it is.
+    reader.expect("{")
+    fields = {}
+    if reader.peek() == "}":
+        reader.expect("}")
+        yield fields
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "questions" and reader.peek() == "[":
+            yield from reader.array()
+            return
+        fields[key] = reader.value()
+        if reader.expect(",}") == "}":
+            yield fields
+            return
+
+
+def iter_question_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the question dicts in a JSON or JSONL file, in constant memory.
+    
+    JSON files may hold a list of questions, a {"questions": [...]} document
+    or a single question; arrays are parsed incrementally rather than loaded
+    whole. JSONL files are read one line at a time. Alias fields are renamed
+    (see `normalize_question_record`).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if is_jsonl_path(path) or _sniff_jsonl(path):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = _iter_json_questions(f)
+        for record in records:
+            yield normalize_question_record(record)
+
+
+def sample_question_records(path: str, count: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    A uniform random sample of `count` question records from a file, in random order.
+    
+    The file is streamed once with reservoir sampling, so only the sample is
+    held in memory. The same seed gives the same sample of the same file.
+    """
+    rng = random.Random(seed)
+    sample = []
+    for seen, record in enumerate(iter_question_records(path)):
+        if seen < count:
+            sample.append(record)
+        else:
+            # Keep the record with probability count / (seen + 1)
+            slot = rng.randrange(seen + 1)
+            if slot < count:
+                sample[slot] = record
+    rng.shuffle(sample)
+    return sample
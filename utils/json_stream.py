@@ -0,0 +1,108 @@
+import json
+from typing import Any, List, Optional
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a JSON array arriving in pieces (e.g. a streamed response).
+
+    Text before the array is skipped, as is anything after it. With `key`, the
+    array is the value of that key in an enclosing object (e.g. '{"questions": [...]}').
+    Each element is parsed and returned by `feed` as soon as it is complete,
+    and consumed text is discarded, so memory stays bounded by the largest element.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.started = False
+        self.complete = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._element_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add the next piece of text.
+
+        Returns:
+            Array elements completed by this piece, in order
+
+        Raises:
+            ValueError: If a completed element is not valid JSON
+        """
+        if self.complete:
+            return []
+        self._buffer += text
+        if not self.started and not self._find_start():
+            return []
+
+        elements = []
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer):
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        elements.append(self._take(i + 1))
+            elif char in " \t\r\n":
+                pass
+            elif self._depth == 1 and char in ",]":
+                # A scalar element ends at the next separator
+                if self._element_start is not None:
+                    elements.append(self._take(i))
+                if char == "]":
+                    self.complete = True
+                    break
+            else:
+                if self._depth == 1 and self._element_start is None:
+                    self._element_start = i
+                if char == '"':
+                    self._in_string = True
+                elif char in "[{":
+                    self._depth += 1
+                elif char in "]}":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        elements.append(self._take(i + 1))
+            i += 1
+
+        # Drop everything already parsed, keeping only an unfinished element
+        keep_from = self._element_start if self._element_start is not None else i
+        self._buffer = buffer[keep_from:]
+        if self._element_start is not None:
+            self._element_start = 0
+        self._pos = i - keep_from
+        return elements
+
+    def _find_start(self) -> bool:
+        start = 0
+        if self.key is not None:
+            start = self._buffer.find(json.dumps(self.key))
+            if start == -1:
+                return False
+        bracket = self._buffer.find("[", start)
+        if bracket == -1:
+            return False
+        self.started = True
+        self._depth = 1
+        self._buffer = self._buffer[bracket + 1:]
+        self._pos = 0
+        return True
+
+    def _take(self, end: int) -> Any:
+        start = self._element_start
+        self._element_start = None
+        text = self._buffer[start:end]
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid array element: {e}\nElement: {text}")
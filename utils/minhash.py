@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import json
+import re
+import sys
+import struct
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+_MAX_HASH = (1 << 32) - 1
+
+_TOKEN_PATTERN = re.compile(r"[a-z]+|\d+(?:[./]\d+)?")
+
+INDEX_VERSION = 2
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Word n-grams of lowercased text; short texts yield a single shingle of all their tokens"""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class MinHashIndex:
+    """
+    Near-duplicate index of texts using MinHash signatures and LSH banding.
+
+    Each word shingle is hashed once with SHAKE-128 into `num_perm`
+    independent 32-bit hash values, and a text's signature is the element-wise
+    minimum over its shingles; the agreement rate of two signatures estimates
+    the Jaccard similarity of their shingle sets. Signatures are split into
+    `bands` bands of `num_perm / bands` rows, and texts sharing any band are
+    candidates, so a query only compares against a handful of documents
+    instead of the whole corpus.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self._salt = f"{seed}:".encode("utf-8")
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.signatures = array("I")
+        self.buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in range(bands)]
+        self.fingerprint = ""
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """MinHash signature of a text"""
+        # SHAKE is stable across processes (unlike hash()), so persisted signatures stay valid
+        rows = [
+            self._unpack(hashlib.shake_128(self._salt + s.encode("utf-8")).digest(4 * self.num_perm))
+            for s in shingles(text, self.shingle_size)
+        ]
+        if not rows:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(min(column) for column in zip(*rows))
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Iterable[Tuple[int, int]]:
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, hash(signature[start:start + self.rows])
+
+    def add(self, doc_id: str, text: str):
+        """Add a document to the index"""
+        index = len(self.ids)
+        signature = self.signature(text)
+        self.ids.append(doc_id)
+        self.texts.append(text)
+        self.signatures.extend(signature)
+        for band, key in self._band_keys(signature):
+            self.buckets[band][key].append(index)
+
+    def query(self, text: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Find the most similar indexed documents.
+
+        Returns:
+            Up to `top_k` (document index, estimated Jaccard similarity) pairs,
+            most similar first
+        """
+        signature = self.signature(text)
+
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        scored = []
+        for index in candidates:
+            start = index * self.num_perm
+            stored = self.signatures[start:start + self.num_perm]
+            matches = sum(1 for x, y in zip(signature, stored) if x == y)
+            scored.append((index, matches / self.num_perm))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:top_k]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def save(self, path: str):
+        """
+        Write the index as JSON: a version and corpus fingerprint header, the
+        documents, and the signatures as base64 of little-endian 32-bit values.
+        LSH buckets are rebuilt from the signatures on load.
+        """
+        signatures = array("I", self.signatures)
+        if sys.byteorder != "little":
+            signatures.byteswap()
+        state = {
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "params": [self.num_perm, self.bands, self.shingle_size, self.seed],
+            "ids": self.ids,
+            "texts": self.texts,
+            "signatures": base64.b64encode(signatures.tobytes()).decode("ascii"),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "MinHashIndex":
+        """Load an index written by `save`; raises ValueError for an incompatible, corrupt or truncated file"""
+        with open(path, "rb") as f:
+            state = json.loads(f.read())
+        if not isinstance(state, dict) or state.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version in {path}")
+
+        try:
+            num_perm, bands, shingle_size, seed = state["params"]
+            index = cls(num_perm=num_perm, bands=bands, shingle_size=shingle_size, seed=seed)
+            index.fingerprint = state["fingerprint"]
+            index.ids = list(state["ids"])
+            index.texts = list(state["texts"])
+            index.signatures.frombytes(base64.b64decode(state["signatures"], validate=True))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed similarity index {path}: {e}") from e
+        if sys.byteorder != "little":
+            index.signatures.byteswap()
+        if len(index.ids) != len(index.texts) or len(index.signatures) != len(index.ids) * index.num_perm:
+            raise ValueError(f"Truncated similarity index {path}")
+
+        # Band keys use hash() of int tuples, which is stable across processes
+        for document in range(len(index.ids)):
+            start = document * index.num_perm
+            signature = tuple(index.signatures[start:start + index.num_perm])
+            for band, key in index._band_keys(signature):
+                index.buckets[band][key].append(document)
+        return index
@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from config import DEFAULT_PIPELINE_QUEUE_SIZE
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# How often blocked workers check whether the pipeline was stopped, in seconds
+_POLL_INTERVAL = 0.1
+
+
+class Stage:
+    """
+    One step of a `run_pipeline` pipeline.
+
+    `func` is called with each item on `concurrency` worker threads and
+    returns the item to pass downstream, or None to drop it. Items are taken
+    from a queue holding at most `queue_size` items, so a slow stage blocks
+    the stages before it instead of letting work pile up in memory.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], concurrency: int = 1,
+                 queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self.func = func
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(1, queue_size)
+        # Counters for the end-of-run report
+        self.processed = 0
+        self.dropped = 0
+        self.busy_time = 0.0
+        self.max_queue_depth = 0
+
+
+class _Pipeline:
+    def __init__(self, source: Iterable[Any], stages: List[Stage]):
+        self.source = source
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self.output = queue.Queue()
+        self.stopped = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.lock = threading.Lock()
+        self.threads: List[threading.Thread] = []
+
+    def start(self):
+        self._spawn(self._feed)
+        for index, stage in enumerate(self.stages):
+            outbox = self.queues[index + 1] if index + 1 < len(self.stages) else self.output
+            remaining = [stage.concurrency]
+            for _ in range(stage.concurrency):
+                self._spawn(self._work, stage, self.queues[index], outbox, remaining)
+
+    def stop(self):
+        self.stopped.set()
+
+    def _spawn(self, target: Callable, *args):
+        # Daemon threads, so a source blocked on a slow API call can't keep the process alive
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def _fail(self, error: BaseException):
+        with self.lock:
+            if self.error is None:
+                self.error = error
+        self.stopped.set()
+        self.output.put(_DONE)
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        while not self.stopped.is_set():
+            try:
+                target.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self):
+        inbox = self.queues[0] if self.stages else self.output
+        try:
+            for item in self.source:
+                if not self._put(inbox, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+            return
+        self._put(inbox, _DONE)
+
+    def _work(self, stage: Stage, inbox: queue.Queue, outbox: queue.Queue, remaining: List[int]):
+        while not self.stopped.is_set():
+            try:
+                item = inbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if item is _DONE:
+                # Let the stage's other workers see the end of input too; the last one passes it on
+                inbox.put(_DONE)
+                with self.lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(outbox, _DONE)
+                return
+
+            with self.lock:
+                stage.max_queue_depth = max(stage.max_queue_depth, inbox.qsize() + 1)
+            started = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except BaseException as e:
+                self._fail(e)
+                return
+            with self.lock:
+                stage.busy_time += time.perf_counter() - started
+                stage.processed += 1
+                if result is None:
+                    stage.dropped += 1
+
+            if result is not None and not self._put(outbox, result):
+                return
+
+
+def run_pipeline(source: Iterable[Any], stages: List[Stage]) -> Iterator[Any]:
+    """
+    Stream items from `source` through `stages`, yielding what leaves the last stage.
+
+    Every stage runs at the same time on its own worker threads, connected by
+    bounded queues, so an item moves on to the next stage as soon as it is
+    done with the current one. Items are yielded in completion order.
+
+    The first exception raised by the source or a stage stops the pipeline and
+    is re-raised to the caller. Closing the iterator early stops it too.
+    """
+    pipeline = _Pipeline(source, stages)
+    pipeline.start()
+    try:
+        while True:
+            item = pipeline.output.get()
+            if item is _DONE:
+                break
+            yield item
+        if pipeline.error is not None:
+            raise pipeline.error
+    finally:
+        pipeline.stop()
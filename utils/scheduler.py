@@ -0,0 +1,250 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+from config import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES
+
+T = TypeVar("T")
+
+# Status codes worth retrying; 429 and 529 also mean the API wants us to slow down
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+THROTTLE_STATUS_CODES = {429, 529}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`.
+
+    The balance may go negative when a request turns out to cost more than
+    estimated; later acquisitions then wait for the debt to be repaid.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float):
+        """Block until `amount` tokens are available, then take them"""
+        # A single request larger than the bucket can only wait for a full bucket
+        amount = min(amount, self.capacity)
+        with self._condition:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                self._condition.wait((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """Take (positive) or return (negative) tokens after the real cost is known"""
+        with self._condition:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+            self._condition.notify_all()
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit tuned by additive-increase / multiplicative-decrease.
+
+    Every successful request raises the limit by 1/limit (about +1 per round
+    of requests); a throttled request halves it, at most once per `cooldown`
+    seconds so a burst of simultaneous 429s counts as one signal.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease_factor: float = 0.5, cooldown: float = 1.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, from the retry-after(-ms) headers"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        if "retry-after-ms" in response.headers:
+            return float(response.headers["retry-after-ms"]) / 1000
+        if "retry-after" in response.headers:
+            return float(response.headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class RequestScheduler:
+    """
+    Central gate that every API request goes through.
+
+    Enforces optional requests-per-minute and input/output tokens-per-minute
+    budgets, adapts the number of concurrent requests to 429/529 responses,
+    and retries transient failures with jittered exponential backoff (or the
+    server's retry-after, when given). While a retry-after is pending, all
+    requests wait, not just the throttled one.
+    """
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 input_tokens_per_minute: Optional[float] = None,
+                 output_tokens_per_minute: Optional[float] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.input_tokens = TokenBucket(input_tokens_per_minute) if input_tokens_per_minute else None
+        self.output_tokens = TokenBucket(output_tokens_per_minute) if output_tokens_per_minute else None
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.throttled = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_for_pause(self):
+        while True:
+            with self._lock:
+                remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def _pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _refund(self, input_tokens: int, max_tokens: int):
+        """Hand back the token reservations of an attempt that failed, so errors don't drain the buckets"""
+        if self.input_tokens:
+            self.input_tokens.adjust(-input_tokens)
+        if self.output_tokens:
+            self.output_tokens.adjust(-max_tokens)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform between 0 and the capped exponential delay
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, send: Callable[[], T], input_tokens: int = 0, max_tokens: int = 0,
+             usage_of: Optional[Callable[[T], Any]] = None,
+             on_retry: Optional[Callable[[Exception, bool], None]] = None) -> T:
+        """
+        Run `send` once the rate limits allow, retrying transient failures.
+
+        Args:
+            send: Performs the API request
+            input_tokens: Estimated input tokens of the request
+            max_tokens: Output tokens to reserve (the request's max_tokens)
+            usage_of: Extracts the `usage` of a result, to settle the token
+                buckets with the real counts instead of the estimates
+
+        Returns:
+            Whatever `send` returns
+
+        Raises:
+            The last error, once retries are exhausted or for non-retryable errors
+        """
+        # Imported here so configuring the scheduler at CLI startup doesn't load the SDK
+        from anthropic import APIConnectionError, APIStatusError
+        
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_pause()
+            if self.requests:
+                self.requests.acquire(1)
+            if self.input_tokens:
+                self.input_tokens.acquire(input_tokens)
+            if self.output_tokens:
+                self.output_tokens.acquire(max_tokens)
+
+            self.limiter.acquire()
+            try:
+                result = send()
+            except (APIStatusError, APIConnectionError) as e:
+                status = getattr(e, "status_code", None)
+                throttled = status in THROTTLE_STATUS_CODES
+                self.limiter.release(throttled=throttled)
+                self._refund(input_tokens, max_tokens)
+
+                retryable = status is None or status in RETRYABLE_STATUS_CODES
+                if not retryable or attempt == self.max_retries:
+                    raise
+
+                retry_after = get_retry_after(e)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                with self._lock:
+                    self.retries += 1
+                    self.throttled += throttled
+                if on_retry:
+                    on_retry(e, throttled)
+                if throttled:
+                    self._pause(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            except BaseException:
+                self.limiter.release()
+                self._refund(input_tokens, max_tokens)
+                raise
+
+            self.limiter.release()
+
+            usage = usage_of(result) if usage_of else None
+            if usage is not None:
+                if self.input_tokens:
+                    self.input_tokens.adjust((getattr(usage, "input_tokens", 0) or 0) - input_tokens)
+                if self.output_tokens:
+                    self.output_tokens.adjust((getattr(usage, "output_tokens", 0) or 0) - max_tokens)
+            return result
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def configure_scheduler(**kwargs):
+    """Replace the process-wide scheduler; accepts RequestScheduler's arguments"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = RequestScheduler(**kwargs)
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide scheduler, creating an unlimited one on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
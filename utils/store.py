@@ -0,0 +1,464 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.io import ValidatedRecord, is_jsonl_path, iter_question_records
+
+# Question sources
+GENERATED = "generated"
+REAL = "real"
+
+# Evaluation kinds
+ACCURACY = "accuracy"
+AUTHENTICITY = "authenticity"
+SIMILARITY = "similarity"
+
+# Rows fetched per query while streaming, so large stores are never loaded at once
+_PAGE_SIZE = 500
+
+_QUESTION_COLUMNS = "id, content_hash, source, question, choices, answer, topic, model, run_id, created_at, validated"
+
+
+def question_hash(record: Dict[str, Any]) -> str:
+    """Content hash of a question record (its text, choices and answer), independent of its ID"""
+    canonical = json.dumps(
+        [record.get("question", ""), record.get("choices", {}), record.get("answer", "")],
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _evaluation_status(kind: str, result: Dict[str, Any]) -> Optional[str]:
+    """Status recorded on the question for an evaluation, for the indexed status columns"""
+    if kind == ACCURACY:
+        return "correct" if result.get("correct") else "incorrect"
+    if kind == AUTHENTICITY:
+        # Whether the judge was fooled into thinking a generated question is real
+        return "judged_real" if result.get("predicted_real") else "judged_generated"
+    if kind == SIMILARITY:
+        return "too_similar" if result.get("too_similar") else "distinct"
+    raise ValueError(f"Unknown evaluation kind: {kind}")
+
+
+class QuestionStore:
+    """
+    Local SQLite store of questions and their evaluations.
+
+    Questions are keyed by ID and deduplicated by content hash, so the same
+    question added from several files or runs is stored once. Each question
+    keeps its latest evaluation of every kind (accuracy, authenticity,
+    similarity), and its status per kind is indexed along with topic, model
+    and run. Queries stream rows a page at a time. Safe to share between threads.
+
+    Each row records whether it was validated as a Question before it was
+    added. Validated rows are returned as `ValidatedRecord`s, which load
+    without validating again; the rest (e.g. real questions added by
+    `store import` as they are) are validated like records from files.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS questions (
+                id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL UNIQUE,
+                source TEXT NOT NULL,
+                question TEXT NOT NULL,
+                choices TEXT NOT NULL,
+                answer TEXT,
+                topic TEXT,
+                model TEXT,
+                run_id TEXT,
+                created_at REAL NOT NULL,
+                accuracy_status TEXT,
+                authenticity_status TEXT,
+                similarity_status TEXT,
+                validated INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_questions_source ON questions (source);
+            CREATE INDEX IF NOT EXISTS idx_questions_topic ON questions (topic);
+            CREATE INDEX IF NOT EXISTS idx_questions_model ON questions (model);
+            CREATE INDEX IF NOT EXISTS idx_questions_run ON questions (run_id);
+            CREATE INDEX IF NOT EXISTS idx_questions_accuracy ON questions (accuracy_status);
+            CREATE INDEX IF NOT EXISTS idx_questions_authenticity ON questions (authenticity_status);
+            CREATE INDEX IF NOT EXISTS idx_questions_similarity ON questions (similarity_status);
+
+            CREATE TABLE IF NOT EXISTS evaluations (
+                question_id TEXT NOT NULL REFERENCES questions (id) ON DELETE CASCADE,
+                kind TEXT NOT NULL,
+                result TEXT NOT NULL,
+                model TEXT,
+                run_id TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (question_id, kind)
+            );
+            CREATE INDEX IF NOT EXISTS idx_evaluations_run ON evaluations (run_id);
+        """)
+        # Stores created before rows recorded validation
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(questions)")}
+        if "validated" not in columns:
+            self._conn.execute("ALTER TABLE questions ADD COLUMN validated INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def add_questions(self, records: Iterable[Dict[str, Any]], source: str = GENERATED,
+                      model: Optional[str] = None, run_id: Optional[str] = None,
+                      validated: bool = False) -> List[str]:
+        """
+        Insert question records in one transaction, skipping ones already stored.
+
+        Records use the same fields as the JSON files (question, choices,
+        answer, and optionally id and topic), as read by `iter_question_records`.
+        Pass `validated` only for records that passed Question validation, so
+        they are loaded back without validating again.
+
+        Returns:
+            The stored ID of each record, in order: its own ID (or a new one)
+            if it was inserted, or the ID of the identical question already stored
+        """
+        now = time.time()
+        rows = []
+        hashes = []
+        for record in records:
+            content_hash = question_hash(record)
+            hashes.append(content_hash)
+            rows.append((
+                str(record.get("id") or content_hash),
+                content_hash,
+                source,
+                record.get("question", ""),
+                json.dumps(record.get("choices", {}), ensure_ascii=False),
+                record.get("answer"),
+                record.get("topic"),
+                model,
+                run_id,
+                now,
+                int(validated)
+            ))
+
+        with self._lock, self._conn:
+            for row in rows:
+                if self._insert(row) or self._hash_exists(row[1]):
+                    continue
+                # The ID belongs to a different question (e.g. IDs reused across
+                # extraction runs), so key this one by its content hash instead
+                self._insert((row[1], *row[1:]))
+            return self._ids_for_hashes(hashes)
+
+    def _insert(self, row: tuple) -> bool:
+        cursor = self._conn.execute(
+            f"INSERT OR IGNORE INTO questions ({_QUESTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row
+        )
+        return cursor.rowcount > 0
+
+    def _hash_exists(self, content_hash: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM questions WHERE content_hash = ?", (content_hash,)
+        ).fetchone() is not None
+
+    def _ids_for_hashes(self, hashes: List[str]) -> List[str]:
+        ids = {}
+        unique = list(set(hashes))
+        # Stay well under SQLite's limit on bound parameters
+        for start in range(0, len(unique), _PAGE_SIZE):
+            chunk = unique[start:start + _PAGE_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            ids.update(self._conn.execute(
+                f"SELECT content_hash, id FROM questions WHERE content_hash IN ({placeholders})", chunk
+            ).fetchall())
+        return [ids[content_hash] for content_hash in hashes]
+
+    def record_evaluations(self, evaluations: Iterable[Tuple[str, str, Dict[str, Any]]],
+                           model: Optional[str] = None, run_id: Optional[str] = None):
+        """
+        Store (question_id, kind, result) evaluations in one transaction.
+
+        Each replaces any earlier evaluation of the same kind for that question.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            for question_id, kind, result in evaluations:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO evaluations (question_id, kind, result, model, run_id, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (question_id, kind, json.dumps(result, ensure_ascii=False), model, run_id, now)
+                )
+                self._conn.execute(
+                    f"UPDATE questions SET {kind}_status = ? WHERE id = ?",
+                    (_evaluation_status(kind, result), question_id)
+                )
+
+    def record_evaluation(self, question_id: str, kind: str, result: Dict[str, Any],
+                          model: Optional[str] = None, run_id: Optional[str] = None):
+        """Store a single evaluation; see `record_evaluations`"""
+        self.record_evaluations([(question_id, kind, result)], model=model, run_id=run_id)
+
+    def evaluated_hashes(self, kind: str, hashes: Iterable[str]) -> set:
+        """The subset of question content hashes that already have an evaluation of `kind`"""
+        unique = list(set(hashes))
+        found = set()
+        with self._lock:
+            for start in range(0, len(unique), _PAGE_SIZE):
+                chunk = unique[start:start + _PAGE_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT content_hash FROM questions WHERE content_hash IN ({placeholders}) "
+                    f"AND {_status_column(kind)} IS NOT NULL", chunk
+                ))
+        return found
+
+    def iter_questions(self, source: Optional[str] = None, topic: Optional[str] = None,
+                       model: Optional[str] = None, run_id: Optional[str] = None,
+                       unevaluated: Optional[str] = None, statuses: Optional[Dict[str, str]] = None,
+                       with_evaluations: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored questions as records in the JSON file format, in insertion order.
+
+        Args:
+            source: Only questions from this source ("generated" or "real")
+            topic, model, run_id: Only questions with this topic / generating model / run
+            unevaluated: Only questions without an evaluation of this kind
+            statuses: Only questions whose status per evaluation kind matches, e.g. {"accuracy": "correct"}
+            with_evaluations: Include each question's latest evaluations under "evaluations"
+        """
+        conditions = []
+        params: List[Any] = []
+        for column, value in (("source", source), ("topic", topic), ("model", model), ("run_id", run_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if unevaluated is not None:
+            conditions.append(f"{_status_column(unevaluated)} IS NULL")
+        for kind, status in (statuses or {}).items():
+            conditions.append(f"{_status_column(kind)} = ?")
+            params.append(status)
+        where = " AND ".join(conditions) or "1"
+
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT rowid, {_QUESTION_COLUMNS} FROM questions WHERE rowid > ? AND {where} "
+                    f"ORDER BY rowid LIMIT {_PAGE_SIZE}", [last_rowid, *params]
+                ).fetchall()
+                evaluations = self._evaluations_for([row[1] for row in rows]) if with_evaluations else {}
+            if not rows:
+                return
+            for row in rows:
+                record = _question_record(row[1:])
+                if with_evaluations:
+                    record["evaluations"] = evaluations.get(record["id"], {})
+                yield record
+            last_rowid = rows[-1][0]
+
+    def _evaluations_for(self, question_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not question_ids:
+            return {}
+        placeholders = ",".join("?" * len(question_ids))
+        evaluations: Dict[str, Dict[str, Any]] = {}
+        for question_id, kind, result in self._conn.execute(
+            f"SELECT question_id, kind, result FROM evaluations WHERE question_id IN ({placeholders})", question_ids
+        ):
+            evaluations.setdefault(question_id, {})[kind] = json.loads(result)
+        return evaluations
+
+    def export(self, path: str, with_evaluations: bool = True, **filters) -> int:
+        """
+        Write stored questions to a JSON or JSONL file (chosen by extension), streaming rows.
+
+        The records can be read back by every command that takes a questions file.
+        Accepts the filters of `iter_questions`.
+
+        Returns:
+            Number of questions written
+        """
+        records = self.iter_questions(with_evaluations=with_evaluations, **filters)
+        count = 0
+        tmp_path = f"{path}.tmp"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                jsonl = is_jsonl_path(path)
+                if not jsonl:
+                    f.write("[")
+                for record in records:
+                    if not record.get("evaluations"):
+                        record.pop("evaluations", None)
+                    if jsonl:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    else:
+                        f.write(("\n  " if count == 0 else ",\n  ") + json.dumps(record, ensure_ascii=False))
+                    count += 1
+                if not jsonl:
+                    f.write("\n]\n" if count else "]\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Question counts per source and per status of every evaluation kind"""
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "questions": dict(self._conn.execute("SELECT source, COUNT(*) FROM questions GROUP BY source"))
+            }
+            for kind in (ACCURACY, AUTHENTICITY, SIMILARITY):
+                stats[kind] = dict(self._conn.execute(
+                    f"SELECT COALESCE({_status_column(kind)}, 'unevaluated'), COUNT(*) FROM questions "
+                    f"GROUP BY {_status_column(kind)}"
+                ))
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StoreWriter:
+    """
+    Buffers questions and their evaluations and adds them to a store in bulk.
+
+    Commands add each question as it is produced; every `batch_size` questions
+    (and on `close`) the buffer is written in one transaction. New questions
+    are recorded with `source`, their generating `model` and the `run_id`
+    that added them; evaluations with `evaluation_model` (default: `model`).
+    Set `validated` when every record added has passed Question validation.
+    """
+
+    def __init__(self, store: QuestionStore, source: str = GENERATED, model: Optional[str] = None,
+                 run_id: Optional[str] = None, evaluation_model: Optional[str] = None, batch_size: int = _PAGE_SIZE,
+                 validated: bool = False):
+        self.store = store
+        self.source = source
+        self.validated = validated
+        self.model = model
+        self.run_id = run_id
+        self.evaluation_model = evaluation_model or model
+        self.batch_size = batch_size
+        self.count = 0
+        self._records: List[Dict[str, Any]] = []
+        self._evaluations: List[Dict[str, Dict[str, Any]]] = []
+
+    def add(self, record: Dict[str, Any], evaluations: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Queue a question record, with optional evaluation results keyed by kind"""
+        self._records.append(record)
+        self._evaluations.append({kind: result for kind, result in (evaluations or {}).items() if result is not None})
+        self.count += 1
+        if len(self._records) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._records:
+            return
+        ids = self.store.add_questions(self._records, source=self.source, model=self.model, run_id=self.run_id,
+                                       validated=self.validated)
+        self.store.record_evaluations(
+            [(question_id, kind, result)
+             for question_id, evaluations in zip(ids, self._evaluations)
+             for kind, result in evaluations.items()],
+            model=self.evaluation_model, run_id=self.run_id
+        )
+        self._records = []
+        self._evaluations = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def select_questions(input_path: Optional[str], store: Optional[QuestionStore], kind: str,
+                     only_unevaluated: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Question records for an evaluate command: from `input_path`, or else the store's generated questions.
+
+    Records are streamed, so a large input file is never held in memory at
+    once. With `only_unevaluated`, questions the store already holds an
+    evaluation of `kind` for are left out (so re-running an evaluation does
+    no repeated work).
+    """
+    if input_path is None:
+        yield from store.iter_questions(source=GENERATED, unevaluated=kind if only_unevaluated else None)
+        return
+
+    records = iter_question_records(input_path)
+    if not only_unevaluated:
+        yield from records
+        return
+
+    # Look up evaluated questions a page at a time
+    while True:
+        page = list(itertools.islice(records, _PAGE_SIZE))
+        if not page:
+            return
+        hashes = [question_hash(record) for record in page]
+        evaluated = store.evaluated_hashes(kind, hashes)
+        for record, content_hash in zip(page, hashes):
+            if content_hash not in evaluated:
+                yield record
+
+
+def _status_column(kind: str) -> str:
+    if kind not in (ACCURACY, AUTHENTICITY, SIMILARITY):
+        raise ValueError(f"Unknown evaluation kind: {kind}")
+    return f"{kind}_status"
+
+
+def _question_record(row: tuple) -> Dict[str, Any]:
+    question_id, _, source, question, choices, answer, topic, model, run_id, _, validated = row
+    record = {"id": question_id, "question": question, "choices": json.loads(choices)}
+    if answer is not None:
+        record["answer"] = answer
+    if topic is not None:
+        record["topic"] = topic
+    record["source"] = source
+    if model is not None:
+        record["model"] = model
+    if run_id is not None:
+        record["run_id"] = run_id
+    return ValidatedRecord(record) if validated else record
+
+
+_store: Optional[QuestionStore] = None
+_store_path: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def configure_store(path: Optional[str]):
+    """Set the process-wide question store location; None disables the store"""
+    global _store, _store_path
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+        _store_path = path
+
+
+def get_store() -> Optional[QuestionStore]:
+    """Return the process-wide question store, opening it on first use; None if not configured"""
+    global _store
+    if _store_path is None:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = QuestionStore(_store_path)
+        return _store
@@ -0,0 +1,318 @@
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    MODEL_PRICES,
+    CACHE_WRITE_PRICE_MULTIPLIER,
+    CACHE_READ_PRICE_MULTIPLIER,
+    BATCH_PRICE_MULTIPLIER
+)
+from utils.io import write_text_atomic
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+
+def estimate_cost(model: str, usage: Dict[str, int], batch: bool = False) -> Optional[float]:
+    """Estimated USD cost of a response's token usage; None for models without a known price"""
+    price = next((p for prefix, p in MODEL_PRICES.items() if model.startswith(prefix)), None)
+    if price is None:
+        return None
+
+    input_price, output_price = price
+    cost = (
+        usage.get("input_tokens", 0) * input_price
+        + usage.get("cache_creation_input_tokens", 0) * input_price * CACHE_WRITE_PRICE_MULTIPLIER
+        + usage.get("cache_read_input_tokens", 0) * input_price * CACHE_READ_PRICE_MULTIPLIER
+        + usage.get("output_tokens", 0) * output_price
+    ) / 1_000_000
+    return cost * BATCH_PRICE_MULTIPLIER if batch else cost
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class ConnectionStats:
+    """
+    Connection pool activity of the shared HTTP clients, from httpcore's trace extension.
+
+    Every request is counted, as is every new TCP connection the pool opens
+    for one. The reuse rate is how many of the requests that got a connection
+    went out on a kept-alive one; requests that never got a connection are
+    counted as failed. Setup time runs from the TCP connect to the first byte
+    of the request (including TLS). Tracing is optional: requests sent by a
+    transport that does not support the extension are counted, but left out
+    of the connection figures.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.traced_requests = 0
+        self.connected_requests = 0
+        self.reused_requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.setup_time = 0.0
+
+    def trace_request(self, request: Any):
+        """httpx request event hook that attaches a connection tracer to the request"""
+        tracer = self._tracer()
+        extensions = getattr(request, "extensions", None)
+        # Never replace a tracer someone else attached
+        if isinstance(extensions, dict) and "trace" not in extensions:
+            extensions["trace"] = tracer
+
+    def _tracer(self):
+        with self._lock:
+            self.requests += 1
+        state: Dict[str, Any] = {}
+
+        def trace(event: str, info: Dict[str, Any]):
+            if not state.get("traced"):
+                state["traced"] = True
+                with self._lock:
+                    self.traced_requests += 1
+            if event == "connection.connect_tcp.started":
+                state["connecting"] = time.perf_counter()
+            elif event == "connection.connect_tcp.complete":
+                state["opened"] = True
+                with self._lock:
+                    self.connections_opened += 1
+            elif event == "connection.start_tls.complete":
+                with self._lock:
+                    self.tls_handshakes += 1
+            elif event.startswith(("http11.", "http2.")) and not state.get("connected"):
+                # The request reached a connection, new or kept alive
+                state["connected"] = True
+                elapsed = time.perf_counter() - state.pop("connecting") if "connecting" in state else 0.0
+                with self._lock:
+                    self.connected_requests += 1
+                    self.reused_requests += not state.get("opened")
+                    self.setup_time += elapsed
+
+        return trace
+
+    def report(self) -> List[str]:
+        """Report line, empty if no requests were made"""
+        with self._lock:
+            if not self.requests:
+                return []
+            if not self.traced_requests:
+                return [f"Connections: not traced for {self.requests} requests (unsupported by the HTTP transport)"]
+            failed = self.traced_requests - self.connected_requests
+            if not self.connected_requests:
+                return [f"Connections: none established for {self.traced_requests} requests "
+                        f"({self.connections_opened} opened, {failed} failed to connect)"]
+            line = (f"Connections: {self.connections_opened} opened for {self.connected_requests} requests "
+                    f"({self.reused_requests / self.connected_requests:.0%} reused), "
+                    f"{self.setup_time:.2f}s spent on connection setup")
+            if failed:
+                line += f"; {failed} requests failed to connect"
+            return [line]
+
+
+class Telemetry:
+    """
+    Per-call records of every API request: timing, tokens, retries and cost.
+
+    Records are tagged with the CLI command that made them and the model, and
+    can be summarised per (command, model) or exported as JSONL and as a
+    Prometheus textfile. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.run_id = uuid.uuid4().hex[:12]
+        self.command = ""
+        self.records: List[Dict[str, Any]] = []
+        self.connections = ConnectionStats()
+
+    def record_call(self,
+                    model: str,
+                    usage: Any = None,
+                    wall_time: float = 0.0,
+                    ttft: Optional[float] = None,
+                    stop_reason: Optional[str] = None,
+                    retries: int = 0,
+                    throttled: int = 0,
+                    cache_hit: bool = False,
+                    batch: bool = False):
+        """
+        Record one API call (or one response cache hit, which costs nothing).
+
+        Args:
+            model: Model the request was sent to
+            usage: The response's `usage`
+            wall_time: Seconds from first attempt to response, including retries
+            ttft: Seconds until the first streamed token, for streamed calls
+            stop_reason: The response's stop reason
+            retries: Attempts that failed before this one succeeded
+            throttled: How many of those failures were 429/529
+            cache_hit: Whether the response came from the local response cache
+            batch: Whether the response came from the Message Batches API
+        """
+        tokens = {field: 0 if cache_hit else getattr(usage, field, None) or 0 for field in TOKEN_FIELDS}
+        record = {
+            "run_id": self.run_id,
+            "timestamp": time.time(),
+            "command": self.command,
+            "model": model,
+            "wall_time": wall_time,
+            "ttft": ttft,
+            **tokens,
+            "stop_reason": stop_reason,
+            "retries": retries,
+            "throttled": throttled,
+            "cache_hit": cache_hit,
+            "batch": batch,
+            "cost": 0.0 if cache_hit else estimate_cost(model, tokens, batch=batch)
+        }
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Aggregates keyed by (command, model)"""
+        with self._lock:
+            records = list(self.records)
+
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault((record["command"], record["model"]), []).append(record)
+
+        summary = {}
+        for key, group in groups.items():
+            api_calls = [r for r in group if not r["cache_hit"]]
+            wall_times = [r["wall_time"] for r in api_calls if not r["batch"]]
+            ttfts = [r["ttft"] for r in api_calls if r["ttft"] is not None]
+            stop_reasons: Dict[str, int] = {}
+            for r in api_calls:
+                stop_reasons[r["stop_reason"]] = stop_reasons.get(r["stop_reason"], 0) + 1
+            costs = [r["cost"] for r in api_calls]
+
+            summary[key] = {
+                "calls": len(api_calls),
+                "cache_hits": len(group) - len(api_calls),
+                "batched": sum(1 for r in api_calls if r["batch"]),
+                **{field: sum(r[field] for r in api_calls) for field in TOKEN_FIELDS},
+                "retries": sum(r["retries"] for r in api_calls),
+                "throttled": sum(r["throttled"] for r in api_calls),
+                "stop_reasons": stop_reasons,
+                "wall_time_total": sum(wall_times),
+                "wall_time_p50": percentile(wall_times, 50),
+                "wall_time_p95": percentile(wall_times, 95),
+                "wall_time_p99": percentile(wall_times, 99),
+                "wall_times": wall_times,
+                "ttft_p50": percentile(ttfts, 50),
+                "ttft_p95": percentile(ttfts, 95),
+                "ttfts": ttfts,
+                # None when any call used a model without a known price
+                "cost": None if None in costs else sum(costs)
+            }
+        return summary
+
+    def report(self) -> List[str]:
+        """End-of-run report lines, one block per (command, model)"""
+        lines = []
+        for (command, model), s in sorted(self.summary().items()):
+            lines.append(f"API calls [{command or 'cli'}, {model}]: {s['calls']} calls"
+                         + (f" ({s['batched']} batched)" if s['batched'] else "")
+                         + (f", {s['cache_hits']} served from cache" if s['cache_hits'] else ""))
+            if not s['calls']:
+                continue
+            lines.append(f"  Tokens: {s['input_tokens']} input "
+                         f"({s['cache_read_input_tokens']} cache read, {s['cache_creation_input_tokens']} cache write), "
+                         f"{s['output_tokens']} output")
+            if s['wall_time_p50'] is not None:
+                latency = (f"  Latency: p50 {s['wall_time_p50']:.2f}s, p95 {s['wall_time_p95']:.2f}s, "
+                           f"p99 {s['wall_time_p99']:.2f}s")
+                if s['ttft_p50'] is not None:
+                    latency += f"; time to first token p50 {s['ttft_p50']:.2f}s, p95 {s['ttft_p95']:.2f}s"
+                lines.append(latency)
+            stop_reasons = ", ".join(f"{reason} {n}" for reason, n in sorted(s['stop_reasons'].items(), key=str))
+            lines.append(f"  Stop reasons: {stop_reasons}; retries: {s['retries']} ({s['throttled']} throttled)")
+            cost = f"${s['cost']:.4f}" if s['cost'] is not None else "unknown (no price for model)"
+            lines.append(f"  Estimated cost: {cost}")
+        return lines + self.connections.report()
+
+    def write_jsonl(self, path: str):
+        """Append every call record to a JSON Lines file"""
+        with self._lock:
+            records = list(self.records)
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def write_prometheus(self, path: str):
+        """Write the run's aggregates as a Prometheus textfile (for node_exporter's textfile collector)"""
+        metrics = {
+            "satgen_api_calls_total": ("counter", "API calls made", []),
+            "satgen_api_cache_hits_total": ("counter", "Responses served from the local response cache", []),
+            "satgen_api_tokens_total": ("counter", "Tokens used, by type", []),
+            "satgen_api_retries_total": ("counter", "Retried API attempts", []),
+            "satgen_api_cost_usd_total": ("counter", "Estimated API cost in USD", []),
+            "satgen_api_call_duration_seconds": ("summary", "API call wall time including retries", []),
+            "satgen_api_ttft_seconds": ("summary", "Time to first streamed token", []),
+            "satgen_http_requests_total": ("counter", "HTTP requests sent through the shared connection pool", []),
+            "satgen_http_connections_opened_total": ("counter", "New connections opened by the shared pool", []),
+            "satgen_http_connection_failures_total": ("counter", "Traced requests that never got a connection", []),
+            "satgen_http_connection_setup_seconds_total": ("counter", "Time spent opening connections", []),
+        }
+
+        def add(name: str, labels: Dict[str, str], value: float, suffix: str = ""):
+            rendered = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+            metrics[name][2].append(f"{name}{suffix}{{{rendered}}} {value}" if rendered else f"{name}{suffix} {value}")
+
+        for (command, model), s in sorted(self.summary().items()):
+            labels = {"command": command, "model": model}
+            for reason, count in sorted(s["stop_reasons"].items(), key=str):
+                add("satgen_api_calls_total", {**labels, "stop_reason": str(reason)}, count)
+            add("satgen_api_cache_hits_total", labels, s["cache_hits"])
+            for field in TOKEN_FIELDS:
+                add("satgen_api_tokens_total", {**labels, "type": field.replace("_tokens", "")}, s[field])
+            add("satgen_api_retries_total", labels, s["retries"])
+            if s["cost"] is not None:
+                add("satgen_api_cost_usd_total", labels, round(s["cost"], 6))
+            for name, values in (("satgen_api_call_duration_seconds", s["wall_times"]),
+                                 ("satgen_api_ttft_seconds", s["ttfts"])):
+                if not values:
+                    continue
+                for quantile in (0.5, 0.95, 0.99):
+                    add(name, {**labels, "quantile": str(quantile)}, round(percentile(values, quantile * 100), 4))
+                add(name, labels, round(sum(values), 4), "_sum")
+                add(name, labels, len(values), "_count")
+
+        connections = self.connections
+        if connections.requests:
+            add("satgen_http_requests_total", {}, connections.requests)
+            add("satgen_http_connections_opened_total", {}, connections.connections_opened)
+            add("satgen_http_connection_failures_total", {},
+                connections.traced_requests - connections.connected_requests)
+            add("satgen_http_connection_setup_seconds_total", {}, round(connections.setup_time, 4))
+
+        lines = []
+        for name, (kind, help_text, samples) in metrics.items():
+            if samples:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples]
+        lines += [
+            "# HELP satgen_last_run_timestamp_seconds When the run that wrote this file finished",
+            "# TYPE satgen_last_run_timestamp_seconds gauge",
+            f"satgen_last_run_timestamp_seconds {time.time():.0f}"
+        ]
+        write_text_atomic(path, "\n".join(lines) + "\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide record of every API call
+telemetry = Telemetry()
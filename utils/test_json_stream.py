@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from utils.json_stream import JsonArrayStream
+
+ELEMENTS = [
+    {"question": "Is [1, 2] a list? {no}", "choices": {"A": "a \"quoted\" ]", "B": "back\\slash"}},
+    [1, [2, 3], {"nested": []}],
+    "a string with , and ]",
+    42,
+    -1.5e3,
+    True,
+    None,
+]
+PAYLOAD = 'Here are the questions: {"questions": ' + json.dumps(ELEMENTS) + '} trailing text'
+
+
+def feed_pieces(parser, pieces):
+    elements = []
+    for piece in pieces:
+        elements.extend(parser.feed(piece))
+    return elements
+
+
+def test_whole_payload():
+    parser = JsonArrayStream(key="questions")
+    assert parser.feed(PAYLOAD) == ELEMENTS
+    assert parser.complete
+
+
+@pytest.mark.parametrize("split", range(1, len(PAYLOAD)))
+def test_every_split_position(split):
+    parser = JsonArrayStream(key="questions")
+    assert feed_pieces(parser, [PAYLOAD[:split], PAYLOAD[split:]]) == ELEMENTS
+
+
+def test_one_character_at_a_time():
+    parser = JsonArrayStream(key="questions")
+    assert feed_pieces(parser, PAYLOAD) == ELEMENTS
+
+
+def test_elements_are_returned_as_soon_as_they_close():
+    parser = JsonArrayStream()
+    assert parser.feed('[{"a": 1}, {"b":') == [{"a": 1}]
+    assert parser.feed(' 2}') == [{"b": 2}]
+    assert not parser.complete
+    assert parser.feed(']') == []
+    assert parser.complete
+
+
+def test_text_after_the_array_is_ignored():
+    parser = JsonArrayStream()
+    assert parser.feed('[1]') == [1]
+    assert parser.feed('[2, 3]') == []
+
+
+def test_key_is_found_across_pieces():
+    parser = JsonArrayStream(key="questions")
+    assert parser.feed('{"other": [0], "quest') == []
+    assert not parser.started
+    assert parser.feed('ions": [7]}') == [7]
+
+
+def test_invalid_element_raises():
+    parser = JsonArrayStream()
+    with pytest.raises(ValueError):
+        parser.feed('[{"a": 1,}]')
@@ -0,0 +1,73 @@
+import pytest
+
+from utils.minhash import MinHashIndex, shingles
+
+TEXTS = [
+    "The perimeter of an isosceles triangle is 83 inches. Each of the two congruent sides has a length of 24 inches.",
+    "A bakery sells trays of cookies. Each tray contains at least 50 cookies but no more than 60 cookies.",
+    "If 3x + 5 = 20, what is the value of 6x? The answer must be given as a whole number.",
+]
+
+
+@pytest.fixture
+def index():
+    index = MinHashIndex()
+    for i, text in enumerate(TEXTS):
+        index.add(f"q{i}", text)
+    return index
+
+
+def test_shingles():
+    assert shingles("One two three four", size=3) == {"one two three", "two three four"}
+    assert shingles("3/4 of 1.5", size=3) == {"3/4 of 1.5"}
+    assert shingles("!!", size=3) == set()
+
+
+def test_identical_text_is_an_exact_match(index):
+    assert index.query(TEXTS[1], top_k=1) == [(1, 1.0)]
+
+
+def test_near_duplicate_scores_high(index):
+    near_duplicate = TEXTS[0].replace("83 inches", "85 inches")
+    best, similarity = index.query(near_duplicate, top_k=1)[0]
+    assert best == 0
+    assert 0.6 < similarity < 1.0
+
+
+def test_unrelated_text_finds_nothing(index):
+    assert index.query("Completely different words about the history of medieval shipbuilding in Europe.") == []
+
+
+def test_signature_is_deterministic():
+    assert MinHashIndex(seed=7).signature(TEXTS[0]) == MinHashIndex(seed=7).signature(TEXTS[0])
+    assert MinHashIndex(seed=7).signature(TEXTS[0]) != MinHashIndex(seed=8).signature(TEXTS[0])
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "index.minhash")
+    index.fingerprint = "abc"
+    index.save(path)
+
+    loaded = MinHashIndex.load(path)
+    assert loaded.ids == index.ids
+    assert loaded.fingerprint == "abc"
+    assert loaded.query(TEXTS[2], top_k=1) == [(2, 1.0)]
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHashIndex(num_perm=100, bands=32)
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:len(data) // 2],
+    lambda data: data.replace(b'"signatures": "', b'"signatures": "A'),
+    lambda data: b"\x80\x05\x95 not json",
+], ids=["truncated", "bad signatures", "binary"])
+def test_load_rejects_damaged_files(index, tmp_path, corrupt):
+    path = tmp_path / "index.minhash"
+    index.save(str(path))
+    path.write_bytes(corrupt(path.read_bytes()))
+
+    with pytest.raises(ValueError):
+        MinHashIndex.load(str(path))
@@ -0,0 +1,151 @@
+import anthropic
+import pytest
+
+import utils.scheduler as scheduler
+from utils.scheduler import AdaptiveConcurrencyLimiter, RequestScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler, "time", clock)
+    return clock
+
+
+def server_error(status_code):
+    # The SDK's errors need an HTTP response to construct; the scheduler only reads the status
+    error = anthropic.InternalServerError.__new__(anthropic.InternalServerError)
+    error.status_code = status_code
+    error.response = None
+    return error
+
+
+def test_token_bucket_starts_full_and_refills_over_time(clock):
+    bucket = TokenBucket(60)
+    bucket.acquire(60)
+    assert bucket.tokens == 0
+
+    clock.now += 30
+    bucket.acquire(30)
+    assert bucket.tokens == 0
+
+
+def test_token_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(60)
+    clock.now += 600
+    bucket.adjust(-100)
+    bucket._refill()
+    assert bucket.tokens == 60
+
+
+def test_token_bucket_settles_the_real_cost(clock):
+    bucket = TokenBucket(60)
+    bucket.acquire(10)
+    bucket.adjust(25)
+    assert bucket.tokens == 25
+    bucket.adjust(-5)
+    assert bucket.tokens == 30
+
+
+def test_limiter_grows_additively_up_to_the_maximum(clock):
+    limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+    limiter.limit = 2.0
+    limiter.acquire()
+    limiter.release()
+    assert limiter.limit == 2.5
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 4
+
+
+def test_limiter_halves_once_per_cooldown(clock):
+    limiter = AdaptiveConcurrencyLimiter(max_limit=16, cooldown=1.0)
+    for _ in range(3):
+        limiter.acquire()
+    limiter.release(throttled=True)
+    limiter.release(throttled=True)
+    assert limiter.limit == 8
+
+    clock.now += 1.0
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_limiter_never_drops_below_the_minimum(clock):
+    limiter = AdaptiveConcurrencyLimiter(max_limit=2, min_limit=1)
+    for _ in range(5):
+        clock.now += 10
+        limiter.acquire()
+        limiter.release(throttled=True)
+    assert limiter.limit == 1
+
+
+def test_scheduler_retries_transient_errors(clock):
+    request_scheduler = RequestScheduler(max_retries=3, base_delay=0)
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise server_error(529 if len(attempts) == 1 else 500)
+        return "ok"
+
+    assert request_scheduler.call(send) == "ok"
+    assert request_scheduler.retries == 2
+    assert request_scheduler.throttled == 1
+    assert request_scheduler.limiter.in_flight == 0
+
+
+def test_scheduler_gives_up_after_max_retries(clock):
+    request_scheduler = RequestScheduler(max_retries=2, base_delay=0)
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        raise server_error(500)
+
+    with pytest.raises(anthropic.InternalServerError):
+        request_scheduler.call(send)
+    assert len(attempts) == 3
+
+
+def test_scheduler_does_not_retry_client_errors(clock):
+    request_scheduler = RequestScheduler(max_retries=3, base_delay=0)
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        raise server_error(400)
+
+    with pytest.raises(anthropic.InternalServerError):
+        request_scheduler.call(send)
+    assert len(attempts) == 1
+    assert request_scheduler.limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("error", [server_error(500), server_error(400), RuntimeError("stream broke")],
+                         ids=["retryable", "client error", "not an API error"])
+def test_failed_attempts_refund_their_token_reservations(clock, error):
+    request_scheduler = RequestScheduler(input_tokens_per_minute=1000, output_tokens_per_minute=1000,
+                                         max_retries=2, base_delay=0)
+
+    def send():
+        raise error
+
+    with pytest.raises(type(error)):
+        request_scheduler.call(send, input_tokens=300, max_tokens=400)
+    assert request_scheduler.input_tokens.tokens == 1000
+    assert request_scheduler.output_tokens.tokens == 1000
@@ -0,0 +1,38 @@
+import sqlite3
+
+from utils.io import ValidatedRecord
+from utils.store import GENERATED, REAL, QuestionStore, StoreWriter
+
+CHOICES = {"A": "1", "B": "2", "C": "3", "D": "4"}
+
+
+def record(number, **fields):
+    return {"question": f"What is {number} + 1?", "choices": dict(CHOICES), "answer": "B", **fields}
+
+
+def test_only_rows_added_as_validated_load_as_validated_records(tmp_path):
+    store = QuestionStore(str(tmp_path / "store.db"))
+    with StoreWriter(store, GENERATED, validated=True) as writer:
+        writer.add(record(1))
+    store.add_questions([record(2)], source=REAL)
+
+    loaded = {r["question"]: r for r in store.iter_questions()}
+    assert type(loaded["What is 1 + 1?"]) is ValidatedRecord
+    assert type(loaded["What is 2 + 1?"]) is dict
+
+
+def test_stores_without_the_validated_column_are_upgraded(tmp_path):
+    path = str(tmp_path / "store.db")
+    store = QuestionStore(path)
+    store.add_questions([record(1)], validated=True)
+    store.close()
+    conn = sqlite3.connect(path)
+    conn.execute("ALTER TABLE questions DROP COLUMN validated")
+    conn.commit()
+    conn.close()
+
+    store = QuestionStore(path)
+    (loaded,) = store.iter_questions()
+    assert type(loaded) is dict
+    store.add_questions([record(2)], validated=True)
+    assert [type(r) for r in store.iter_questions()] == [dict, ValidatedRecord]
@@ -0,0 +1,39 @@
+from utils.telemetry import ConnectionStats
+
+NEW_CONNECTION = ["connection.connect_tcp.started", "connection.connect_tcp.complete",
+                  "http11.send_request_headers.started"]
+KEPT_ALIVE = ["http11.send_request_headers.started"]
+FAILED = ["connection.connect_tcp.started", "connection.connect_tcp.failed"]
+
+
+def send(stats, events):
+    trace = stats._tracer()
+    for event in events:
+        trace(event, {})
+
+
+def test_reuse_is_counted_over_requests_that_got_a_connection():
+    stats = ConnectionStats()
+    send(stats, NEW_CONNECTION)
+    for _ in range(3):
+        send(stats, KEPT_ALIVE)
+    send(stats, FAILED)
+
+    (line,) = stats.report()
+    assert line.startswith("Connections: 1 opened for 4 requests (75% reused)")
+    assert line.endswith("; 1 requests failed to connect")
+
+
+def test_failed_connections_are_not_reported_as_reused():
+    stats = ConnectionStats()
+    for _ in range(18):
+        send(stats, FAILED)
+
+    assert stats.report() == ["Connections: none established for 18 requests (0 opened, 18 failed to connect)"]
+
+
+def test_untraced_requests_are_left_out():
+    stats = ConnectionStats()
+    stats._tracer()
+
+    assert stats.report() == ["Connections: not traced for 1 requests (unsupported by the HTTP transport)"]